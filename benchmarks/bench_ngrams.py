@@ -0,0 +1,266 @@
+"""
+Вимірювання швидкодії кожного етапу обробки корпусу (Ngrams.process) окремо:
+1) tokenize - поділ корпусу на речення та слова (Ngrams.iter_sentences з вибраним --tokenizer, Ngrams.split_to_words)
+2) count - укладання частотних словників N-грам, (N-1)-грам та словника слів (NgramCounter)
+3) witten-bell - кількість типів N-грам для кожної (N-1)-грами
+4) good-turing - частоти частот N-грам та параметри згладжування Гуда-Тюрінга
+5) db write - запис усіх таблиць до бази даних (Database.add_*)
+6) csv write - запис csv-файлів (Ngrams.write_to_csv)
+
+Для кожного етапу виводиться тривалість, швидкість у словах за секунду та пікове використання пам'яті.
+Результати зберігаються у json-файл; якщо вказати попередній результат (--baseline), етапи, що сповільнились
+більше ніж на поріг (--threshold), вважаються регресією, і скрипт завершується з кодом 1.
+
+Приклад (з кореневої теки проекту):
+    python -m benchmarks.bench_ngrams -n 2 3 --scale 1 4 --memory --baseline benchmarks/results/previous.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from src.corpus import CorpusReader
+from src.counter import NgramCounter
+from src.database import Database
+from src.ngrams import Ngrams
+from src.tokenizer import Tokenizer
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "corpora")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def peak_rss_mb():
+    """
+    :return: пікове використання пам'яті процесом (resident set size) у мегабайтах
+    """
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # у Linux значення подається в кілобайтах, у macOS - в байтах
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(results, stage, tokens, memory, func, *args):
+    """
+    Виконання одного етапу з вимірюванням тривалості та пам'яті
+    :param results: список, до якого додається результат етапу
+    :param stage: назва етапу
+    :param tokens: кількість слів корпусу (для обчислення швидкості)
+    :param memory: чи вимірювати пікове виділення пам'яті етапом (tracemalloc сповільнює виконання)
+    :param func: функція етапу
+    :param args: аргументи функції
+    :return: результат функції етапу
+    """
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    value = func(*args)
+    seconds = time.perf_counter() - start
+    record = {"stage": stage, "seconds": seconds, "tokens_per_sec": tokens / seconds if seconds > 0 else None,
+              "peak_rss_mb": peak_rss_mb()}
+    if memory:
+        record["peak_alloc_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    results.append(record)
+    return value
+
+
+def tokenize(paragraphs, tokenizer):
+    """
+    Етап tokenize: поділ корпусу на речення (вибраним токенізатором) та слова
+    """
+    return [Ngrams.split_to_words(s) for s in Ngrams.iter_sentences(paragraphs, tokenizer)]
+
+
+def count(sentences_words, n):
+    """
+    Етап count: укладання частотних словників
+    """
+    counter = NgramCounter(n)
+    for words in sentences_words:
+        counter.update(words)
+    return counter
+
+
+def good_turing(counter, n, k):
+    """
+    Етап good-turing: частоти частот N-грам та параметри згладжування Гуда-Тюрінга
+    """
+    ngrams_dict = counter.get_counts(n)
+    total = len(counter.get_counts(n - 1)) * len(counter.get_counts(1))
+    n_c = Ngrams.get_frequencies_of_ngrams_frequencies(ngrams_dict, total)
+    return Ngrams.gt_table_db(n_c, Ngrams.get_gt_counts_estimation(n_c, k))
+
+
+def db_write(db_path, counter, n, smoothing_params, gt_table):
+    """
+    Етап db write: запис усіх таблиць до бази даних
+    """
+    decoded = counter.decoded
+    db = Database(db_path, drop=True)
+    db.set_bulk_load_pragmas()
+    db.add_freq_data(decoded(counter.get_counts(n), n), db.tables_names["ngrams frequency table"])
+    db.add_freq_data(decoded(counter.get_counts(n - 1), n - 1), db.tables_names["(n-1)-grams frequency table"])
+    db.add_freq_data(decoded(counter.get_counts(1), 1), db.tables_names["Vocabulary frequency table"])
+    db.add_gt_estimation_data(gt_table)
+    db.add_smoothing_data(decoded(smoothing_params, n - 1))
+    db.create_indexes()
+    db.close()
+
+
+def csv_write(csv_dir, counter, n, smoothing_params, gt_table):
+    """
+    Етап csv write: запис csv-файлів
+    """
+    decoded = counter.decoded
+    Ngrams.write_to_csv(os.path.join(csv_dir, "ngrams.csv"), decoded(counter.get_counts(n), n))
+    Ngrams.write_to_csv(os.path.join(csv_dir, "n_minus1_grams.csv"), decoded(counter.get_counts(n - 1), n - 1))
+    Ngrams.write_to_csv(os.path.join(csv_dir, "witten-bell.csv"), decoded(smoothing_params, n - 1))
+    Ngrams.write_to_csv(os.path.join(csv_dir, "good-turing.csv"), gt_table)
+
+
+def bench_corpus(paragraphs, n, k, memory, work_dir, tokenizer="punkt"):
+    """
+    Вимірювання усіх етапів обробки для одного корпусу та одного N
+    :param paragraphs: параграфи корпусу
+    :param n: параметр для позначення N у N-грамах
+    :param k: поріг Катца
+    :param memory: чи вимірювати пікове виділення пам'яті кожним етапом
+    :param work_dir: тимчасова тека для бази даних та csv-файлів
+    :param tokenizer: назва токенізатора (див. Tokenizer)
+    :return: список результатів етапів та кількість слів корпусу
+    """
+    results = []
+    sentences_words = measure(results, "tokenize", 0, memory, tokenize, paragraphs, tokenizer)
+    tokens = sum(len(words) for words in sentences_words)
+    results[-1]["tokens_per_sec"] = tokens / results[-1]["seconds"]
+    counter = measure(results, "count", tokens, memory, count, sentences_words, n)
+    del sentences_words
+    smoothing_params = measure(results, "witten-bell", tokens, memory, counter.get_types_counts,
+                               counter.get_counts(n - 1))
+    gt_table = measure(results, "good-turing", tokens, memory, good_turing, counter, n, k)
+    measure(results, "db write", tokens, memory, db_write, os.path.join(work_dir, "bench.db"),
+            counter, n, smoothing_params, gt_table)
+    measure(results, "csv write", tokens, memory, csv_write, work_dir, counter, n, smoothing_params, gt_table)
+    return results, tokens
+
+
+def synthetic_corpus(paragraphs, scale, seed=0):
+    """
+    Синтетичний корпус, у scale разів більший за вихідний: речення складаються з випадкових слів вихідного
+    корпусу з імовірностями, пропорційними їх частотам (тому кількість типів N-грам зростає разом з розміром)
+    :param paragraphs: параграфи вихідного корпусу
+    :param scale: у скільки разів синтетичний корпус більший за вихідний (за кількістю слів)
+    :param seed: початкове значення генератора випадкових чисел (для відтворюваності)
+    :return: список параграфів синтетичного корпусу
+    """
+    rng = random.Random(seed)
+    words = [w for p in paragraphs for w in Ngrams.split_to_words(p)]
+    result = []
+    remaining = len(words) * scale
+    while remaining > 0:
+        sentences = []
+        for _ in range(rng.randint(1, 5)):
+            length = rng.randint(3, 25)
+            sentences.append(" ".join(rng.choice(words) for _ in range(length)).capitalize() + ".")
+            remaining -= length
+        result.append(" ".join(sentences) + "\n")
+    return result
+
+
+def load_corpora(scales):
+    """
+    :param scales: коефіцієнти масштабування синтетичних корпусів
+    :return: список пар (назва корпусу, параграфи)
+    """
+    corpora = []
+    for path in sorted(glob.glob(os.path.join(CORPORA_DIR, "*.txt"))):
+        if "LINKS" in os.path.basename(path):
+            continue
+        name = os.path.basename(path).split(",")[0]
+        paragraphs = CorpusReader.read_file(path)
+        corpora.append((name, paragraphs))
+        for scale in scales:
+            if scale > 1:
+                corpora.append(("{} synthetic x{}".format(name, scale), synthetic_corpus(paragraphs, scale)))
+    return corpora
+
+
+def compare(results, baseline, threshold):
+    """
+    Порівняння з попереднім результатом
+    :param results: поточні результати
+    :param baseline: попередні результати
+    :param threshold: допустиме відносне сповільнення (0.2 - на 20%)
+    :return: список описів регресій
+    """
+    # результати без назви токенізатора записані до появи параметра --tokenizer (токенізатор Punkt)
+    previous = {(r["corpus"], r["n"], r.get("tokenizer", "punkt"), r["stage"]): r["seconds"]
+                for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["corpus"], r["n"], r["tokenizer"], r["stage"]))
+        if old and r["seconds"] > old * (1 + threshold):
+            regressions.append("{corpus} N={n} {stage}: {old:.3f}s -> {new:.3f}s".format(
+                corpus=r["corpus"], n=r["n"], stage=r["stage"], old=old, new=r["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Запуск вимірювань з командного рядка
+    :param argv: список аргументів (за замовчуванням - sys.argv)
+    :return: код завершення: 1, якщо знайдено регресію, інакше 0
+    """
+    parser = argparse.ArgumentParser(description="Benchmark every stage of N-gram processing")
+    parser.add_argument("-n", type=int, nargs="+", default=[2, 3], help="N values")
+    parser.add_argument("-k", type=int, default=5, help="Katz threshold")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1],
+                        help="also benchmark synthetic corpora this many times larger than the bundled ones")
+    parser.add_argument("--corpus", help="only benchmark corpora whose name contains this string")
+    parser.add_argument("--tokenizer", choices=sorted(Tokenizer.registry), default="punkt",
+                        help="sentence splitter used by the tokenize stage")
+    parser.add_argument("--memory", action="store_true", help="measure peak allocations per stage (slower)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="previous results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown per stage")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, paragraphs in load_corpora(args.scale):
+            if args.corpus and args.corpus not in name:
+                continue
+            for n in args.n:
+                stages, tokens = bench_corpus(paragraphs, n, args.k, args.memory, work_dir, args.tokenizer)
+                for stage in stages:
+                    stage.update({"corpus": name, "n": n, "tokenizer": args.tokenizer, "tokens": tokens})
+                    results.append(stage)
+                    print("{:<45} N={} {:<12} {:8.3f}s {:>12} tok/s  RSS {:7.1f} MB{}".format(
+                        name, n, stage["stage"], stage["seconds"],
+                        "{:.0f}".format(stage["tokens_per_sec"]) if stage["tokens_per_sec"] else "-",
+                        stage["peak_rss_mb"],
+                        "  alloc {:7.1f} MB".format(stage["peak_alloc_mb"]) if "peak_alloc_mb" in stage else ""))
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+    print("Results saved to {}".format(output))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print("REGRESSION: " + regression)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
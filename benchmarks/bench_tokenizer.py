@@ -0,0 +1,89 @@
+"""
+Вимірювання швидкості поділу корпусу на речення та слова для кожного токенізатора (див. src/tokenizer.py).
+Для порівняння вимірюється також попередній варіант поділу (legacy): nltk.sent_tokenize для кожного параграфа
+та re.split з некомпільованим виразом і перевіркою розділювачів за списком.
+
+Приклад (з кореневої теки проекту):
+    python -m benchmarks.bench_tokenizer --repeat 3 --output benchmarks/results/tokenizer.json
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from nltk.tokenize import sent_tokenize
+
+from benchmarks.bench_ngrams import load_corpora
+from src.tokenizer import Tokenizer
+
+
+def legacy_words(paragraphs):
+    """
+    Попередній варіант поділу на речення та слова (для порівняння)
+    :param paragraphs: параграфи корпусу
+    :return: генератор списків слів речень
+    """
+    for p in paragraphs:
+        for s in sent_tokenize(p):
+            delimiters = [".", ";", "!", "?", ":", ",", " ", "\n", "", "(", ")", "‘", "—"]
+            words_list = re.split(r'[.;!?:(),—"‘\s]\s*', s)
+            yield [w.lower() for w in words_list if w not in delimiters]
+
+
+def bench_backend(iter_words, paragraphs, repeat):
+    """
+    :param iter_words: функція, що повертає генератор списків слів речень для параграфів
+    :param paragraphs: параграфи корпусу
+    :param repeat: кількість повторів (береться найкращий час)
+    :return: словник з кількістю речень, слів, найкращим часом та швидкістю
+    """
+    best = None
+    for _ in range(repeat):
+        sentences = tokens = 0
+        start = time.perf_counter()
+        for words in iter_words(paragraphs):
+            sentences += 1
+            tokens += len(words)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return {"sentences": sentences, "tokens": tokens, "seconds": best,
+            "tokens_per_sec": tokens / best if best > 0 else None}
+
+
+def main(argv=None):
+    """
+    Запуск вимірювань з командного рядка
+    :param argv: список аргументів (за замовчуванням - sys.argv)
+    """
+    parser = argparse.ArgumentParser(description="Benchmark sentence/word splitting backends")
+    parser.add_argument("--backend", nargs="+", default=["legacy"] + sorted(Tokenizer.registry),
+                        help="backends to benchmark ('legacy' is the previous implementation)")
+    parser.add_argument("--corpus", help="only benchmark corpora whose name contains this string")
+    parser.add_argument("--repeat", type=int, default=1, help="repeat each measurement and keep the best time")
+    parser.add_argument("--output", help="save results to this json file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name, paragraphs in load_corpora([1]):
+        if args.corpus and args.corpus not in name:
+            continue
+        for backend in args.backend:
+            iter_words = legacy_words if backend == "legacy" else Tokenizer.get(backend).iter_words
+            result = bench_backend(iter_words, paragraphs, args.repeat)
+            result.update({"corpus": name, "backend": backend})
+            results.append(result)
+            print("{:<35} {:<8} {:>8} sentences {:>9} tokens {:8.3f}s {:>10.0f} tok/s".format(
+                name, backend, result["sentences"], result["tokens"], result["seconds"], result["tokens_per_sec"]))
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results}, f, indent=2)
+        print("Results saved to {}".format(args.output))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
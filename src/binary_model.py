@@ -0,0 +1,319 @@
+import bisect
+import heapq
+import mmap
+import os
+import struct
+from array import array
+
+from src.model import NgramModel
+
+
+class Columns:
+    def __init__(self, columns):
+        """
+        Представлення кількох стовпців ідентифікаторів слів як послідовності кортежів (для пошуку модулем bisect).
+        Кортеж будується лише для тих рядків, які переглядає бінарний пошук
+        :param columns: список стовпців (кожен - memoryview з ідентифікаторами слів)
+        """
+        self.columns = columns
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def __getitem__(self, i):
+        return tuple(column[i] for column in self.columns)
+
+
+class Strings:
+    def __init__(self, offsets, data, base=0):
+        """
+        Представлення таблиці рядків (словника) як послідовності байтових рядків (для пошуку модулем bisect)
+        :param offsets: зміщення кінця кожного рядка відносно base (перший елемент - 0)
+        :param data: об'єкт, зріз якого повертає байти (mmap)
+        :param base: зміщення першого рядка в data
+        """
+        self.offsets = offsets
+        self.data = data
+        self.base = base
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.data[self.base + self.offsets[i]:self.base + self.offsets[i + 1]]
+
+
+class BinaryNgramModel:
+    magic = b"NGRM"
+    version = 1
+    # заголовок: сигнатура, версія, маркер порядку байтів, N, розмір словника, кількість типів N-грам,
+    # кількість типів (N-1)-грам, кількість записів таблиці Гуда-Тюрінга, кількість слів корпусу
+    header = struct.Struct("=4sIIIIIIIQ")
+    section = struct.Struct("=QQ")  # зміщення та довжина розділу в байтах
+    byte_order_mark = 0x01020304  # за ним перевіряється, що файл записано на машині з тим самим порядком байтів
+
+    def __init__(self, path):
+        """
+        Клас для отримання згладжених імовірностей N-грам з бінарного файлу моделі (див. export).
+        Файл відображається в пам'ять (mmap) лише для читання, масиви використовуються безпосередньо зі сторінок
+        файлу без перетворення, тому модель завантажується миттєво, а кілька процесів, що відкрили один і той самий
+        файл, спільно використовують одні й ті самі сторінки пам'яті. Пошук виконується бінарним пошуком
+        по відсортованих масивах. Набір методів такий самий, як у NgramModel
+        :param path: шлях до бінарного файлу моделі
+        """
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, byte_order_mark, self.n, self.vocabulary_size, ngrams_count, contexts_count, gt_count, \
+            self.tokens_count = self.header.unpack_from(self.mm, 0)
+        if magic != self.magic or version != self.version:
+            self.mm.close()
+            raise ValueError("{} is not a binary N-gram model".format(path))
+        if byte_order_mark != self.byte_order_mark:
+            self.mm.close()
+            raise ValueError("{} was written on a machine with different byte order".format(path))
+        self.views = []  # усі відкриті memoryview (мають бути звільнені перед закриттям mmap)
+        sections = iter(self.read_sections())
+        self.vocab_offsets = self.view(next(sections), "I")
+        vocab_data_offset = next(sections)[0]  # байти слів читаються безпосередньо зрізами mmap
+        self.vocab_counts = self.view(next(sections), "Q")
+        self.ngram_columns = [self.view(next(sections), "I") for _ in range(self.n)]
+        self.ngram_counts = self.view(next(sections), "Q")
+        self.context_columns = [self.view(next(sections), "I") for _ in range(self.n - 1)]
+        self.context_counts = self.view(next(sections), "Q")
+        self.context_sums = self.view(next(sections), "Q")
+        self.context_types = self.view(next(sections), "I")
+        self.gt_freqs = self.view(next(sections), "Q")
+        self.gt_counts = self.view(next(sections), "d")
+        self.words = Strings(self.vocab_offsets, self.mm, vocab_data_offset)
+        self.ngrams = Columns(self.ngram_columns)
+        self.contexts = Columns(self.context_columns)
+
+    @classmethod
+    def sections_count(cls, n):
+        """
+        :return: кількість розділів файлу моделі для N-грам порядку n
+        """
+        return 2 * n + 8
+
+    def read_sections(self):
+        """
+        :return: список пар (зміщення, довжина) усіх розділів файлу
+        """
+        return [self.section.unpack_from(self.mm, self.header.size + i * self.section.size)
+                for i in range(self.sections_count(self.n))]
+
+    def view(self, section, typecode):
+        """
+        :param section: пара (зміщення, довжина) розділу
+        :param typecode: тип елементів масиву (як у модулі array)
+        :return: memoryview розділу файлу як масив чисел (без копіювання)
+        """
+        offset, length = section
+        view = memoryview(self.mm)[offset:offset + length].cast(typecode)
+        self.views.append(view)
+        return view
+
+    def close(self):
+        """
+        Закриття файлу моделі
+        """
+        for view in self.views:
+            view.release()
+        self.views = []
+        self.mm.close()
+
+    def word_id(self, word):
+        """
+        :param word: слово
+        :return: ідентифікатор слова (номер у відсортованому словнику) або None, якщо слова немає у словнику
+        """
+        key = word.encode("utf-8")
+        i = bisect.bisect_left(self.words, key)
+        if i < len(self.words) and self.words[i] == key:
+            return i
+        return None
+
+    def encode(self, ngram):
+        """
+        :param ngram: N-грама у вигляді рядка
+        :return: кортеж ідентифікаторів слів або None, якщо хоча б одного слова немає у словнику
+        """
+        ids = []
+        for word in ngram.split(' '):
+            i = self.word_id(word)
+            if i is None:
+                return None
+            ids.append(i)
+        return tuple(ids)
+
+    @staticmethod
+    def find(rows, key):
+        """
+        :param rows: відсортована послідовність кортежів (Columns)
+        :param key: кортеж ідентифікаторів (повний рядок або його префікс)
+        :return: межі діапазону рядків, що починаються з key
+        """
+        prefix = Columns(rows.columns[:len(key)])
+        return bisect.bisect_left(prefix, key), bisect.bisect_right(prefix, key)
+
+    def count(self, ngram):
+        """
+        Частота N-грами в корпусі
+        :param ngram: N-грама у вигляді рядка "слово1 слово2 ... словоN" (порядку 1, N-1 або N)
+        :return: частота N-грами (0, якщо такої N-грами немає)
+        """
+        ids = self.encode(ngram)
+        if ids is None:
+            return 0
+        if len(ids) == 1:
+            return self.vocab_counts[ids[0]]
+        if len(ids) == self.n:
+            rows, counts = self.ngrams, self.ngram_counts
+        elif len(ids) == self.n - 1:
+            rows, counts = self.contexts, self.context_counts
+        else:
+            raise ValueError("Model contains only 1-grams, {}-grams and {}-grams".format(self.n - 1, self.n))
+        lo, hi = self.find(rows, ids)
+        return counts[lo] if lo < hi else 0
+
+    def context_stats(self, context):
+        """
+        :param context: (N-1)-грама (контекст h)
+        :return: частота контексту c(h) та кількість типів N-грам, що починаються з контексту, T(h)
+        (див. NgramModel.load_context_stats)
+        """
+        ids = self.encode(context)
+        if ids is None:
+            return 0, 0
+        lo, hi = self.find(self.contexts, ids)
+        if lo == hi:
+            return 0, 0
+        return self.context_sums[lo], self.context_types[lo]
+
+    def top_k_followers(self, context, k=10):
+        """
+        :param context: (N-1)-грама (контекст)
+        :param k: кількість слів
+        :return: список з k найчастіших слів, що йдуть після контексту, у форматі [(слово, частота N-грами)]
+        """
+        ids = self.encode(context)
+        if ids is None:
+            return []
+        lo, hi = self.find(self.ngrams, ids)
+        last, counts = self.ngram_columns[-1], self.ngram_counts
+        top = heapq.nlargest(k, range(lo, hi), key=lambda i: counts[i])
+        return [(self.words[last[i]].decode("utf-8"), counts[i]) for i in top]
+
+    def gt_count(self, c):
+        """
+        :param c: частота N-грами
+        :return: згладжена кількість Гуда-Тюрінга для цієї частоти (для частот, більших за поріг Катца - сама частота)
+        """
+        i = bisect.bisect_left(self.gt_freqs, c)
+        if i < len(self.gt_freqs) and self.gt_freqs[i] == c:
+            return self.gt_counts[i]
+        return c
+
+    # формули згладжування ті самі, що й у NgramModel: вони використовують лише count, context_stats та gt_count
+    prob = NgramModel.prob
+
+    @classmethod
+    def export(cls, db_path, path):
+        """
+        Запис бінарного файлу моделі з бази даних.
+        Файл складається із заголовка, таблиці розділів та розділів, вирівняних по 8 байтів:
+        1) словник: зміщення слів, байти слів (utf-8, відсортовані), частоти слів;
+        2) N-грами: N стовпців ідентифікаторів слів (рядки відсортовані), частоти;
+        3) (N-1)-грами: N-1 стовпців ідентифікаторів слів, частоти, c(h) та T(h) для згладжування Віттена-Белла;
+        4) таблиця Гуда-Тюрінга: частоти та згладжені кількості.
+        Ідентифікатор слова - це його номер у відсортованому словнику, тому рядки, відсортовані за
+        ідентифікаторами, N-грами з одним контекстом утворюють суцільний діапазон.
+        Файл спочатку записується під тимчасовим ім'ям і перейменовується лише після успішного запису
+        :param db_path: шлях до бази даних
+        :param path: шлях до бінарного файлу моделі
+        """
+        model = NgramModel(db_path)
+        try:
+            tables = model.tables_names
+            connection = model.connection
+            vocabulary = sorted(connection.execute("SELECT word, freq FROM {}".format(
+                tables["Vocabulary frequency table"])), key=lambda row: row[0].encode("utf-8"))
+            word_to_id = {word: i for i, (word, _) in enumerate(vocabulary)}
+            ngrams = cls.encoded_rows(connection, tables["ngrams frequency table"], word_to_id)
+            contexts = cls.encoded_rows(connection, tables["(n-1)-grams frequency table"], word_to_id)
+            types_counts = dict(connection.execute("SELECT n_minus1_gram, ngrams_types_count_ FROM {}".format(
+                tables["Smoothing"])))
+            gt_table = list(connection.execute("SELECT freq, gt_count FROM {} ORDER BY freq".format(
+                tables["Good-Turing estimation table"])))
+            n, tokens_count = model.n, model.tokens_count
+        finally:
+            model.close()
+
+        # c(h) та T(h) для кожного контексту - ті самі, що й у NgramModel.load_context_stats: частота (N-1)-грами
+        # та кількість типів з таблиці параметрів згладжування (обчислені за повними частотами, тому збігаються
+        # з параметрами обробки і для відсічених таблиць). Для контекстів без параметрів згладжування значення
+        # рахуються за N-грамами; N-грами відсортовані, тому N-грами одного контексту йдуть підряд
+        scanned = dict()
+        for ids, freq in ngrams:
+            stats = scanned.setdefault(ids[:-1], [0, 0])
+            stats[0] += freq
+            stats[1] += 1
+        id_to_word = [word for word, _ in vocabulary]
+        context_stats = dict()
+        for ids, freq in contexts:
+            t_h = types_counts.get(' '.join(id_to_word[i] for i in ids))
+            context_stats[ids] = (freq, t_h) if t_h is not None else scanned.get(ids, (0, 0))
+
+        offsets = array("I", [0])
+        data = bytearray()
+        for word, _ in vocabulary:
+            data += word.encode("utf-8")
+            offsets.append(len(data))
+        sections = [offsets, bytes(data), array("Q", (freq for _, freq in vocabulary))]
+        sections += [array("I", (ids[i] for ids, _ in ngrams)) for i in range(n)]
+        sections.append(array("Q", (freq for _, freq in ngrams)))
+        sections += [array("I", (ids[i] for ids, _ in contexts)) for i in range(n - 1)]
+        sections.append(array("Q", (freq for _, freq in contexts)))
+        sections.append(array("Q", (context_stats[ids][0] for ids, _ in contexts)))
+        sections.append(array("I", (context_stats[ids][1] for ids, _ in contexts)))
+        sections.append(array("Q", (freq for freq, _ in gt_table)))
+        sections.append(array("d", (gt_count for _, gt_count in gt_table)))
+
+        header = cls.header.pack(cls.magic, cls.version, cls.byte_order_mark, n, len(vocabulary), len(ngrams),
+                                 len(contexts), len(gt_table), tokens_count)
+        offset = cls.align(len(header) + cls.section.size * len(sections))
+        table = []
+        for data in sections:
+            size = len(data) * data.itemsize if isinstance(data, array) else len(data)
+            table.append((offset, size))
+            offset = cls.align(offset + size)
+
+        work_path = path + ".part"
+        try:
+            with open(work_path, "wb") as f:
+                f.write(header)
+                for section in table:
+                    f.write(cls.section.pack(*section))
+                for (offset, _), data in zip(table, sections):
+                    f.write(b"\0" * (offset - f.tell()))
+                    f.write(data)
+            os.replace(work_path, path)
+        except BaseException:
+            if os.path.exists(work_path):
+                os.remove(work_path)
+            raise
+
+    @staticmethod
+    def encoded_rows(connection, table, word_to_id):
+        """
+        :return: відсортований список пар (кортеж ідентифікаторів слів N-грами, частота) таблиці частот
+        """
+        return sorted((tuple(word_to_id[w] for w in ngram.split(' ')), freq)
+                      for ngram, freq in connection.execute("SELECT word, freq FROM {}".format(table)))
+
+    @staticmethod
+    def align(offset, alignment=8):
+        """
+        :return: найменше зміщення, не менше за offset, кратне alignment
+        """
+        return (offset + alignment - 1) // alignment * alignment
@@ -1,33 +1,114 @@
+import numpy as np
+from matplotlib.ticker import LogLocator, MaxNLocator
+
+
 class FrequencyChart:
     """
     Клас, що відповідає за побудову графіка частот частот
     """
+    # максимальна кількість точок одного графіка: довгі "хвости" рідкісних великих частот об'єднуються в інтервали,
+    # тому час побудови графіка не залежить від розміру корпусу
+    max_points = 400
+    max_ticks = 10  # максимальна кількість підписів на кожній осі
+
+    @staticmethod
+    def decimate(chart_data, column=1, log_scale=False, max_points=None):
+        """
+        Підготовка даних графіка: розпаковка по осях x, y та зменшення кількості точок. Якщо точок більше за
+        max_points, частоти об'єднуються в інтервали (у логарифмічному масштабі - однакової ширини в логарифмах,
+        тому малі частоти залишаються окремими точками, а об'єднуються лише частоти "хвоста"); точка інтервалу -
+        середня частота та середня кількість. Перша та остання точки і точка з найбільшою кількістю не
+        об'єднуються з іншими, тому межі графіка та його пік не зміщуються. У логарифмічному масштабі відкидаються
+        точки з нульовими значеннями
+        :param chart_data: дані для побудови графіка, рядки у вигляді [x, y, ...]
+        :param column: номер стовпця рядка для осі y
+        :param log_scale: логарифмічний масштаб осей
+        :param max_points: максимальна кількість точок (за замовчуванням - FrequencyChart.max_points)
+        :return: масиви numpy значень x та y
+        """
+        max_points = max_points or FrequencyChart.max_points
+        x = np.array([row[0] for row in chart_data], dtype=float)
+        y = np.array([row[column] for row in chart_data], dtype=float)
+        order = np.argsort(x, kind="stable")
+        x, y = x[order], y[order]
+        if log_scale:
+            positive = (x > 0) & (y > 0)
+            x, y = x[positive], y[positive]
+        if len(x) <= max_points:
+            return x, y
+        keep = np.unique([0, len(x) - 1, np.argmax(y)])  # точки, що залишаються без змін
+        rest = np.ones(len(x), dtype=bool)
+        rest[keep] = False
+        bins_count = max(max_points - len(keep), 1)
+        if log_scale:
+            edges = np.geomspace(x[0], x[-1], bins_count + 1)
+        else:
+            edges = np.linspace(x[0], x[-1], bins_count + 1)
+        bins = np.clip(np.searchsorted(edges, x[rest], side="right") - 1, 0, bins_count - 1)
+        counts = np.bincount(bins, minlength=bins_count)
+        nonempty = counts > 0
+        x_mean = np.bincount(bins, weights=x[rest], minlength=bins_count)[nonempty] / counts[nonempty]
+        y_mean = np.bincount(bins, weights=y[rest], minlength=bins_count)[nonempty] / counts[nonempty]
+        x, y = np.concatenate((x[keep], x_mean)), np.concatenate((y[keep], y_mean))
+        order = np.argsort(x, kind="stable")
+        return x[order], y[order]
+
+    @staticmethod
+    def set_axes(p, log_scale, y_label):
+        """
+        Налаштування осей: масштаб, обмежена кількість підписів та підписи осей
+        :param p: полотно графіка (matplotlib Axes)
+        :param log_scale: логарифмічний масштаб осей
+        :param y_label: підпис вертикальної осі
+        """
+        if log_scale:
+            p.set_xscale("log")
+            p.set_yscale("log")
+            p.xaxis.set_major_locator(LogLocator(numticks=FrequencyChart.max_ticks))
+            p.yaxis.set_major_locator(LogLocator(numticks=FrequencyChart.max_ticks))
+        else:
+            p.xaxis.set_major_locator(MaxNLocator(nbins=FrequencyChart.max_ticks, integer=True))
+            p.yaxis.set_major_locator(MaxNLocator(nbins=FrequencyChart.max_ticks, integer=True))
+        # Підпис горизонтальної осі
+        p.annotate('Frequency', xy=(0.98, 0), ha='left', va='top', xycoords='axes fraction', fontsize=10)
+        # Підпис вертикальної осі
+        p.annotate(y_label, xy=(0, 1.03), xytext=(-15, 2), ha='left', va='top', xycoords='axes fraction',
+                   textcoords='offset points', fontsize=10)
 
     @staticmethod
-    def chart_draw(f, chart_data):
+    def chart_draw(f, chart_data, log_scale=False):
         """
         Функція відповідає за побудову графіка
         :param f: фігура, що створється на полотні canvas
         :param chart_data: дані для побудови графіка, список списків, де кожний елемент представлений у вигляді  [x,y]
+        :param log_scale: логарифмічний масштаб обох осей
         """
         p = f.add_subplot(111)  # додавання полотна на фігуру, де буде намальовано графік
         p.cla()  # очищення полотна перед малюванням нового графіка
-        x = []
-        y = []
-        for i in range(len(chart_data)):  # розпаковка даних по осях x, y
-            x.append(chart_data[i][0])
-            y.append(chart_data[i][1])
+        x, y = FrequencyChart.decimate(chart_data, log_scale=log_scale)  # розпаковка даних по осях x, y
 
-        x_labels = x.copy()  # підписи осі x - частоти
-        p.set_xticks(x_labels)
-        y_labels = y.copy()  # підписи осі y - відповідні кількості частот
-        p.set_yticks(y_labels)
+        # точки з'єднуються зеленою лінією, кожна точка - синій маркер (одна лінія замість двох)
+        p.plot(x, y, 'g-', marker='o', markerfacecolor='b', markeredgecolor='b',
+               markersize=4 if len(x) > 50 else 6)
+        if not log_scale:  # у логарифмічному масштабі область "до нуля" не має сенсу
+            p.fill_between(x, y, 0, color='b', alpha=.1, hatch="/")  # зафарбовування області під графіком
+        FrequencyChart.set_axes(p, log_scale, 'Quantity')
 
-        p.plot(x, y, 'g-')  # нанесення на графік, точки з'єднуються зеленою лінією
-        p.plot(x, y, 'bo')  # нанесення на графік (синій маркер)
-        p.fill_between(x, y, 0, color='b', alpha=.1, hatch="/")  # зафарбовування області під графіком
-        # Підпис горизонтальної осі
-        p.annotate('Frequency', xy=(0.98, 0), ha='left', va='top', xycoords='axes fraction', fontsize=10)
-        # Підпис вертикальної осі
-        p.annotate('Quantity', xy=(0, 1.03), xytext=(-15, 2), ha='left', va='top', xycoords='axes fraction',
-                   textcoords='offset points', fontsize=10)
+    @staticmethod
+    def chart_draw_series(f, series, column=1, log_scale=False):
+        """
+        Побудова кількох графіків на одному полотні (наприклад, для різних пар (N, k) при перебиранні параметрів)
+        :param f: фігура, що створється на полотні canvas
+        :param series: словник {підпис графіка: дані для побудови графіка}, дані - рядки таблиці згладжування
+        Гуда-Тюрінга (частота, кількість частот, оцінка частоти)
+        :param column: номер стовпця таблиці для вертикальної осі: 1 - кількість частот, 2 - оцінка частоти
+        за Гудом-Тюрінгом (залежить від порогу Катца)
+        :param log_scale: логарифмічний масштаб обох осей
+        """
+        p = f.add_subplot(111)
+        p.cla()
+        for label, chart_data in series.items():
+            x, y = FrequencyChart.decimate(chart_data, column, log_scale)
+            p.plot(x, y, '-o', markersize=3, label=label)  # кожен графік - своїм кольором
+        p.legend()
+        FrequencyChart.set_axes(p, log_scale, 'Quantity' if column == 1 else 'Good-Turing count')
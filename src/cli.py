@@ -0,0 +1,337 @@
+"""
+Запуск обробки корпусів тексту з командного рядка (без графічного інтерфейсу)
+Приклад:
+    python -m src.cli corpora/*.txt -n 2 3 -k 5 --output-dir results --jobs 4 --summary results/summary.json
+Модуль не імпортує tkinter та matplotlib, тому його можна запускати на серверах без графічного середовища
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from src.binary_model import BinaryNgramModel
+from src.corpus import CorpusReader
+from src.database import Database
+from src.ngrams import Ngrams
+from src.pruning import Pruning
+from src.sweep import NgramsSweep
+from src.tokenizer import Tokenizer
+
+
+def parse_args(argv=None):
+    """
+    Парсинг аргументів командного рядка
+    :param argv: список аргументів (за замовчуванням - sys.argv)
+    :return: об'єкт з параметрами запуску
+    """
+    parser = argparse.ArgumentParser(prog="python -m src.cli",
+                                     description="Build N-gram frequency tables and smoothing parameters")
+    parser.add_argument("corpora", nargs="+",
+                        help="corpus .txt file(s) (also .gz, .bz2, .xz), directories, glob patterns (quoted) or "
+                             ".lst/.manifest files listing corpus files")
+    parser.add_argument("-n", type=int, nargs="+", default=[2], help="N for N-grams (several values allowed)")
+    parser.add_argument("-k", type=int, nargs="+", default=[5], help="Katz threshold (several values allowed)")
+    parser.add_argument("--gt-method", choices=("katz", "simple"), default="katz",
+                        help="Good-Turing estimation: with Katz threshold or Simple Good-Turing")
+    parser.add_argument("--tokenizer", choices=sorted(Tokenizer.registry), default="punkt",
+                        help="sentence splitter: nltk Punkt model or a faster regular expression")
+    parser.add_argument("--approximate", action="store_true",
+                        help="memory-bounded approximate counting (Count-Min sketch + heavy hitters)")
+    parser.add_argument("--epsilon", type=float, default=1e-5, help="approximate mode: Count-Min relative error")
+    parser.add_argument("--delta", type=float, default=1e-3, help="approximate mode: Count-Min failure probability")
+    parser.add_argument("--top-k", type=int, default=100000,
+                        help="approximate mode: number of most frequent N-grams written per order")
+    parser.add_argument("--sample-rate", type=float, default=0.01,
+                        help="approximate mode: fraction of N-gram types counted exactly for smoothing estimates")
+    parser.add_argument("--max-entries", type=int,
+                        help="exact external counting: spill N-gram counts to sorted temporary files above this size")
+    parser.add_argument("--min-count", nargs="+", metavar="[ORDER:]COUNT",
+                        help="write only N-grams with at least COUNT occurrences (for one order or, without ORDER, "
+                             "for all orders above 1); smoothing is still estimated from the full counts")
+    parser.add_argument("--max-vocab", type=int, help="keep only the most frequent words, map the rest to <unk>")
+    parser.add_argument("--prune-top-k", type=int, metavar="K",
+                        help="write at most K most frequent N-grams per context")
+    parser.add_argument("--tmp-dir", help="directory for temporary files of external counting")
+    parser.add_argument("--token-cache", help="directory of the persistent tokenization cache: re-running a corpus "
+                                              "with the same tokenizer (e.g. for another N) skips sentence splitting")
+    parser.add_argument("-o", "--output-dir", default=".", help="directory for databases and csv files")
+    parser.add_argument("--db", default="{n}-grams{corpus}.db",
+                        help="database file name template, {n}, {k} and {corpus} are replaced by N, Katz threshold "
+                             "and corpus name ({n}, {k} and {corpus} are required when several values are given)")
+    parser.add_argument("--sweep", action="store_true",
+                        help="count each corpus once for the largest N and write a database for every (N, k) pair")
+    parser.add_argument("-j", "--jobs", type=int, default=1, help="number of jobs (corpus, N) run in parallel")
+    parser.add_argument("-w", "--workers", type=int, default=1, help="number of counting processes per job")
+    parser.add_argument("--readers", type=int, default=4,
+                        help="number of threads reading files of a multi-file corpus ahead of counting")
+    parser.add_argument("--append", action="store_true", help="append counts to existing databases")
+    parser.add_argument("--without-rowid", action="store_true", help="create WITHOUT ROWID N-gram tables")
+    parser.add_argument("--binary", action="store_true",
+                        help="also export a memory-mappable binary model (.ngm) next to each database")
+    parser.add_argument("--trie", action="store_true",
+                        help="also save a trie of N-gram counts of all orders (.trie.npz) next to each database "
+                             "(one per corpus with --sweep); it can be reloaded with NgramTrie.load")
+    parser.add_argument("--summary", help="write JSON run summary (with per-stage metrics of every job) to this file "
+                                          "('-' for stdout)")
+    parser.add_argument("--profile", nargs="+", metavar="STAGE",
+                        help="profile these stages (tokenize, count, merge, smoothing, csv write, db write or all)")
+    parser.add_argument("--profiler", choices=("cprofile", "tracemalloc"), default="cprofile",
+                        help="profiling tool: function timings or Python memory allocations")
+    parser.add_argument("--profile-dir", help="directory for cProfile .prof files (one subdirectory per job)")
+    parser.add_argument("--gt-range", type=int, nargs=2, metavar=("LOWER", "UPPER"),
+                        help="include Good-Turing table rows with frequency in [LOWER, UPPER] in the summary")
+    args = parser.parse_args(argv)
+    for n in args.n:
+        if n < 2:
+            parser.error("N must be at least 2")
+    if min(args.k) < 0:
+        parser.error("Katz threshold must not be negative")
+    if args.readers < 1:
+        parser.error("number of readers must be at least 1")
+    if len(args.n) > 1 and "{n}" not in args.db:
+        parser.error("--db must contain {n} when several N are given")
+    if len(args.k) > 1 and "{k}" not in args.db:
+        parser.error("--db must contain {k} when several Katz thresholds are given")
+    if len(args.corpora) > 1 and "{corpus}" not in args.db:
+        parser.error("--db must contain {corpus} when several corpora are given")
+    if args.sweep and (args.append or args.approximate or args.max_entries is not None):
+        parser.error("--sweep cannot be combined with --append, --approximate or --max-entries")
+    if args.trie and (args.append or args.approximate or args.max_entries is not None):
+        parser.error("--trie cannot be combined with --append, --approximate or --max-entries")
+    if args.approximate and (args.append or args.workers > 1):
+        parser.error("--approximate cannot be combined with --append or --workers")
+    if args.max_entries is not None and (args.append or args.workers > 1 or args.approximate):
+        parser.error("--max-entries cannot be combined with --append, --workers or --approximate")
+    if not 0 < args.sample_rate <= 1:
+        parser.error("sample rate must be in (0, 1]")
+    args.prune = None
+    if args.min_count is not None or args.max_vocab is not None or args.prune_top_k is not None:
+        if args.append or args.approximate or args.max_entries is not None:
+            parser.error("pruning cannot be combined with --append, --approximate or --max-entries")
+        try:
+            args.prune = {"min_counts": parse_min_counts(args.min_count or []), "max_vocab": args.max_vocab,
+                          "top_k": args.prune_top_k}
+            Pruning(**args.prune)  # перевірка значень параметрів
+        except ValueError as e:
+            parser.error(str(e))
+    try:
+        check_output_paths(make_jobs(args))
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def parse_min_counts(values):
+    """
+    :param values: список значень параметра --min-count у форматі "ПОРЯДОК:ЧАСТОТА" або "ЧАСТОТА"
+    :return: найменші частоти для Pruning: число (для усіх порядків, більших за 1) або словник {порядок: частота}
+    """
+    min_counts = dict()
+    for value in values:
+        order, _, count = value.rpartition(":")
+        if not count.isdigit() or order and not order.isdigit():
+            raise ValueError("invalid --min-count value: {}".format(value))
+        if not order:
+            if len(values) > 1:
+                raise ValueError("--min-count without ORDER must be the only value")
+            return int(count)
+        min_counts[int(order)] = int(count)
+    return min_counts or None
+
+
+def make_jobs(args):
+    """
+    Побудова списку завдань: кожне завдання - це обробка одного корпусу для одного значення N та порогу Катца,
+    а в режимі перебору параметрів (--sweep) - обробка одного корпусу для усіх пар (N, k)
+    :param args: параметри запуску
+    :return: список словників з параметрами завдань
+    """
+    jobs = []
+    for corpus in args.corpora:
+        # для теки ім'я корпусу - ім'я теки (шлях може закінчуватись роздільником)
+        corpus_name, ext = os.path.splitext(os.path.basename(os.path.normpath(corpus)))
+        if ext.lower() in CorpusReader.compressions:  # для стисненого файлу відкидається і розширення тексту
+            corpus_name = os.path.splitext(corpus_name)[0]
+        if args.sweep:
+            # шаблон шляхів до баз даних: {n} та {k} заповнюються під час перебору (див. NgramsSweep)
+            configs = [(args.n, args.k, args.db.format(n="{n}", k="{k}", corpus=corpus_name))]
+        else:
+            configs = [(n, k, args.db.format(n=n, k=k, corpus=corpus_name)) for n in args.n for k in args.k]
+        for n, k, db in configs:
+            job_name = corpus_name if args.sweep else os.path.splitext(db)[0]
+            # дерево N-грам не залежить від k, тому при перебиранні параметрів записується одне дерево на корпус
+            trie = os.path.join(args.output_dir, job_name + ".trie.npz") if args.trie else None
+            jobs.append({
+                "corpus": corpus,
+                "n": n,
+                "k": k,
+                "sweep": args.sweep,
+                "gt_method": args.gt_method,
+                "tokenizer": args.tokenizer,
+                "db": os.path.join(args.output_dir, db),
+                # csv-файли кожного завдання записуються до окремої теки, щоб паралельні завдання не заважали
+                # одне одному
+                "csv_dir": os.path.join(args.output_dir, "csv_files", job_name),
+                "workers": args.workers,
+                "readers": args.readers,
+                "append": args.append,
+                "without_rowid": args.without_rowid,
+                "binary": args.binary,
+                "sketch": {"epsilon": args.epsilon, "delta": args.delta, "top_k": args.top_k,
+                           "sample_rate": args.sample_rate} if args.approximate else None,
+                "max_entries": args.max_entries,
+                "tmp_dir": args.tmp_dir,
+                "token_cache": args.token_cache,
+                "gt_range": args.gt_range,
+                "prune": args.prune,
+                "trie": trie,
+                "profile": {"profile_stages": "all" if "all" in args.profile else args.profile,
+                            "profiler": args.profiler,
+                            "profile_dir": os.path.join(args.profile_dir, job_name) if args.profile_dir else None}
+                if args.profile else None,
+            })
+    return jobs
+
+
+def check_output_paths(jobs):
+    """
+    Перевірка, що завдання не записують результати до тих самих файлів: корпуси з однаковими іменами
+    (наприклад, "x.txt" та "x.txt.gz" або файли з однаковими іменами в різних теках) отримали б спільну
+    базу даних та теку csv-файлів, і паралельні завдання пошкодили б їх, а послідовні - перезаписали б
+    :param jobs: список завдань (див. make_jobs)
+    """
+    owners = dict()  # {шлях до бази даних чи теки csv-файлів: корпус завдання}
+    for job in jobs:
+        if job["sweep"]:  # шаблон шляху заповнюється для кожної пари (N, k) (див. NgramsSweep)
+            paths = {job["db"].format(n=n, k=k) for n in job["n"] for k in job["k"]}
+        else:
+            paths = {job["db"]}
+        paths.add(job["csv_dir"])
+        for path in paths:
+            key = os.path.normcase(os.path.abspath(path))
+            if key in owners:
+                raise ValueError("jobs for {} and {} would write to the same path {} (use {{corpus}}, {{n}} and "
+                                 "{{k}} in --db or rename the corpora)".format(owners[key], job["corpus"], path))
+            owners[key] = job["corpus"]
+
+
+def run_job(job):
+    """
+    Виконання одного завдання (може виконуватись в окремому процесі)
+    :param job: словник з параметрами завдання
+    :return: словник з результатами завдання для звіту (тривалість, кількості, помилка)
+    """
+    summary = dict(job)
+    start = time.perf_counter()
+    try:
+        os.makedirs(job["csv_dir"], exist_ok=True)
+        db_dir = os.path.dirname(job["db"])
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        if job["profile"] and job["profile"]["profile_dir"]:
+            os.makedirs(job["profile"]["profile_dir"], exist_ok=True)
+        if job["sweep"]:
+            ngrams = NgramsSweep(job["n"], job["k"], job["corpus"], job["db"], workers=job["workers"],
+                                 readers=job["readers"], without_rowid=job["without_rowid"], csv_dir=job["csv_dir"],
+                                 gt_method=job["gt_method"], tokenizer=job["tokenizer"], token_cache=job["token_cache"],
+                                 profile=job["profile"], prune=job["prune"], trie=job["trie"])
+            summary["db"] = list(ngrams.db_paths.values())
+        else:
+            ngrams = Ngrams(job["n"], job["k"], job["corpus"], job["db"], workers=job["workers"],
+                            readers=job["readers"], append=job["append"], without_rowid=job["without_rowid"],
+                            csv_dir=job["csv_dir"], gt_method=job["gt_method"], tokenizer=job["tokenizer"],
+                            sketch=job["sketch"], max_entries=job["max_entries"], tmp_dir=job["tmp_dir"],
+                            token_cache=job["token_cache"], profile=job["profile"], prune=job["prune"],
+                            trie=job["trie"])
+        if job["binary"]:
+            db_paths = summary["db"] if job["sweep"] else [job["db"]]
+            summary["binary"] = [os.path.splitext(db)[0] + ".ngm" for db in db_paths]
+            for db, binary in zip(db_paths, summary["binary"]):
+                BinaryNgramModel.export(db, binary)
+            if not job["sweep"]:
+                summary["binary"] = summary["binary"][0]
+    except Exception as e:
+        summary["status"] = "error"
+        summary["error"] = "{}: {}".format(type(e).__name__, e)
+    else:
+        counter = ngrams.counter
+        summary["status"] = "ok"
+        summary["timings"] = ngrams.timings
+        summary["stats"] = ngrams.stats.as_dict()
+        summary["sentences"] = counter.sentences_count
+        summary["tokens"] = counter.tokens_count
+        summary["vocabulary_size"] = counter.types_count(1)
+        if ngrams.file_stats:  # корпус з кількох файлів
+            summary["files"] = ngrams.file_stats
+        if job["sweep"]:  # кількості типів для кожного N
+            summary["ngrams_types"] = {n: counter.types_count(n) for n in job["n"]}
+            summary["n_minus1_grams_types"] = {n: counter.types_count(n - 1) for n in job["n"]}
+        else:
+            summary["ngrams_types"] = counter.types_count(job["n"])
+            summary["n_minus1_grams_types"] = counter.types_count(job["n"] - 1)
+        if job["gt_range"] is not None:  # з бази даних читаються лише рядки у вказаних межах частот
+            summary["good_turing"] = [load_gt_range(db, *job["gt_range"])
+                                      for db in (summary["db"] if job["sweep"] else [job["db"]])]
+        if job["sketch"] is not None:  # у наближеному режимі кількості типів N-грам - оцінки
+            summary["error_bounds"] = counter.error_bounds()
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def load_gt_range(db_path, lower, upper):
+    """
+    :param db_path: шлях до бази даних
+    :param lower: нижня межа частот
+    :param upper: верхня межа частот
+    :return: словник для звіту: шлях до бази даних, найбільша частота та рядки таблиці Гуда-Тюрінга в межах частот
+    """
+    db = Database(db_path, drop=False)
+    try:
+        return {"db": db_path, "max_freq": db.max_freq(), "rows": db.load_gt_range(lower, upper)}
+    finally:
+        db.close()
+
+
+def run_jobs(jobs, parallel_jobs):
+    """
+    Виконання завдань послідовно або паралельно (у пулі процесів)
+    :param jobs: список завдань
+    :param parallel_jobs: кількість завдань, що виконуються одночасно
+    :return: список результатів завдань у порядку завдань
+    """
+    if parallel_jobs > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=parallel_jobs) as executor:
+            return list(executor.map(run_job, jobs))
+    return [run_job(job) for job in jobs]
+
+
+def main(argv=None):
+    """
+    Точка входу командного рядка
+    :param argv: список аргументів (за замовчуванням - sys.argv)
+    :return: код завершення: 0 - усі завдання виконано успішно, 1 - хоча б одне завдання завершилось з помилкою
+    """
+    args = parse_args(argv)
+    start = time.perf_counter()
+    results = run_jobs(make_jobs(args), args.jobs)
+    for result in results:
+        if result["status"] == "ok":
+            print("{corpus} N={n} k={k}: {sentences} sentences, {ngrams_types} N-gram types, {seconds:.2f}s -> {db}"
+                  .format(**result), file=sys.stderr)
+        else:
+            print("{corpus} N={n} k={k}: {error}".format(**result), file=sys.stderr)
+    summary = {"jobs": results, "seconds": time.perf_counter() - start}
+    if args.summary == "-":
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    elif args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 0 if all(result["status"] == "ok" for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+import bz2
+import codecs
+import glob
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CorpusReader:
+    """
+    Клас, що відповідає за читання файлів корпусу тексту
+    """
+
+    # кодування, у яких пробуємо прочитати файл корпусу (по черзі)
+    # суфікс -sig означає, що не враховуємо BOM-байт (Byte Order Mark)
+    encodings = ('utf-8-sig', 'windows-1251')
+    # кодування визначається за початком файлу такого розміру (у байтах, після розпакування)
+    sample_size = 1 << 20
+    # стиснені файли корпусу розпаковуються "на льоту": {розширення: функція відкриття файлу}
+    compressions = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+    # корпус з кількох файлів можна задати текою (читаються усі файли з цими розширеннями, включно з підтеками,
+    # також стиснені), шаблоном шляхів (glob) або файлом-маніфестом з цими розширеннями (по одному шляху в рядку)
+    text_suffixes = ('.txt',)
+    manifest_suffixes = ('.lst', '.manifest')
+
+    @classmethod
+    def read_file(cls, filename):
+        """
+        Прочитання текстового файлу корпусу тексту повністю у пам'ять
+        :param filename: ім'я текстового файлу
+        :return: вміст прочитаного текстового файлу (список рядків)
+        """
+        return list(cls.iter_paragraphs(filename))
+
+    @classmethod
+    def open_binary(cls, filename):
+        """
+        :param filename: ім'я файлу корпусу (можливо, стисненого - див. compressions)
+        :return: файловий об'єкт, що повертає розпаковані байти файлу
+        """
+        open_file = cls.compressions.get(os.path.splitext(filename)[1].lower(), open)
+        return open_file(filename, 'rb')
+
+    @classmethod
+    def detect_encoding(cls, sample):
+        """
+        Визначення кодування за початком файлу: перше кодування, у якому початок файлу декодується без помилок.
+        Останній байтовий символ може бути обрізаний межею початку файлу, тому декодування не завершується (final)
+        :param sample: перші байти файлу
+        :return: назва кодування
+        """
+        for encoding in cls.encodings[:-1]:
+            try:
+                codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+                return encoding
+            except UnicodeDecodeError:
+                pass
+        return cls.encodings[-1]
+
+    @staticmethod
+    def decode_fallback(error):
+        """
+        Обробник помилок декодування (codecs.register_error): байти, що не декодуються у визначеному кодуванні
+        (трапляються лише після перевіреного початку файлу), декодуються в останньому з кодувань CorpusReader,
+        тому файл не перечитується повторно
+        :param error: помилка декодування UnicodeDecodeError
+        :return: замінний текст та позиція, з якої продовжується декодування
+        """
+        if not isinstance(error, UnicodeDecodeError):
+            raise error
+        text = error.object[error.start:error.end].decode(CorpusReader.encodings[-1], 'replace')
+        return text, error.end
+
+    @classmethod
+    def iter_paragraphs(cls, filename):
+        """
+        Потокове прочитання текстового файлу корпусу тексту: рядки (параграфи) повертаються по одному,
+        тому у пам'яті ніколи не зберігається весь файл. Стиснені файли (.gz, .bz2, .xz) розпаковуються потоково.
+        Кодування визначається за початком файлу (sample_size байтів, див. detect_encoding), після чого файл
+        декодується за один прохід
+        :param filename: ім'я текстового файлу
+        :return: генератор рядків файлу
+        """
+        with cls.open_binary(filename) as f:
+            encoding = cls.detect_encoding(f.read(cls.sample_size))
+            f.seek(0)  # повернення на початок обмеженого фрагмента (для стиснених файлів - розпакування початку)
+            with io.TextIOWrapper(f, encoding=encoding, errors='corpus-fallback') as text:
+                yield from text
+
+    @classmethod
+    def is_multi_file(cls, spec):
+        """
+        :param spec: корпус тексту (див. Ngrams)
+        :return: True, якщо корпус задано текою, шаблоном шляхів (glob) або маніфестом
+        """
+        return isinstance(spec, str) and (os.path.isdir(spec) or glob.has_magic(spec) or
+                                          spec.lower().endswith(cls.manifest_suffixes))
+
+    @classmethod
+    def resolve(cls, spec):
+        """
+        Список файлів корпусу: файли теки впорядковуються за шляхом, файли маніфесту - у порядку маніфесту
+        (відносні шляхи - відносно теки маніфесту, порожні рядки та рядки, що починаються з "#", пропускаються)
+        :param spec: шлях до теки, шаблон шляхів (glob), шлях до маніфесту або шлях до одного файлу
+        :return: список шляхів до файлів корпусу
+        """
+        if os.path.isdir(spec):
+            suffixes = tuple(s + c for s in cls.text_suffixes for c in ('',) + tuple(cls.compressions))
+            files = sorted(os.path.join(root, name) for root, _, names in os.walk(spec)
+                           for name in names if name.lower().endswith(suffixes))
+        elif spec.lower().endswith(cls.manifest_suffixes):
+            base = os.path.dirname(spec)
+            with open(spec, encoding='utf-8-sig') as f:
+                files = [os.path.join(base, line.strip()) for line in f
+                         if line.strip() and not line.lstrip().startswith('#')]
+        elif glob.has_magic(spec):
+            files = sorted(glob.glob(spec, recursive=True))
+        else:
+            files = [spec]
+        if not files:
+            raise ValueError("No corpus files found: {}".format(spec))
+        return files
+
+    @classmethod
+    def read_file_stats(cls, filename):
+        """
+        Прочитання файлу корпусу разом зі статистикою читання (виконується в потоці читання)
+        :param filename: ім'я текстового файлу
+        :return: список рядків файлу та словник статистики (шлях, хеш вмісту, розмір файлу у байтах,
+        тривалість читання)
+        """
+        start = time.perf_counter()
+        paragraphs = cls.read_file(filename)
+        content_hash = hashlib.sha256()
+        for p in paragraphs:
+            content_hash.update(p.encode('utf-8'))
+        return paragraphs, {"path": filename, "hash": content_hash.hexdigest(), "bytes": os.path.getsize(filename),
+                            "read_seconds": time.perf_counter() - start}
+
+    @classmethod
+    def read_files(cls, files, readers=4):
+        """
+        Паралельне читання файлів корпусу пулом з readers потоків: поки основний потік обробляє прочитаний файл,
+        наступні файли вже читаються з диска. Одночасно прочитується не більше 2 * readers файлів,
+        тому у пам'яті ніколи не зберігається весь корпус; файли повертаються в порядку списку
+        :param files: список шляхів до файлів
+        :param readers: кількість потоків читання
+        :return: генератор пар (список рядків файлу, словник статистики читання - див. read_file_stats)
+        """
+        files = iter(files)
+        with ThreadPoolExecutor(max_workers=readers) as executor:
+            pending = deque()
+            try:
+                while True:
+                    while len(pending) < 2 * readers:
+                        filename = next(files, None)
+                        if filename is None:
+                            break
+                        pending.append(executor.submit(cls.read_file_stats, filename))
+                    if not pending:
+                        break
+                    yield pending.popleft().result()
+            finally:  # при зупинці обробки файли, що ще не почали читатись, не читаються
+                for future in pending:
+                    future.cancel()
+
+
+codecs.register_error('corpus-fallback', CorpusReader.decode_fallback)
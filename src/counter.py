@@ -0,0 +1,201 @@
+from src.good_turing import GoodTuring
+from src.vocabulary import Vocabulary
+
+
+class NgramCounter:
+    def __init__(self, n, all_orders=False):
+        """
+        Клас, що за один прохід по корпусу укладає частотні словники N-грам кількох порядків.
+        Кожне речення розбивається на слова лише один раз, після чого з того самого списку слів оновлюються
+        частотні словники усіх потрібних порядків.
+        Слова зберігаються у вигляді цілочисельних ідентифікаторів (див. Vocabulary), N-грами - у вигляді
+        запакованих цілочисельних ключів. До тексту ключі перетворюються лише при записі результатів (decode)
+        :param n: найбільший порядок N-грам
+        :param all_orders: якщо True - рахуються N-грами усіх порядків від 1 до N,
+        інакше - лише словник слів (1-грами), (N-1)-грами та N-грами
+        """
+        self.n = n
+        if all_orders:
+            self.orders = list(range(1, n + 1))
+        else:
+            self.orders = sorted({1, n - 1, n} - {0})
+        self.vocabulary = Vocabulary()
+        # частотні словники у форматі {порядок: {ключ N-грами: частота}}
+        self.counts = {order: dict() for order in self.orders}
+        # індекс продовжень для N-грам найбільшого порядку у форматі
+        # {ключ (N-1)-грами: [ідентифікатори слів, що йдуть після неї]}
+        # слово додається до списку лише тоді, коли відповідний тип N-грами зустрічається вперше,
+        # тому індекс має розмір, лінійний від кількості типів N-грам
+        self.followers = dict()
+        self.track_followers = True  # чи будувати індекс продовжень
+        self.sentences_count = 0  # кількість оброблених речень
+        self.tokens_count = 0  # кількість оброблених слів (з повторами)
+
+    def update(self, words):
+        """
+        Оновлення частотних словників словами одного речення
+        :param words: список слів речення
+        """
+        self.update_ids(self.vocabulary.encode(words))
+
+    def update_ids(self, ids):
+        """
+        Оновлення частотних словників ідентифікаторами слів одного речення
+        :param ids: список ідентифікаторів слів речення
+        """
+        self.sentences_count += 1
+        self.tokens_count += len(ids)
+        bits = Vocabulary.id_bits
+        for order in self.orders:
+            d = self.counts[order]
+            if order == 1:  # 1-грами - це самі ідентифікатори слів
+                for key in ids:
+                    d[key] = d.get(key, 0) + 1
+                continue
+            # ключ N-грами будується "ковзним вікном": до попереднього ключа дописується нове слово,
+            # а перше слово відкидається маскою
+            mask = (1 << (bits * order)) - 1
+            top = order == self.n and self.track_followers
+            key = 0
+            for i, word_id in enumerate(ids):
+                key = ((key << bits) | word_id) & mask
+                if i < order - 1:  # вікно ще не заповнене
+                    continue
+                if key in d:
+                    d[key] += 1
+                else:
+                    d[key] = 1
+                    if top:  # новий тип N-грами - додаємо останнє слово до продовжень контексту
+                        self.followers.setdefault(key >> bits, []).append(word_id)
+
+    def merge(self, other):
+        """
+        Додавання до частотних словників результатів іншого лічильника (наприклад, підрахованих в окремому процесі
+        для частини корпусу). Ідентифікатори слів іншого лічильника переводяться в ідентифікатори цього словника.
+        Якщо частини корпусу об'єднуються в тому ж порядку, в якому вони йдуть у корпусі, результат (зокрема порядок
+        слів, N-грам та продовжень) повністю збігається з результатом послідовного підрахунку
+        :param other: об'єкт NgramCounter з тими самими порядками N-грам
+        """
+        bits = Vocabulary.id_bits
+        # відповідність: ідентифікатор слова в іншому лічильнику -> ідентифікатор у цьому
+        remap = [self.vocabulary.add(w) for w in other.vocabulary.id_to_word]
+        self.sentences_count += other.sentences_count
+        self.tokens_count += other.tokens_count
+        for order in self.orders:
+            d = self.counts[order]
+            top = order == self.n and order > 1
+            for key, freq in other.counts[order].items():
+                if order == 1:
+                    key = remap[key]
+                else:
+                    key = Vocabulary.pack([remap[i] for i in Vocabulary.unpack(key, order)])
+                if key in d:
+                    d[key] += freq
+                else:
+                    d[key] = freq
+                    if top:
+                        self.followers.setdefault(key >> bits, []).append(key & Vocabulary.id_mask)
+
+    def map_vocabulary(self, max_vocab=None, unk="<unk>", min_count=1):
+        """
+        Обмеження словника слів: залишаються max_vocab найчастіших слів з частотою не менше min_count
+        (при однакових частотах - ті, що з'явились у корпусі раніше), усі інші слова замінюються одним словом unk,
+        а частоти N-грам, що після заміни збіглися, додаються. Результат (зокрема порядок слів, N-грам
+        та продовжень) такий самий, як при заміні слів безпосередньо після поділу речень на слова, але корпус
+        не потрібно обробляти двічі
+        :param max_vocab: найбільша кількість слів словника (без unk), None - без обмеження
+        :param unk: слово, яким замінюються рідкісні слова
+        :param min_count: найменша частота слів, що залишаються
+        :return: кількість замінених слів словника
+        """
+        words_counts = self.counts[1]
+        # ідентифікатори слів - це ключі частотного словника 1-грам, впорядковані за першою появою
+        kept = [word_id for word_id, freq in words_counts.items() if freq >= min_count]
+        if max_vocab is not None and len(kept) > max_vocab:
+            kept = sorted(kept, key=lambda word_id: -words_counts[word_id])[:max_vocab]
+        if len(kept) == len(words_counts):
+            return 0
+        kept = set(kept)
+        vocabulary = Vocabulary()
+        remap = [vocabulary.add(w if i in kept else unk) for i, w in enumerate(self.vocabulary.id_to_word)]
+        bits = Vocabulary.id_bits
+        mask = Vocabulary.id_mask
+        self.vocabulary = vocabulary
+        self.followers = dict()
+        for order in self.orders:
+            counts = dict()
+            top = order == self.n and self.track_followers
+            for key, freq in self.counts[order].items():
+                new_key = 0
+                for shift in range(bits * (order - 1), -1, -bits):
+                    new_key = (new_key << bits) | remap[(key >> shift) & mask]
+                if new_key in counts:
+                    counts[new_key] += freq
+                else:
+                    counts[new_key] = freq
+                    if top:
+                        self.followers.setdefault(new_key >> bits, []).append(new_key & mask)
+            self.counts[order] = counts
+        return len(remap) - len(kept)
+
+    def get_followers(self, context):
+        """
+        :param context: (N-1)-грама (контекст) у вигляді рядка
+        :return: список слів, що хоча б раз зустрілись у корпусі після цього контексту
+        """
+        key = self.vocabulary.encode_ngram(context)
+        id_to_word = self.vocabulary.id_to_word
+        return [id_to_word[i] for i in self.followers.get(key, [])]
+
+    def get_types_counts(self, contexts, order=None):
+        """
+        Кількість типів N-грам, які можна утворити з кожної (N-1)-грами (T(h) для згладжування Віттена-Белла).
+        Для N-грам найбільшого порядку значення береться безпосередньо з індексу продовжень, для нижчих порядків
+        (all_orders) - рахується за один прохід по ключах N-грам цього порядку
+        :param contexts: ітерований об'єкт ключів (N-1)-грам
+        :param order: порядок N-грам (за замовчуванням - найбільший)
+        :return: словник у форматі: {ключ (N-1)-грами: кількість типів N-грам}
+        """
+        order = order or self.n
+        if order == self.n and self.track_followers:
+            followers = self.followers
+            return {h: len(followers.get(h, ())) for h in contexts}
+        bits = Vocabulary.id_bits
+        types_counts = dict()
+        for key in self.counts[order]:
+            h = key >> bits
+            types_counts[h] = types_counts.get(h, 0) + 1
+        return {h: types_counts.get(h, 0) for h in contexts}
+
+    def get_counts(self, order):
+        """
+        :param order: порядок N-грам
+        :return: частотний словник N-грам вказаного порядку
+        """
+        return self.counts[order]
+
+    def types_count(self, order):
+        """
+        :param order: порядок N-грам
+        :return: кількість типів N-грам вказаного порядку
+        """
+        return len(self.counts[order])
+
+    def frequencies_of_frequencies(self, total, order=None):
+        """
+        :param total: загальна кількість N-грам, яку можна утворити в даному корпусі
+        :param order: порядок N-грам (за замовчуванням - найбільший)
+        :return: масив частот частот N-грам (див. GoodTuring)
+        """
+        return GoodTuring.frequencies_of_frequencies(self.counts[order or self.n].values(), total)
+
+    def decoded(self, d, order):
+        """
+        Генератор рядків таблиці частотного словника, у якій ключі N-грам перетворено назад у текст
+        :param d: частотний словник з ключами N-грам (або (N-1)-грам для параметрів Віттена-Белла)
+        :param order: порядок N-грам
+        :return: генератор кортежів (N-грама у вигляді рядка, значення)
+        """
+        decode = self.vocabulary.decode
+        for key, value in d.items():
+            yield decode(key, order), value
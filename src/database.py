@@ -2,37 +2,64 @@ import sqlite3
 
 
 class Database:
-    def __init__(self, db, drop):
+    # налаштування SQLite на час масового запису даних: журнал транзакцій зберігається в пам'яті,
+    # без очікування фізичного запису на диск після кожної транзакції, збільшений кеш сторінок (у кілобайтах)
+    bulk_load_pragmas = {
+        "journal_mode": "MEMORY",
+        "synchronous": "OFF",
+        "cache_size": -64000,
+        "temp_store": "MEMORY",
+    }
+    # База даних містить п'ять таблиць:
+    # 1) частотний словник n-грам
+    # 2) частотний словник (n-1)-грам
+    # 3) частотний словник слів корпуса
+    # 4) Таблиця, що містить коефіцієнти згладжування Гуда-Тюрінга для кожної частоти n-грамм
+    # 5) Таблиця, що містить кількість типів N-грам, які можна утворити з
+    # даної (N-1)-грами в даному корпусі (для згладжування Віттена-Белла)
+    # а також службові таблиці:
+    # 6) вже оброблені джерела (файли) корпусу, ідентифіковані хешем вмісту
+    # 7) параметри, з якими було укладено базу даних (наприклад, N)
+    # 8) статистика окремих файлів джерел, що складаються з кількох файлів (теки, шаблони шляхів, маніфести)
+    # 9) метрики обробки (див. RunStats): тривалість етапів, розміри словників, кількість записаних рядків
+    tables_names = {
+        "ngrams frequency table": "ngrams_freq",
+        "(n-1)-grams frequency table": "n_minus1_grams_freq",
+        "Vocabulary frequency table": "vocab_freq",
+        "Good-Turing estimation table": "gt_estimation_counts",
+        "Smoothing": "smoothing",
+        "Sources": "sources",
+        "Settings": "settings",
+        "Source files": "source_files",
+        "Run stats": "run_stats"
+    }
+
+    def __init__(self, db, drop, without_rowid=False):
         """
         Клас, що відповідає за роботу з базою даних
         :param db: шлях до бази даних
         :param drop: булеве значення, визначає чи потрібно очистити базу даних при підключенні до неї.
         при повторному записі в базу даних дані будуть перезаписуватись (коли користувач натискає у вікні кнопку
         " Write to Database"
+        :param without_rowid: якщо True - таблиці частот та таблиця згладжування Віттена-Белла створюються як
+        WITHOUT ROWID таблиці з первинним ключем по N-грамі (компактніше зберігання і швидкий пошук за N-грамою)
 
         Коли ж користувач натискає у вікні кнопку "Update Chart" відбувається підключення до бази з метою
         отримання даних для графіка, тому дані в базі не потрібно очищати
         """
         self.connection = sqlite3.connect(db)
         self.cursor = self.connection.cursor()
-        # База даних містить п'ять таблиць:
-        # 1) частотний словник n-грам
-        # 2) частотний словник (n-1)-грам
-        # 3) частотний словник слів корпуса
-        # 4) Таблиця, що містить коефіцієнти згладжування Гуда-Тюрінга для кожної частоти n-грамм
-        # 5) Таблиця, що містить кількість типів N-грам, які можна утворити з
-        # даної (N-1)-грами в даному корпусі (для згладжування Віттена-Белла)
-        self.tables_names = {
-            "ngrams frequency table": "ngrams_freq",
-            "(n-1)-grams frequency table": "n_minus1_grams_freq",
-            "Vocabulary frequency table": "vocab_freq",
-            "Good-Turing estimation table": "gt_estimation_counts",
-            "Smoothing": "smoothing"
-        }
+        self.without_rowid = without_rowid
         if drop:
             self.drop_db()
         self.create_tables()  # створення таблиць в базі даних
 
+    def close(self):
+        """
+        Закриття з'єднання з базою даних
+        """
+        self.connection.close()
+
     def get_tables_names(self):
         """
         :return: функція повертає список назв таблиць бази даних
@@ -65,15 +92,34 @@ class Database:
         """
         Створення таблиць
         """
-        tables_list = [self.tables_names[table] for table in self.tables_names.keys() if "freq" in table]
+        tables_list = self.get_freq_tables()
         sql_command = ""
-        for table in tables_list:
-            sql_command += """
+        if self.without_rowid:
+            for table in tables_list:
+                sql_command += """
+                CREATE TABLE IF NOT EXISTS '{}'
+                (`word` TEXT,
+                `freq` INTEGER,
+                PRIMARY KEY(`word`)) WITHOUT ROWID;""".format(table)
+            smoothing_table = """
+            CREATE TABLE IF NOT EXISTS '{}'
+            (`n_minus1_gram` TEXT,
+            `ngrams_types_count_` INTEGER,
+            PRIMARY KEY(`n_minus1_gram`)) WITHOUT ROWID;"""
+        else:
+            for table in tables_list:
+                sql_command += """
+                CREATE TABLE IF NOT EXISTS '{}'
+                (`id`	INTEGER,
+                `word` TEXT,
+                `freq` INTEGER,
+                PRIMARY KEY(`id`));""".format(table)
+            smoothing_table = """
             CREATE TABLE IF NOT EXISTS '{}'
             (`id`	INTEGER,
-            `word` TEXT,
-            `freq` INTEGER,
-            PRIMARY KEY(`id`));""".format(table)
+            `n_minus1_gram` TEXT,
+            `ngrams_types_count_` INTEGER,
+            PRIMARY KEY(`id`));"""
         sql_command += """
         CREATE TABLE IF NOT EXISTS '{0}'
         (`id`	INTEGER,
@@ -81,28 +127,212 @@ class Database:
         `count_` INTEGER,
         `gt_count` REAL,
         PRIMARY KEY(`id`));
+        """.format(self.tables_names["Good-Turing estimation table"])
+        sql_command += smoothing_table.format(self.tables_names["Smoothing"])
+        sql_command += """
+        CREATE TABLE IF NOT EXISTS '{0}'
+        (`hash` TEXT,
+        `path` TEXT,
+        `ingested_at` TEXT,
+        PRIMARY KEY(`hash`));
 
         CREATE TABLE IF NOT EXISTS '{1}'
+        (`key` TEXT,
+        `value` TEXT,
+        PRIMARY KEY(`key`));
+
+        CREATE TABLE IF NOT EXISTS '{2}'
+        (`id`	INTEGER,
+        `source_hash` TEXT,
+        `path` TEXT,
+        `hash` TEXT,
+        `bytes` INTEGER,
+        `sentences` INTEGER,
+        `tokens` INTEGER,
+        `read_seconds` REAL,
+        `seconds` REAL,
+        PRIMARY KEY(`id`));
+
+        CREATE TABLE IF NOT EXISTS '{3}'
         (`id`	INTEGER,
-        `n_minus1_gram` TEXT,
-        `ngrams_types_count_` INTEGER,
+        `started_at` TEXT,
+        `metric` TEXT,
+        `value` REAL,
         PRIMARY KEY(`id`));
-        """.format(self.tables_names["Good-Turing estimation table"], self.tables_names["Smoothing"])
+        """.format(self.tables_names["Sources"], self.tables_names["Settings"], self.tables_names["Source files"],
+                   self.tables_names["Run stats"])
+        self.cursor.executescript(sql_command)
+        self.connection.commit()
+
+    def get_freq_tables(self):
+        """
+        :return: список назв таблиць частот (N-грам, (N-1)-грам, словника слів корпуса)
+        """
+        return [self.tables_names[table] for table in self.tables_names.keys() if "freq" in table]
+
+    def set_bulk_load_pragmas(self):
+        """
+        Встановлення налаштувань SQLite для швидкого масового запису (див. bulk_load_pragmas)
+        """
+        for pragma, value in self.bulk_load_pragmas.items():
+            self.cursor.execute("PRAGMA {} = {}".format(pragma, value))
+
+    def create_indexes(self):
+        """
+        Створення індексів після запису даних (побудова індексу один раз після масового запису швидша,
+        ніж його оновлення при додаванні кожного рядка)
+        """
+        sql_command = ""
+        for table in self.get_freq_tables():
+            if not self.without_rowid:  # у WITHOUT ROWID таблицях word вже є первинним ключем
+                # індекс унікальний - він потрібен для оновлення частот при дописуванні (upsert_freq_data)
+                sql_command += "CREATE UNIQUE INDEX IF NOT EXISTS 'idx_{0}_word' ON '{0}'(`word`);".format(table)
+            sql_command += "CREATE INDEX IF NOT EXISTS 'idx_{0}_freq' ON '{0}'(`freq`);".format(table)
+        sql_command += "CREATE INDEX IF NOT EXISTS 'idx_{0}_freq' ON '{0}'(`freq`);".format(
+            self.tables_names["Good-Turing estimation table"])
+        if not self.without_rowid:
+            sql_command += "CREATE UNIQUE INDEX IF NOT EXISTS 'idx_{0}_n_minus1_gram' ON '{0}'(`n_minus1_gram`);" \
+                .format(self.tables_names["Smoothing"])
         self.cursor.executescript(sql_command)
         self.connection.commit()
 
+    def insert_many(self, sql_command, data):
+        """
+        Масовий запис рядків однією транзакцією через executemany
+        :param sql_command: SQL-запит INSERT з параметрами
+        :param data: ітерований об'єкт (список або генератор) рядків; генератор не перетворюється на список,
+        рядки передаються до SQLite по одному
+        :return: кількість доданих (змінених) рядків
+        """
+        self.cursor.execute("BEGIN TRANSACTION")
+        self.cursor.executemany(sql_command, data)
+        self.connection.commit()
+        return self.cursor.rowcount
+
     def add_freq_data(self, data, table):
         """
         Додавання даних у таблицю з частотами
-        :param data: дані у форматі: слово, частота
+        :param data: дані у форматі: слово, частота (список або генератор)
         :param table: таблиця, в яку додаємо дані (для N-грам, (N-1)-грам, для словника слів корпуса)
+        :return: кількість доданих рядків
         """
-        self.cursor.execute("BEGIN TRANSACTION")
-        for record in data:
-            sql_command = """
-            INSERT OR IGNORE INTO {0}(word, freq)
-            VALUES(?,?)""".format(table)
-            self.cursor.execute(sql_command, record)
+        sql_command = """
+        INSERT OR IGNORE INTO {0}(word, freq)
+        VALUES(?,?)""".format(table)
+        return self.insert_many(sql_command, data)
+
+    def upsert_freq_data(self, data, table):
+        """
+        Дописування частот у таблицю з частотами: якщо слово (N-грама) вже є в таблиці, його частота
+        збільшується, інакше додається новий рядок
+        :param data: дані у форматі: слово, частота (список або генератор)
+        :param table: таблиця, в яку додаємо дані (для N-грам, (N-1)-грам, для словника слів корпуса)
+        :return: кількість доданих та оновлених рядків
+        """
+        self.create_indexes()  # унікальний індекс по word потрібен для ON CONFLICT
+        sql_command = """
+        INSERT INTO {0}(word, freq)
+        VALUES(?,?)
+        ON CONFLICT(word) DO UPDATE SET freq = freq + excluded.freq""".format(table)
+        return self.insert_many(sql_command, data)
+
+    def clear_table(self, table):
+        """
+        Видалення всіх рядків таблиці (сама таблиця залишається)
+        :param table: назва таблиці
+        """
+        self.cursor.execute("DELETE FROM {}".format(table))
+        self.connection.commit()
+
+    def count_rows(self, table):
+        """
+        :param table: назва таблиці
+        :return: кількість рядків таблиці
+        """
+        self.cursor.execute("SELECT COUNT(*) FROM {}".format(table))
+        return self.cursor.fetchone()[0]
+
+    def load_freq_data(self, table):
+        """
+        Потокове прочитання таблиці з частотами
+        :param table: назва таблиці
+        :return: генератор кортежів (слово, частота)
+        """
+        # окремий курсор, щоб під час читання можна було виконувати інші запити
+        cursor = self.connection.cursor()
+        yield from cursor.execute("SELECT word, freq FROM {}".format(table))
+
+    def load_frequencies_of_frequencies(self, table):
+        """
+        :param table: таблиця з частотами
+        :return: словник у форматі {частота: кількість слів (N-грам) з такою частотою}
+        """
+        self.cursor.execute("SELECT freq, COUNT(*) FROM {} GROUP BY freq".format(table))
+        return dict(self.cursor.fetchall())
+
+    def has_source(self, source_hash):
+        """
+        :param source_hash: хеш вмісту джерела корпусу
+        :return: True, якщо джерело з таким вмістом вже було оброблено
+        """
+        self.cursor.execute("SELECT 1 FROM {} WHERE hash = ?".format(self.tables_names["Sources"]), (source_hash,))
+        return self.cursor.fetchone() is not None
+
+    def add_source(self, source_hash, path):
+        """
+        Запис інформації про оброблене джерело корпусу
+        :param source_hash: хеш вмісту джерела
+        :param path: шлях до файлу джерела (або опис, якщо корпус передано не файлом)
+        """
+        self.cursor.execute("""
+        INSERT OR IGNORE INTO {0}(hash, path, ingested_at)
+        VALUES(?, ?, datetime('now'))""".format(self.tables_names["Sources"]), (source_hash, path))
+        self.connection.commit()
+
+    def add_source_files(self, source_hash, file_stats):
+        """
+        Запис статистики файлів джерела корпусу
+        :param source_hash: хеш вмісту джерела
+        :param file_stats: ітерований об'єкт словників статистики файлів (path, hash, bytes, sentences, tokens,
+        read_seconds, seconds)
+        """
+        self.insert_many("""
+        INSERT INTO {0}(source_hash, path, hash, bytes, sentences, tokens, read_seconds, seconds)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?)""".format(self.tables_names["Source files"]),
+                         ((source_hash, f["path"], f["hash"], f["bytes"], f["sentences"], f["tokens"],
+                           f["read_seconds"], f["seconds"]) for f in file_stats))
+
+    def add_run_stats(self, started_at, rows):
+        """
+        Запис метрик обробки. Метрики того самого запуску, що вже є в базі даних (наприклад, у копії бази даних
+        при перебиранні параметрів), замінюються; метрики попередніх запусків (при дописуванні) залишаються
+        :param started_at: час початку обробки (ідентифікує запуск)
+        :param rows: ітерований об'єкт пар (назва метрики, значення) - див. RunStats.rows
+        """
+        self.cursor.execute("DELETE FROM {} WHERE started_at = ?".format(self.tables_names["Run stats"]), (started_at,))
+        self.connection.commit()
+        self.insert_many("""
+        INSERT INTO {0}(started_at, metric, value)
+        VALUES(?, ?, ?)""".format(self.tables_names["Run stats"]),
+                         ((started_at, metric, value) for metric, value in rows))
+
+    def get_setting(self, key):
+        """
+        :param key: назва параметра
+        :return: значення параметра (рядок) або None, якщо параметр не записано
+        """
+        self.cursor.execute("SELECT value FROM {} WHERE key = ?".format(self.tables_names["Settings"]), (key,))
+        row = self.cursor.fetchone()
+        return row[0] if row else None
+
+    def set_setting(self, key, value):
+        """
+        Запис параметра, з яким укладено базу даних
+        :param key: назва параметра
+        :param value: значення параметра
+        """
+        self.cursor.execute("INSERT OR REPLACE INTO {}(key, value) VALUES(?, ?)".format(
+            self.tables_names["Settings"]), (key, str(value)))
         self.connection.commit()
 
     def add_gt_estimation_data(self, data):
@@ -112,14 +342,12 @@ class Database:
         1) частота n-грамм
         2) кількість типів N-грам з такою частотою
         3) коефіцієнт згладжування Гуда-Тюрінга для цієї частоти
+        :return: кількість доданих рядків
         """
-        self.cursor.execute("BEGIN TRANSACTION")
-        for record in data:
-            sql_command = """
-            INSERT OR IGNORE INTO {0}(freq, count_, gt_count)
-            VALUES(?,?,?)""".format(self.tables_names["Good-Turing estimation table"])
-            self.cursor.execute(sql_command, record)
-        self.connection.commit()
+        sql_command = """
+        INSERT OR IGNORE INTO {0}(freq, count_, gt_count)
+        VALUES(?,?,?)""".format(self.tables_names["Good-Turing estimation table"])
+        return self.insert_many(sql_command, data)
 
     def add_smoothing_data(self, data):
         """
@@ -127,14 +355,42 @@ class Database:
         :param data: дані у такому форматі:
         1) (N-1)-грама
         2) кількість типів N-грам, які можна утворити з даної (N-1)-грами в даному корпусі
+        :return: кількість доданих рядків
         """
-        self.cursor.execute("BEGIN TRANSACTION")
-        for record in data:
-            sql_command = """
-            INSERT OR IGNORE INTO {0}(n_minus1_gram, ngrams_types_count_)
-            VALUES(?,?)""".format(self.tables_names["Smoothing"])
-            self.cursor.execute(sql_command, record)
-        self.connection.commit()
+        sql_command = """
+        INSERT OR IGNORE INTO {0}(n_minus1_gram, ngrams_types_count_)
+        VALUES(?,?)""".format(self.tables_names["Smoothing"])
+        return self.insert_many(sql_command, data)
+
+    def load_gt_table(self):
+        """
+        :return: повна таблиця Гуда-Тюрінга (частота, кількість N-грам з цією частотою, згладжена кількість)
+        """
+        sql_command = "SELECT freq, count_, gt_count FROM {} ORDER BY freq".format(
+            self.tables_names["Good-Turing estimation table"])
+        self.cursor.execute(sql_command)
+        return self.cursor.fetchall()
+
+    def load_gt_range(self, lower, upper):
+        """
+        Рядки таблиці Гуда-Тюрінга з частотами в заданих межах (запит за індексом по частоті, з бази даних
+        читаються лише потрібні рядки)
+        :param lower: нижня межа частот (включно)
+        :param upper: верхня межа частот (включно)
+        :return: список рядків (частота, кількість N-грам з цією частотою, згладжена кількість), впорядкованих
+        за частотою
+        """
+        sql_command = "SELECT freq, count_, gt_count FROM {} WHERE freq BETWEEN ? AND ? ORDER BY freq".format(
+            self.tables_names["Good-Turing estimation table"])
+        self.cursor.execute(sql_command, (lower, upper))
+        return self.cursor.fetchall()
+
+    def max_freq(self):
+        """
+        :return: найбільша частота в таблиці Гуда-Тюрінга (None, якщо таблиця порожня)
+        """
+        self.cursor.execute("SELECT MAX(freq) FROM {}".format(self.tables_names["Good-Turing estimation table"]))
+        return self.cursor.fetchone()[0]
 
     def load_gt_estimation_data(self):
         """
@@ -0,0 +1,201 @@
+import heapq
+import os
+import tempfile
+
+from src.counter import NgramCounter
+from src.good_turing import GoodTuring
+from src.vocabulary import Vocabulary
+
+
+class ExternalCounter(NgramCounter):
+    # кількість записів, що зчитуються з файлу за одну операцію читання
+    batch_records = 4096
+    freq_bytes = 8
+
+    def __init__(self, n, max_entries=5000000, tmp_dir=None):
+        """
+        Точний лічильник N-грам для корпусів, частотні словники яких не вміщуються в пам'яті.
+        N-грами та (N-1)-грами рахуються у словниках, доки загальна кількість записів у них не перевищить
+        max_entries; тоді кожен словник записується на диск як файл, відсортований за ключем N-грами, і очищається.
+        Після підрахунку файли кожного порядку об'єднуються злиттям (heapq.merge) в один відсортований потік
+        (ключ N-грами, частота), який записується безпосередньо до бази даних і csv-файлів. Оскільки в ключі
+        перше слово N-грами займає старші біти, N-грами з однаковою (N-1)-грамою йдуть у потоці підряд, тому
+        T(h) для згладжування Віттена-Белла та частоти частот для згладжування Гуда-Тюрінга рахуються під час
+        того самого проходу. Словник слів зберігається в пам'яті повністю
+        :param n: порядок N-грам
+        :param max_entries: максимальна кількість записів N-грам та (N-1)-грам у пам'яті
+        :param tmp_dir: тека для тимчасових файлів (за замовчуванням - системна тимчасова тека)
+        """
+        super().__init__(n)
+        self.track_followers = False  # індекс продовжень не будується, T(h) рахується під час злиття
+        self.max_entries = max_entries
+        self.tmp = tempfile.TemporaryDirectory(prefix="ngrams-", dir=tmp_dir)
+        self.runs = {order: [] for order in self.orders if order > 1}  # {порядок: [шляхи до файлів]}
+        self.frequencies = dict()  # частоти частот N-грам: {частота: кількість N-грам}
+        self.merged_types = dict()  # кількість типів N-грам кожного порядку (відома після злиття)
+        self.types_path = os.path.join(self.tmp.name, "types.bin")
+
+    def update_ids(self, ids):
+        super().update_ids(ids)
+        if sum(len(d) for order, d in self.counts.items() if order > 1) > self.max_entries:
+            self.spill()
+
+    def key_bytes(self, order):
+        """
+        :return: кількість байтів ключа N-грами вказаного порядку у файлі
+        """
+        return order * Vocabulary.id_bits // 8
+
+    def spill(self):
+        """
+        Запис словників N-грам та (N-1)-грам на диск (відсортованими за ключем) та їх очищення
+        """
+        for order, runs in self.runs.items():
+            d = self.counts[order]
+            if not d:
+                continue
+            path = os.path.join(self.tmp.name, "run-{}-{}.bin".format(order, len(runs)))
+            self.write_records(path, sorted(d.items()), self.key_bytes(order))
+            runs.append(path)
+            d.clear()
+
+    def write_records(self, path, records, key_bytes):
+        """
+        Запис пар (ключ, значення) у файл: ключ - key_bytes байтів, значення - freq_bytes байтів (big-endian,
+        тому порядок байтів збігається з порядком чисел)
+        :param path: шлях до файлу
+        :param records: ітерований об'єкт пар (ключ, значення)
+        :param key_bytes: кількість байтів ключа
+        """
+        with open(path, "wb") as f:
+            f.write(self.encode_records(records, key_bytes))
+
+    def encode_records(self, records, key_bytes):
+        """
+        :return: байти пар (ключ, значення) у форматі файлу (див. write_records)
+        """
+        freq_bytes = self.freq_bytes
+        return b"".join(key.to_bytes(key_bytes, "big") + value.to_bytes(freq_bytes, "big") for key, value in records)
+
+    def read_records(self, path, key_bytes):
+        """
+        Генератор пар (ключ, значення), записаних функцією write_records
+        """
+        record_size = key_bytes + self.freq_bytes
+        from_bytes = int.from_bytes
+        with open(path, "rb") as f:
+            while True:
+                data = f.read(record_size * self.batch_records)
+                if not data:
+                    break
+                for i in range(0, len(data), record_size):
+                    value_start = i + key_bytes
+                    yield from_bytes(data[i:value_start], "big"), from_bytes(data[value_start:i + record_size], "big")
+
+    def iter_counts(self, order):
+        """
+        Злиття файлів N-грам вказаного порядку (разом з N-грамами, що залишились у пам'яті)
+        :param order: порядок N-грам
+        :return: генератор пар (ключ N-грами, частота), відсортованих за ключем
+        """
+        if order == 1:
+            merged = iter(sorted(self.counts[1].items()))
+        else:
+            if self.counts[order]:
+                self.spill()
+            key_bytes = self.key_bytes(order)
+            merged = heapq.merge(*(self.read_records(path, key_bytes) for path in self.runs[order]))
+        types = 0
+        current = None
+        total = 0
+        for key, freq in merged:
+            if key == current:
+                total += freq
+                continue
+            if current is not None:
+                types += 1
+                yield current, total
+            current, total = key, freq
+        if current is not None:
+            types += 1
+            yield current, total
+        self.merged_types[order] = types
+
+    def iter_top_counts(self):
+        """
+        Злиття файлів N-грам найбільшого порядку. Під час злиття рахуються частоти частот N-грам (self.frequencies)
+        та записується файл пар (ключ (N-1)-грами, T(h)) для згладжування Віттена-Белла (див. iter_types_counts)
+        :return: генератор пар (ключ N-грами, частота), відсортованих за ключем
+        """
+        bits = Vocabulary.id_bits
+        frequencies = self.frequencies
+        frequencies.clear()
+        types_counts = []  # пари (контекст, T(h)), що ще не записані до файлу
+        with open(self.types_path, "wb") as f:
+            key_bytes = self.key_bytes(self.n - 1)
+            context, types = None, 0
+            for key, freq in self.iter_counts(self.n):
+                frequencies[freq] = frequencies.get(freq, 0) + 1
+                h = key >> bits
+                if h != context:
+                    if context is not None:
+                        types_counts.append((context, types))
+                    context, types = h, 0
+                types += 1
+                if len(types_counts) >= self.batch_records:
+                    f.write(self.encode_records(types_counts, key_bytes))
+                    types_counts.clear()
+                yield key, freq
+            if context is not None:
+                types_counts.append((context, types))
+            f.write(self.encode_records(types_counts, key_bytes))
+
+    def iter_types_counts(self):
+        """
+        Кількість типів N-грам для кожної (N-1)-грами (T(h)) - злиття відсортованого потоку (N-1)-грам з файлом,
+        записаним iter_top_counts (викликається після нього)
+        :return: генератор пар (ключ (N-1)-грами, T(h)), відсортованих за ключем
+        """
+        types_counts = self.read_records(self.types_path, self.key_bytes(self.n - 1))
+        h, t = next(types_counts, (None, 0))
+        for key, _ in self.iter_counts(self.n - 1):
+            # контексти N-грам - підмножина (N-1)-грам, обидва потоки відсортовані
+            if key == h:
+                yield key, t
+                h, t = next(types_counts, (None, 0))
+            else:
+                yield key, 0
+
+    def types_count(self, order):
+        """
+        :param order: порядок N-грам
+        :return: кількість типів N-грам вказаного порядку (для N-грам - після злиття)
+        """
+        if order == 1:
+            return len(self.counts[1])
+        return self.merged_types[order]
+
+    def frequencies_of_frequencies(self, total, order=None):
+        """
+        :param total: загальна кількість N-грам, яку можна утворити в даному корпусі
+        :param order: порядок N-грам; частоти частот рахуються лише для N-грам найбільшого порядку
+        :return: масив частот частот N-грам найбільшого порядку (після злиття, див. iter_top_counts)
+        """
+        return GoodTuring.from_dict(self.frequencies, total)
+
+    def decoded(self, rows, order):
+        """
+        Генератор рядків таблиці, у якій ключі N-грам перетворено назад у текст
+        :param rows: частотний словник або ітерований об'єкт пар (ключ N-грами, значення)
+        :param order: порядок N-грам
+        :return: генератор кортежів (N-грама у вигляді рядка, значення)
+        """
+        decode = self.vocabulary.decode
+        for key, value in (rows.items() if isinstance(rows, dict) else rows):
+            yield decode(key, order), value
+
+    def close(self):
+        """
+        Видалення тимчасових файлів
+        """
+        self.tmp.cleanup()
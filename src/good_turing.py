@@ -0,0 +1,126 @@
+import numpy as np
+
+
+class GoodTuring:
+    """
+    Оцінка параметрів згладжування Гуда-Тюрінга над масивами частот частот (numpy).
+    Частоти частот зберігаються як масив n_c, у якому індекс - це частота c, а значення - кількість N-грам,
+    що зустрічаються в корпусі c разів. Усі обчислення виконуються векторно, без циклів по частотах
+    """
+    methods = ("katz", "simple")
+
+    @staticmethod
+    def frequencies_of_frequencies(frequencies, total):
+        """
+        Частоти частот N-грам
+        :param frequencies: ітерований об'єкт частот N-грам (наприклад, значення частотного словника)
+        :param total: загальна кількість N-грам, яку можна утворити в даному корпусі
+        :return: масив n_c довжиною (максимальна частота + 1)
+        """
+        frequencies = np.fromiter(frequencies, dtype=np.int64)
+        n_c = np.bincount(frequencies) if len(frequencies) else np.zeros(1, dtype=np.int64)
+        return GoodTuring.fill_unseen(n_c, total)
+
+    @staticmethod
+    def from_dict(v_dict, total):
+        """
+        Частоти частот N-грам з розрідженого словника (наприклад, результату запиту GROUP BY до бази даних)
+        :param v_dict: словник у форматі {частота: кількість N-грам з такою частотою}
+        :param total: загальна кількість N-грам, яку можна утворити в даному корпусі
+        :return: масив n_c довжиною (максимальна частота + 1)
+        """
+        n_c = np.zeros(max(v_dict, default=0) + 1, dtype=np.int64)
+        n_c[np.fromiter(v_dict.keys(), dtype=np.int64)] = np.fromiter(v_dict.values(), dtype=np.int64)
+        return GoodTuring.fill_unseen(n_c, total)
+
+    @staticmethod
+    def fill_unseen(n_c, total):
+        """
+        Кількість N-грам частоти нуль: загальна кількість N-грам, яку можна побудувати в даному корпусі, мінус
+        сума добутків частот на їх кількості
+        """
+        n_c[0] = 0
+        n_c[0] = total - int(np.dot(np.arange(len(n_c), dtype=np.int64), n_c))
+        return n_c
+
+    @staticmethod
+    def estimate(n_c, k, method="katz"):
+        """
+        :param n_c: масив частот частот N-грам
+        :param k: поріг Катца (для методу "katz")
+        :param method: "katz" - оцінка Гуда-Тюрінга з порогом Катца, "simple" - Simple Good-Turing (Гейл і Семпсон)
+        :return: масив згладжених кількостей для кожної частоти від 0 до максимальної
+        """
+        if method == "katz":
+            return GoodTuring.katz(n_c, k)
+        if method == "simple":
+            return GoodTuring.simple(n_c)
+        raise ValueError("Unknown Good-Turing method: {}".format(method))
+
+    @staticmethod
+    def katz(n_c, k):
+        """
+        Згладжені кількості Гуда-Тюрінга з порогом Катца за формулою 6.29 на сторінці 214 (239 в рідері)
+        книжки Журафського. Частоти, більші за поріг, не згладжуються.
+        Якщо формула не визначена (ділення на нуль, коли якась частота до порогу в корпусі не зустрічається),
+        для цієї частоти залишається її незгладжене значення
+        :param n_c: масив частот частот N-грам
+        :param k: поріг Катца
+        :return: масив згладжених кількостей
+        """
+        m = len(n_c) - 1
+        # частоти до k + 1 мають бути в масиві, навіть якщо в корпусі таких N-грам немає
+        nc = np.zeros(max(m, k + 1) + 1, dtype=np.int64)
+        nc[:m + 1] = n_c
+        estimated = np.arange(m + 1, dtype=np.float64)
+        c = np.arange(min(k, m) + 1, dtype=np.int64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            katz = (((c + 1) * nc[c + 1] / nc[c]) - ((nc[k + 1] * c * (k + 1)) / nc[1])) \
+                   / (1 - (nc[k + 1] * (k + 1)) / nc[1])
+        estimated[c] = np.where(np.isfinite(katz), katz, c)
+        return estimated
+
+    @staticmethod
+    def simple(n_c):
+        """
+        Simple Good-Turing (Gale, Sampson. Good-Turing frequency estimation without tears, 1995).
+        Частоти частот, усереднені по проміжках між ненульовими частотами (Z_r), апроксимуються прямою
+        log Z_r = a + b * log r, тому оцінка не ламається на розріджених великих частотах, де n_c здебільшого нулі.
+        Для малих частот використовується звичайна оцінка Тюрінга (r + 1) * N_(r+1) / N_r, доки вона суттєво
+        відрізняється від оцінки за прямою; після цього - оцінка за прямою. Оцінки нормуються так, щоб
+        сума імовірностей спостережуваних N-грам дорівнювала 1 - N_1 / N
+        :param n_c: масив частот частот N-грам
+        :return: масив згладжених кількостей
+        """
+        r = np.flatnonzero(n_c[1:]) + 1  # частоти, що зустрічаються в корпусі
+        if len(r) < 2:
+            raise ValueError("Simple Good-Turing needs at least two distinct N-gram frequencies")
+        n_r = n_c[r].astype(np.float64)
+        total = np.dot(r, n_r)  # кількість N-грам у корпусі (з повторами)
+        # Z_r = N_r / (0.5 * (t - q)), де q і t - попередня та наступна ненульові частоти
+        q = np.concatenate(([0], r[:-1]))
+        t = np.concatenate((r[1:], [2 * r[-1] - q[-1]]))
+        z = n_r / (0.5 * (t - q))
+        b, a = np.polyfit(np.log(r), np.log(z), 1)
+        # оцінка за прямою: (r + 1) * S(r + 1) / S(r)
+        y = r * (1 + 1 / r) ** (b + 1)
+        # оцінка Тюрінга та її стандартне відхилення
+        n_next = np.zeros(len(r))
+        has_next = np.isin(r + 1, r)
+        n_next[has_next] = n_c[r[has_next] + 1]
+        x = (r + 1) * n_next / n_r
+        sd = np.sqrt((r + 1) ** 2 * n_next / n_r ** 2 * (1 + n_next / n_r))
+        # після першої частоти, де оцінка Тюрінга не визначена або несуттєво відрізняється від оцінки за прямою,
+        # до кінця використовується оцінка за прямою
+        use_line = np.logical_or.accumulate(~has_next | (np.abs(x - y) <= 1.96 * sd))
+        r_star = np.where(use_line, y, x)
+        p_unseen = n_c[1] / total
+        scale = (1 - p_unseen) * total / np.dot(n_r, r_star)
+        # для частот, яких немає в корпусі, беремо оцінку за прямою (вона не впливає на нормування)
+        c = np.arange(1, len(n_c), dtype=np.float64)
+        estimated = np.empty(len(n_c), dtype=np.float64)
+        estimated[1:] = c * (1 + 1 / c) ** (b + 1) * scale
+        estimated[r] = r_star * scale
+        # кількість для кожної N-грами, що не зустрілась у корпусі: N_1 / N_0
+        estimated[0] = n_c[1] / n_c[0] if n_c[0] > 0 else 0.0
+        return estimated
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from urllib.request import pathname2url
+
+from src.database import Database
+
+
+class NgramModel:
+    def __init__(self, db_path, cache_size=10000):
+        """
+        Клас для отримання згладжених імовірностей N-грам з уже укладеної бази даних (лише читання).
+        Кожен потік працює з власним з'єднанням з базою даних, тому запити можна виконувати одночасно з кількох
+        потоків. Статистики контекстів ((N-1)-грам), що запитуються найчастіше, зберігаються в LRU-кеші
+        :param db_path: шлях до бази даних
+        :param cache_size: максимальна кількість контекстів у кеші
+        """
+        if not os.path.isfile(db_path):
+            raise FileNotFoundError(db_path)
+        # база даних відкривається лише для читання
+        self.uri = "file:{}?mode=ro".format(pathname2url(os.path.abspath(db_path)))
+        self.local = threading.local()  # з'єднання з базою даних для кожного потоку
+        self.tables_names = Database.tables_names
+        self.n = self.load_n()
+        self.vocabulary_size = self.query_one("SELECT COUNT(*) FROM {}".format(
+            self.tables_names["Vocabulary frequency table"]))[0]
+        self.tokens_count = self.query_one("SELECT SUM(freq) FROM {}".format(
+            self.tables_names["Vocabulary frequency table"]))[0] or 0
+        # кешовані запити (lru_cache можна безпечно використовувати з кількох потоків)
+        self.context_stats = lru_cache(maxsize=cache_size)(self.load_context_stats)
+        self.top_k_followers = lru_cache(maxsize=cache_size)(self.load_top_k_followers)
+        self.gt_count = lru_cache(maxsize=None)(self.load_gt_count)
+
+    @property
+    def connection(self):
+        """
+        :return: з'єднання з базою даних поточного потоку (створюється при першому зверненні)
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.uri, uri=True)
+            self.local.connection = connection
+        return connection
+
+    def close(self):
+        """
+        Закриття з'єднання з базою даних поточного потоку
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+    def query_one(self, sql_command, params=()):
+        """
+        :return: перший рядок результату запиту (або None)
+        """
+        return self.connection.execute(sql_command, params).fetchone()
+
+    def load_n(self):
+        """
+        :return: N, з яким укладено базу даних (з таблиці параметрів або за кількістю слів першої N-грами)
+        """
+        try:
+            row = self.query_one("SELECT value FROM {} WHERE key = 'n'".format(self.tables_names["Settings"]))
+            if row is not None:
+                return int(row[0])
+        except sqlite3.OperationalError:  # база даних укладена до появи таблиці параметрів
+            pass
+        row = self.query_one("SELECT word FROM {} LIMIT 1".format(self.tables_names["ngrams frequency table"]))
+        if row is None:
+            raise ValueError("Database does not contain N-grams")
+        return len(row[0].split(' '))
+
+    def table_for(self, order):
+        """
+        :param order: кількість слів N-грами
+        :return: таблиця частот для N-грам цього порядку
+        """
+        if order == self.n:
+            return self.tables_names["ngrams frequency table"]
+        if order == self.n - 1:
+            return self.tables_names["(n-1)-grams frequency table"]
+        if order == 1:
+            return self.tables_names["Vocabulary frequency table"]
+        raise ValueError("Database contains only 1-grams, {}-grams and {}-grams".format(self.n - 1, self.n))
+
+    def count(self, ngram):
+        """
+        Частота N-грами в корпусі (пошук за індексом)
+        :param ngram: N-грама у вигляді рядка "слово1 слово2 ... словоN" (порядку 1, N-1 або N)
+        :return: частота N-грами (0, якщо такої N-грами немає)
+        """
+        table = self.table_for(len(ngram.split(' ')))
+        row = self.query_one("SELECT freq FROM {} WHERE word = ?".format(table), (ngram,))
+        return row[0] if row else 0
+
+    @staticmethod
+    def prefix_range(context):
+        """
+        Межі діапазону рядків, що починаються з контексту і пробілу: усі такі рядки не менші за "контекст "
+        і менші за "контекст!" (символ "!" йде одразу після пробілу), тому пошук виконується за індексом
+        :param context: (N-1)-грама
+        :return: нижня та верхня межі діапазону
+        """
+        return context + ' ', context + '!'
+
+    def load_context_stats(self, context):
+        """
+        Статистики контексту беруться з таблиць, записаних під час обробки корпусу: c(h) - частота (N-1)-грами,
+        T(h) - кількість типів N-грам з таблиці параметрів згладжування Віттена-Белла. Вони обчислені за повними
+        частотами, тому збігаються з параметрами обробки і тоді, коли таблицю N-грам відсічено (див. Pruning).
+        Якщо контексту немає в цих таблицях, c(h) та T(h) рахуються за рядками таблиці N-грам, що починаються
+        з контексту
+        :param context: (N-1)-грама (контекст h)
+        :return: частота контексту c(h) та кількість типів N-грам, що починаються з контексту, T(h)
+        """
+        c_h = self.query_one("SELECT freq FROM {} WHERE word = ?".format(
+            self.tables_names["(n-1)-grams frequency table"]), (context,))
+        t_h = self.query_one("SELECT ngrams_types_count_ FROM {} WHERE n_minus1_gram = ?".format(
+            self.tables_names["Smoothing"]), (context,))
+        if c_h is not None and t_h is not None:
+            return c_h[0], t_h[0]
+        row = self.query_one("SELECT SUM(freq), COUNT(*) FROM {} WHERE word >= ? AND word < ?".format(
+            self.tables_names["ngrams frequency table"]), self.prefix_range(context))
+        return row[0] or 0, row[1]
+
+    def load_top_k_followers(self, context, k=10):
+        """
+        :param context: (N-1)-грама (контекст)
+        :param k: кількість слів
+        :return: список з k найчастіших слів, що йдуть після контексту, у форматі [(слово, частота N-грами)]
+        """
+        cursor = self.connection.execute(
+            "SELECT word, freq FROM {} WHERE word >= ? AND word < ? ORDER BY freq DESC LIMIT ?".format(
+                self.tables_names["ngrams frequency table"]), (*self.prefix_range(context), k))
+        return [(ngram.rsplit(' ', 1)[1], freq) for ngram, freq in cursor]
+
+    def load_gt_count(self, c):
+        """
+        :param c: частота N-грами
+        :return: згладжена кількість Гуда-Тюрінга для цієї частоти (для частот, більших за поріг Катца - сама частота)
+        """
+        row = self.query_one("SELECT gt_count FROM {} WHERE freq = ?".format(
+            self.tables_names["Good-Turing estimation table"]), (c,))
+        return row[0] if row else c
+
+    def prob(self, word, context, method="witten-bell"):
+        """
+        Згладжена імовірність слова після контексту P(word | context)
+        :param word: слово
+        :param context: (N-1)-грама (контекст)
+        :param method: "witten-bell" - згладжування Віттена-Белла:
+            P = c(hw) / (c(h) + T(h)), якщо c(hw) > 0, інакше T(h) / (Z(h) * (c(h) + T(h))), де Z(h) = V - T(h);
+        "good-turing" - частота N-грами, згладжена за Гудом-Тюрінгом (з порогом Катца), поділена на c(h)
+        Якщо контекст у корпусі не зустрічався (або зустрічався лише в кінці речень, T(h) = 0), повертається
+        імовірність слова без контексту c(w) / кількість слів
+        :return: імовірність
+        """
+        c_h, t_h = self.context_stats(context)
+        if c_h == 0 or t_h == 0:
+            return self.count(word) / self.tokens_count if self.tokens_count else 0.0
+        c = self.count(context + ' ' + word)
+        if method == "witten-bell":
+            if c > 0:
+                return c / (c_h + t_h)
+            z_h = self.vocabulary_size - t_h
+            return t_h / (z_h * (c_h + t_h)) if z_h > 0 else 0.0
+        if method == "good-turing":
+            return self.gt_count(c) / c_h
+        raise ValueError("Unknown smoothing method: {}".format(method))
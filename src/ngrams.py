@@ -1,130 +1,756 @@
-import re
+import os
 import csv
-from nltk.tokenize import sent_tokenize
-from nltk.util import ngrams
+import time
+import shutil
+import hashlib
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
+from src.corpus import CorpusReader
+from src.counter import NgramCounter
+from src.external import ExternalCounter
 from src.database import Database
+from src.good_turing import GoodTuring
+from src.pruning import Pruning
+from src.run_stats import RunStats
+from src.sketch import SketchCounter
+from src.token_cache import TokenCache
+from src.tokenizer import Tokenizer
+from src.trie import NgramTrie
+
+
+class ProcessingCancelled(Exception):
+    """
+    Виняток, що виникає, коли обробку корпусу скасовано користувачем
+    """
 
 
 class Ngrams:
-    def __init__(self, n, k, corpus, db_path):
+    # як часто (через скільки речень) повідомляти про прогрес та перевіряти скасування обробки
+    progress_interval = 1000
+
+    def __init__(self, n, k, corpus, db_path, all_orders=False, workers=1, without_rowid=False, append=False,
+                 progress=None, cancel_event=None, csv_dir="../csv_files", gt_method="katz",
+                 tokenizer="punkt", sketch=None, max_entries=None, tmp_dir=None, token_cache=None, readers=4,
+                 profile=None, prune=None, trie=None):
         """
         Клас, що здійснює обробку даних корпуса з метою знаходження частот частот N-грам
         :param n: встановлює, які саме N-грами будувати: 2-грами, 3-грами...
         :param k: поріг Катца (Katz threshold) для оцінки параметрів згладжування Гуда-Тюрінга
         :param corpus: вміст текстового файлу з корпусом тексту. Дані подано у вигляді списку параграфів тексту
+        або будь-якого ітерованого об'єкта (наприклад, генератора) параграфів. Можна також передати шлях до файлу
+        корпусу - тоді файл читається потоково (режим обмеженої пам'яті): у пам'яті зберігаються лише
+        частотні словники, а не весь текст корпусу. Корпус з кількох файлів задається шляхом до теки, шаблоном
+        шляхів (glob) або маніфестом (див. CorpusReader.resolve); статистика кожного файлу записується до бази
+        даних (таблиця source_files)
         :param db_path: шлях до бази даних
+        :param all_orders: якщо True - за той самий прохід по корпусу рахуються N-грами усіх порядків від 1 до N
+        (доступні після обробки через self.counter)
+        :param workers: кількість процесів для підрахунку N-грам. Якщо більше одного - корпус ділиться на частини
+        по межах параграфів, кожна частина обробляється в окремому процесі, а результати об'єднуються
+        (результат ідентичний послідовній обробці)
+        :param without_rowid: якщо True - таблиці N-грам у базі даних створюються як WITHOUT ROWID таблиці
+        :param append: режим дописування: база даних не очищається, частоти з нового тексту додаються до вже
+        записаних частот, після чого перераховуються лише таблиці згладжування Гуда-Тюрінга та Віттена-Белла.
+        Джерело, вміст якого вже було оброблено (за хешем вмісту), повторно не додається
+        :param progress: функція progress(stage, sentences_count), що викликається на початку кожного етапу обробки
+        та періодично під час підрахунку N-грам (назва етапу, кількість оброблених речень)
+        :param cancel_event: об'єкт threading.Event; якщо його встановлено, обробка зупиняється з винятком
+        ProcessingCancelled, а база даних залишається в попередньому стані
+        :param csv_dir: тека, до якої записуються csv-файли з результатами
+        :param gt_method: метод оцінки параметрів Гуда-Тюрінга: "katz" - з порогом Катца k,
+        "simple" - Simple Good-Turing (апроксимація частот частот прямою в логарифмічному масштабі,
+        k не використовується)
+        :param tokenizer: назва токенізатора для поділу на речення (див. Tokenizer): "punkt" - модель Punkt з nltk,
+        "regex" - швидкий поділ регулярним виразом
+        :param sketch: якщо задано - наближений підрахунок з обмеженим використанням пам'яті (див. SketchCounter):
+        словник параметрів SketchCounter (epsilon, delta, top_k, sample_rate). До таблиць частот записуються лише
+        найчастіші N-грами з оціненими частотами, гарантії похибки доступні через self.counter.error_bounds()
+        :param max_entries: якщо задано - точний підрахунок із записом на диск (див. ExternalCounter): коли кількість
+        записів N-грам та (N-1)-грам у пам'яті перевищує max_entries, вони записуються до тимчасових відсортованих
+        файлів, які після підрахунку об'єднуються злиттям безпосередньо в базу даних та csv-файли
+        (рядки таблиць впорядковано за ключами N-грам, а не за порядком першої появи)
+        :param tmp_dir: тека для тимчасових файлів при підрахунку із записом на диск
+        :param token_cache: тека кешу токенізації (див. TokenCache): результат поділу корпусу на речення та слова
+        зберігається на диску і використовується повторно при обробці того самого корпусу з іншими N чи k
+        :param readers: кількість потоків читання файлів корпусу з кількох файлів
+        :param profile: якщо задано - словник параметрів профілювання етапів обробки (profile_stages, profiler,
+        profile_dir - див. RunStats). Метрики обробки збираються завжди: вони доступні через self.stats,
+        записуються до таблиці run_stats бази даних і можуть бути записані до json-файлу (RunStats.write_json)
+        :param prune: якщо задано - словник параметрів відсікання таблиць перед записом (min_counts, max_vocab,
+        top_k, unk - див. Pruning). Параметри згладжування обчислюються за невідсіченими частотами
+        :param trie: якщо задано - після підрахунку будується префіксне дерево N-грам усіх порядків (див. NgramTrie,
+        доступне через self.trie), за яким обчислюються параметри згладжування Віттена-Белла; якщо trie - шлях
+        до файлу, дерево записується до нього (NgramTrie.load завантажує його без повторного підрахунку)
         """
+        self.csv_dir = csv_dir
+        self.workers = workers
+        self.without_rowid = without_rowid
+        self.append = append
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.gt_method = gt_method
+        self.tokenizer = Tokenizer.get(tokenizer)
+        self.token_cache = TokenCache(token_cache) if token_cache is not None else None
+        self.readers = readers
+        # статистика файлів корпусу з кількох файлів (див. count_files)
+        self.file_stats = []
+        # метрики обробки: тривалість етапів, кількість оброблених елементів, пам'ять, розміри словників
+        self.stats = RunStats(**(profile or {}))
+        if sketch is not None:
+            if append or workers > 1:
+                raise ValueError("Approximate counting supports neither append mode nor several workers")
+            self.counter = SketchCounter(n, **sketch)
+        elif max_entries is not None:
+            if append or workers > 1:
+                raise ValueError("External counting supports neither append mode nor several workers")
+            self.counter = ExternalCounter(n, max_entries, tmp_dir)
+        else:
+            # дерево зберігає N-грами усіх порядків, тому вони рахуються за той самий прохід
+            self.counter = NgramCounter(n, all_orders or trie is not None)
+        if trie is not None and (append or sketch is not None or max_entries is not None):
+            raise ValueError("Trie supports neither append mode nor approximate or external counting")
+        self.build_trie = trie is not None
+        self.trie_path = trie if isinstance(trie, str) else None
+        self.trie = None
+        if prune is not None and (append or sketch is not None or max_entries is not None):
+            raise ValueError("Pruning supports neither append mode nor approximate or external counting")
+        self.pruning = Pruning(**prune) if prune is not None else None
         # в результаті обробки отримаємо таблицю згладжування Гуда-Тюрінга (візьмемо з неї частоти та відповідні
         # їм кількості частот для побудови графіки частот частот
         self.gt_table = self.process(n, k, corpus, db_path)
 
+    @property
+    def timings(self):
+        """
+        :return: тривалість кожного етапу обробки в секундах: {назва етапу: тривалість}
+        """
+        return self.stats.timings
+
     def process(self, n, k, corpus, db_path):
-        # підключення до бази даних, очищення старих даних в базі
-        db = Database(db_path, drop=True)
-        # Розбиваємо корпус на речення та слова
-        # words - множина слів у корпусі (тобто словник слів)
-        # all_words - усі слова корпуса з повторами
-        sentences, words, all_words = self.get_sentences_words(corpus)
-        # Побудова N-грам
-        ngrams_list = self.ngrams_from_sentence(sentences, n)
-        # Побудова (N-1)-грам
-        n_minus1_grams_list = self.ngrams_from_sentence(sentences, n - 1)
-        # Укладання частотного словника N-грам
-        ngrams_dict = self.get_freq_dict(ngrams_list)
-        # Укладання частотного словника (N-1)-грам
-        n_minus1_grams_dict = self.get_freq_dict(n_minus1_grams_list)
-        # Укладання частотного словника для словника слів корпуса
-        vocab_dict = self.get_freq_dict(all_words)
-        # для кожної (N-1)-грами отримуємо кількість типів N-грам, які можна утворити для даної (N-1)-грами
-        # в даному корпусі
-        smoothing_params = self.get_ngrams_types_counts_for_n_minus1_grams(ngrams_dict, n_minus1_grams_dict, words)
-        # Загальна кількість N-грам в корпусі - це кількість (N-1)-грам помножена на розмір словника слів корпусу
-        total_count_of_ngrams = len(n_minus1_grams_dict.keys()) * len(words)
-        # отримуємо частоти частот N-грам
-        frequencies_of_ngrams_frequencies = self.get_frequencies_of_ngrams_frequencies(ngrams_dict,
-                                                                                       total_count_of_ngrams)
-        # обчислюємо параметри згладжування Гуда-Тюрінга
-        gt_counts_estimation = self.get_gt_counts_estimation(frequencies_of_ngrams_frequencies, k)
-        # підготовка запису даних таблиць до бази даних
-        ngrams_freq = self.freq_table_db(ngrams_dict)
-        n_minus1_grams_freq = self.freq_table_db(n_minus1_grams_dict)
-        vocab_freq = self.freq_table_db(vocab_dict)
-        gt_estimation_table_db = self.gt_table_db(gt_counts_estimation)
-        smoothing_table_db = self.freq_table_db(smoothing_params)
-        # збереження даних до csv-файлу
-        self.write_to_csv("../csv_files/ngrams.csv", ngrams_freq)
-        self.write_to_csv("../csv_files/n_minus1_grams.csv", n_minus1_grams_freq)
-        self.write_to_csv("../csv_files/witten-bell.csv", smoothing_table_db)
-        self.write_to_csv("../csv_files/good-turing.csv", gt_estimation_table_db)
+        # у режимі дописування продовжуємо роботу з копією бази
+        return self.write_db(db_path, lambda db: self.process_corpus(n, k, corpus, db),
+                             copy_from=db_path if self.append else None)
+
+    def write_db(self, db_path, write, copy_from=None):
+        """
+        Запис бази даних: дані записуються до тимчасового файлу бази даних, який замінює основний файл лише після
+        успішного завершення обробки, тому при скасуванні чи помилці не залишається частково записаної бази даних
+        :param db_path: шлях до бази даних
+        :param write: функція write(db), що записує дані до бази даних і повертає таблицю згладжування Гуда-Тюрінга
+        :param copy_from: якщо задано - шлях до бази даних, копія якої доповнюється (інакше база даних очищається)
+        :return: результат функції write
+        """
+        work_path = db_path + ".part"
+        if os.path.exists(work_path):
+            os.remove(work_path)
+        if copy_from is not None and os.path.exists(copy_from):
+            shutil.copyfile(copy_from, work_path)
+        # підключення до бази даних, очищення старих даних в базі (крім дописування до копії)
+        db = Database(work_path, drop=copy_from is None, without_rowid=self.without_rowid)
+        try:
+            db.set_bulk_load_pragmas()
+            gt_estimation_table_db = write(db)
+            self.record_counts()
+            db.add_run_stats(self.stats.started_at, self.stats.rows())
+        except BaseException:
+            db.close()
+            os.remove(work_path)
+            raise
+        db.close()
+        os.replace(work_path, db_path)
+        return gt_estimation_table_db
 
+    def process_corpus(self, n, k, corpus, db):
+        """
+        Обробка корпусу тексту та запис результатів до бази даних
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param corpus: корпус тексту (див. __init__)
+        :param db: об'єкт бази даних
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        if self.append:
+            self.check_db_settings(db, n)
+        source = corpus if isinstance(corpus, str) else "<corpus>"  # опис джерела для таблиці джерел
+        # Розбиваємо корпус на речення та слова (або беремо результат поділу з кешу токенізації) і одразу
+        # укладаємо частотні словники N-грам, (N-1)-грам та словника слів корпуса
+        # (списки речень, слів та N-грам не зберігаються)
+        source_hash = self.count_corpus(corpus)
+        if self.append:
+            return self.append_to_db(db, n, k, source_hash, source)
+        if isinstance(self.counter, ExternalCounter):
+            return self.write_external(db, n, k, source_hash, source)
+        return self.write_results(db, n, k, source_hash, source, self.csv_dir)
+
+    def write_results(self, db, n, k, source_hash, source, csv_dir):
+        """
+        Обчислення параметрів згладжування за підрахованими частотами N-грам порядку n та запис результатів
+        до бази даних і csv-файлів
+        :param db: об'єкт бази даних
+        :param n: параметр для позначення N у N-грамах (не більший за найбільший порядок лічильника)
+        :param k: поріг Катца
+        :param source_hash: хеш вмісту корпусу
+        :param source: опис джерела (шлях до файлу)
+        :param csv_dir: тека для csv-файлів
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        ngrams_dict, n_minus1_grams_dict, vocab_dict = (self.counter.get_counts(order) for order in (n, n - 1, 1))
+        self.check_cancelled()
+        # words - множина слів у корпусі (тобто словник слів), порядок слів - порядок першої появи в корпусі
+        words = vocab_dict.keys()
+        with self.stage("smoothing"):
+            # для кожної (N-1)-грами отримуємо кількість типів N-грам, які можна утворити для даної (N-1)-грами
+            # в даному корпусі
+            # (значення береться з індексу продовжень, побудованого під час підрахунку N-грам, або з префіксного
+            # дерева - кількість продовжень вузла (N-1)-грами)
+            types_source = self.trie if self.trie is not None else self.counter
+            smoothing_params = types_source.get_types_counts(n_minus1_grams_dict, n)
+            # Загальна кількість N-грам в корпусі - це кількість (N-1)-грам помножена на розмір словника слів
+            total_count_of_ngrams = self.counter.types_count(n - 1) * len(words)
+            # отримуємо частоти частот N-грам
+            frequencies_of_ngrams_frequencies = self.counter.frequencies_of_frequencies(total_count_of_ngrams, n)
+            # обчислюємо параметри згладжування Гуда-Тюрінга
+            gt_counts_estimation = self.get_gt_counts_estimation(frequencies_of_ngrams_frequencies, k, self.gt_method)
+            # підготовка запису даних таблиць до бази даних
+            # великі таблиці не копіюються у списки: кожен запис отримує рядки безпосередньо зі словника,
+            # а ключі N-грам перетворюються на текст лише тут, на етапі запису
+            decoded = self.counter.decoded
+            gt_estimation_table_db = self.gt_table_db(frequencies_of_ngrams_frequencies, gt_counts_estimation)
+        if self.pruning is not None:
+            # відсікання таблиць після обчислення частот частот Гуда-Тюрінга; кількості типів Віттена-Белла
+            # записуються лише для контекстів, що залишились, але рахуються за усіма їх продовженнями
+            with self.stage("prune"):
+                ngrams_dict, n_minus1_grams_dict, vocab_dict = self.pruning.prune(self.counter, n)
+                smoothing_params = {h: smoothing_params[h] for h in n_minus1_grams_dict}
+                for order, d in ((n, ngrams_dict), (n - 1, n_minus1_grams_dict), (1, vocab_dict)):
+                    self.stats.set("retained.order_{}".format(order), len(d))
+        # збереження даних до csv-файлу
+        with self.stage("csv write"):
+            self.save_csv(os.path.join(csv_dir, "ngrams.csv"), decoded(ngrams_dict, n))
+            self.save_csv(os.path.join(csv_dir, "n_minus1_grams.csv"), decoded(n_minus1_grams_dict, n - 1))
+            self.save_csv(os.path.join(csv_dir, "witten-bell.csv"), decoded(smoothing_params, n - 1))
+            self.save_csv(os.path.join(csv_dir, "good-turing.csv"), gt_estimation_table_db)
 
         # додавання даних відповідних таблиць до бази
-        db.add_freq_data(ngrams_freq, db.tables_names["ngrams frequency table"])
-        db.add_freq_data(n_minus1_grams_freq, db.tables_names["(n-1)-grams frequency table"])
-        db.add_freq_data(vocab_freq, db.tables_names["Vocabulary frequency table"])
-        db.add_gt_estimation_data(gt_estimation_table_db)
-        db.add_smoothing_data(smoothing_table_db)
+        with self.stage("db write"):
+            for table, d, order in (("ngrams frequency table", ngrams_dict, n),
+                                    ("(n-1)-grams frequency table", n_minus1_grams_dict, n - 1),
+                                    ("Vocabulary frequency table", vocab_dict, 1)):
+                table = db.tables_names[table]
+                self.record_rows("db write", table, db.add_freq_data(decoded(d, order), table))
+            self.record_rows("db write", db.tables_names["Good-Turing estimation table"],
+                             db.add_gt_estimation_data(gt_estimation_table_db))
+            self.record_rows("db write", db.tables_names["Smoothing"],
+                             db.add_smoothing_data(decoded(smoothing_params, n - 1)))
+            # індекси будуються після запису всіх даних
+            db.create_indexes()
+            self.save_db_settings(db, n, k, self.gt_method, source_hash, source, self.file_stats)
         return gt_estimation_table_db
 
+    def tokenize_and_count(self, corpus):
+        """
+        Поділ корпусу на речення та слова і підрахунок N-грам (self.counter).
+        Якщо задано кеш токенізації і в ньому є запис для цього корпусу та токенізатора, N-грами рахуються
+        за збереженим потоком ідентифікаторів слів (без поділу на речення та слова); інакше під час підрахунку
+        потік ідентифікаторів записується до кешу
+        :param corpus: корпус тексту (див. __init__)
+        :return: хеш вмісту корпусу (sha256 тексту параграфів)
+        """
+        cache_path = self.token_cache.path(corpus, self.tokenizer) if self.token_cache is not None else None
+        if cache_path is not None and os.path.exists(cache_path):
+            with self.stage("count"):
+                self.counter.vocabulary, source_hash, self.file_stats, sentences_ids = self.token_cache.read(
+                    cache_path)
+                self.count_ids(sentences_ids, self.counter)
+            self.stats.add_items("count", self.counter.tokens_count)
+            self.stats.set("token_cache.hit", 1)
+            return source_hash
+        # хеш вмісту корпусу обчислюється під час читання, без окремого проходу
+        source_hash = hashlib.sha256()
+        # при паралельній обробці ідентифікатори слів отримуються в різних процесах, тому кеш не записується
+        cache_writer = self.token_cache.writer(cache_path) if cache_path is not None and self.workers == 1 else None
+        try:
+            if CorpusReader.is_multi_file(corpus):
+                self.count_files(CorpusReader.resolve(corpus), self.counter, source_hash, cache_writer)
+            else:
+                if isinstance(corpus, str):  # якщо передано шлях до файлу - читаємо його потоково
+                    corpus = CorpusReader.iter_paragraphs(corpus)
+                corpus = self.hash_paragraphs(corpus, source_hash)
+                self.count_ngrams(corpus, self.counter, self.workers, cache_writer=cache_writer)
+        except BaseException:
+            if cache_writer is not None:
+                cache_writer.abort()
+            raise
+        if cache_writer is not None:
+            cache_writer.finish(self.counter.vocabulary, source_hash.hexdigest(), self.file_stats)
+            self.token_cache.evict()
+        if self.token_cache is not None:
+            self.stats.set("token_cache.hit", 0)
+        return source_hash.hexdigest()
+
+    def count_corpus(self, corpus):
+        """
+        Підрахунок N-грам корпусу (див. tokenize_and_count) з подальшим обмеженням словника та побудовою
+        префіксного дерева, якщо їх задано
+        :param corpus: корпус тексту (див. __init__)
+        :return: хеш вмісту корпусу
+        """
+        source_hash = self.tokenize_and_count(corpus)
+        self.limit_vocabulary()
+        if self.build_trie:
+            with self.stage("trie"):
+                self.trie = NgramTrie.build(self.counter)
+                if self.trie_path is not None:
+                    self.trie.save(self.trie_path)
+            self.stats.set("trie.bytes", self.trie.nbytes())
+        return source_hash
+
+    def limit_vocabulary(self):
+        """
+        Обмеження словника після підрахунку (якщо задано max_vocab або найменшу частоту слів, див. Pruning):
+        рідкісні слова замінюються словом <unk> в усіх частотних словниках
+        """
+        if self.pruning is None or not self.pruning.maps_vocabulary():
+            return
+        with self.stage("prune"):
+            self.stats.set("vocabulary.mapped_to_unk", self.pruning.map_vocabulary(self.counter))
+
+    def count_files(self, files, counter, source_hash, cache_writer=None, chunk_size=2000):
+        """
+        Підрахунок N-грам корпусу з кількох файлів. Файли читаються пулом потоків (див. CorpusReader.read_files),
+        тому читання наступних файлів з диска відбувається одночасно з поділом на речення та підрахунком N-грам
+        вже прочитаних. Результат такий самий, як для одного файлу, що є об'єднанням файлів корпусу.
+        Для кожного файлу до self.file_stats записується статистика: кількість речень і слів, тривалість читання
+        та (при послідовній обробці) тривалість обробки
+        :param files: список шляхів до файлів корпусу
+        :param counter: об'єкт NgramCounter, що укладає частотні словники
+        :param source_hash: об'єкт хешу (hashlib) вмісту корпусу
+        :param cache_writer: об'єкт TokenCacheWriter (див. count_ngrams)
+        :param chunk_size: кількість параграфів в одній частині корпусу при паралельній обробці
+        """
+        file_stats = self.file_stats
+        files_read = CorpusReader.read_files(files, self.readers)
+        if self.workers > 1:
+            def chunks():
+                for paragraphs, stats in files_read:
+                    stats.update(sentences=0, tokens=0, seconds=None)
+                    file_stats.append(stats)
+                    # частини не виходять за межі файлу, тому мітка частини - номер файлу
+                    for chunk in self.split_chunks(self.hash_paragraphs(paragraphs, source_hash), chunk_size):
+                        yield len(file_stats) - 1, chunk
+
+            def on_merged(index, chunk_counter):
+                file_stats[index]["sentences"] += chunk_counter.sentences_count
+                file_stats[index]["tokens"] += chunk_counter.tokens_count
+
+            tokens = counter.tokens_count
+            with self.stage("count"):
+                self.count_ngrams_parallel(chunks(), counter, self.workers, on_merged)
+            self.stats.add_items("count", counter.tokens_count - tokens)
+            return
+        for paragraphs, stats in files_read:
+            sentences, tokens, start = counter.sentences_count, counter.tokens_count, time.perf_counter()
+            self.count_ngrams(self.hash_paragraphs(paragraphs, source_hash), counter, cache_writer=cache_writer)
+            stats.update(sentences=counter.sentences_count - sentences, tokens=counter.tokens_count - tokens,
+                         seconds=time.perf_counter() - start)
+            file_stats.append(stats)
+
+    def count_ids(self, sentences_ids, counter):
+        """
+        Підрахунок N-грам за потоком ідентифікаторів слів речень (з кешу токенізації)
+        :param sentences_ids: ітерований об'єкт списків ідентифікаторів слів речень
+        :param counter: лічильник N-грам, словник слів якого відповідає ідентифікаторам
+        """
+        update_ids = counter.update_ids
+        for ids in sentences_ids:
+            update_ids(ids)
+            if counter.sentences_count % self.progress_interval == 0:
+                self.check_cancelled()
+                self.report_progress("count")
+
+    def write_external(self, db, n, k, source_hash, source):
+        """
+        Злиття тимчасових файлів ExternalCounter та потоковий запис результатів до бази даних та csv-файлів.
+        У пам'яті зберігаються лише словник слів та частоти частот N-грам
+        :param db: об'єкт бази даних
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param source_hash: хеш вмісту корпусу
+        :param source: опис джерела (шлях до файлу)
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        counter = self.counter
+        decoded = counter.decoded
+        try:
+            with self.stage("merge"):
+                # N-грами: під час того самого проходу рахуються частоти частот та T(h)
+                table = db.tables_names["ngrams frequency table"]
+                self.record_rows("merge", table, db.add_freq_data(
+                    self.tee_to_csv(os.path.join(self.csv_dir, "ngrams.csv"), decoded(counter.iter_top_counts(), n)),
+                    table))
+                table = db.tables_names["(n-1)-grams frequency table"]
+                self.record_rows("merge", table, db.add_freq_data(
+                    self.tee_to_csv(os.path.join(self.csv_dir, "n_minus1_grams.csv"),
+                                    decoded(counter.iter_counts(n - 1), n - 1)), table))
+                table = db.tables_names["Vocabulary frequency table"]
+                self.record_rows("merge", table, db.add_freq_data(decoded(counter.get_counts(1), 1), table))
+                self.record_rows("merge", db.tables_names["Smoothing"], db.add_smoothing_data(
+                    self.tee_to_csv(os.path.join(self.csv_dir, "witten-bell.csv"),
+                                    decoded(counter.iter_types_counts(), n - 1))))
+        finally:
+            counter.close()
+        with self.stage("smoothing"):
+            total_count_of_ngrams = counter.types_count(n - 1) * counter.types_count(1)
+            frequencies_of_ngrams_frequencies = counter.frequencies_of_frequencies(total_count_of_ngrams)
+            gt_counts_estimation = self.get_gt_counts_estimation(frequencies_of_ngrams_frequencies, k, self.gt_method)
+            gt_estimation_table_db = self.gt_table_db(frequencies_of_ngrams_frequencies, gt_counts_estimation)
+        with self.stage("csv write"):
+            self.save_csv(os.path.join(self.csv_dir, "good-turing.csv"), gt_estimation_table_db)
+        with self.stage("db write"):
+            self.record_rows("db write", db.tables_names["Good-Turing estimation table"],
+                             db.add_gt_estimation_data(gt_estimation_table_db))
+            db.create_indexes()
+            self.save_db_settings(db, n, k, self.gt_method, source_hash, source, self.file_stats)
+        return gt_estimation_table_db
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Етап обробки: перед початком перевіряється скасування та повідомляється прогрес, тривалість етапу
+        додається до метрик обробки (self.stats)
+        :param name: назва етапу
+        """
+        self.check_cancelled()
+        self.report_progress(name)
+        with self.stats.measure(name):
+            yield
+
+    def record_rows(self, stage, table, rows):
+        """
+        Облік записаних рядків: кількість додається до оброблених елементів етапу та до лічильника "rows.{table}"
+        :param stage: назва етапу
+        :param table: назва таблиці бази даних чи csv-файлу
+        :param rows: кількість записаних рядків
+        """
+        self.stats.add_items(stage, rows)
+        self.stats.count("rows." + table, rows)
+
+    def record_counts(self):
+        """
+        Запис до метрик обробки кількостей оброблених речень і слів та розмірів частотних словників
+        """
+        counter = self.counter
+        self.stats.set("sentences", counter.sentences_count)
+        self.stats.set("tokens", counter.tokens_count)
+        for order in counter.orders:
+            self.stats.set("types.order_{}".format(order), counter.types_count(order))
+        if isinstance(counter, NgramCounter) and counter.track_followers:
+            self.stats.set("followers.contexts", len(counter.followers))
+        if self.file_stats:
+            self.stats.set("files", len(self.file_stats))
+
+    def check_cancelled(self):
+        """
+        Якщо обробку скасовано (встановлено cancel_event) - виникає виняток ProcessingCancelled
+        """
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ProcessingCancelled()
+
+    def report_progress(self, stage):
+        """
+        Повідомлення про прогрес обробки (якщо задано функцію progress)
+        :param stage: назва етапу
+        """
+        if self.progress is not None:
+            self.progress(stage, self.counter.sentences_count)
+
+    def append_to_db(self, db, n, k, source_hash, source):
+        """
+        Дописування частот нового тексту до бази даних та перерахунок таблиць згладжування
+        :param db: об'єкт бази даних
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param source_hash: хеш вмісту нового тексту
+        :param source: опис джерела (шлях до файлу)
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        if db.has_source(source_hash):  # цей текст вже є в базі даних - нічого не змінюємо
+            return db.load_gt_table()
+        decoded = self.counter.decoded
+        # частоти з нового тексту додаються до вже записаних (upsert)
+        with self.stage("db write"):
+            for table, order in (("ngrams frequency table", n), ("(n-1)-grams frequency table", n - 1),
+                                 ("Vocabulary frequency table", 1)):
+                table = db.tables_names[table]
+                self.record_rows("db write", table, db.upsert_freq_data(decoded(self.counter.get_counts(order), order),
+                                                                        table))
+        gt_estimation_table_db = self.recompute_smoothing(db, k)
+        self.save_db_settings(db, n, k, self.gt_method, source_hash, source, self.file_stats)
+        return gt_estimation_table_db
+
+    def recompute_smoothing(self, db, k):
+        """
+        Перерахунок таблиць згладжування Гуда-Тюрінга та Віттена-Белла за частотами, що вже записані в базі даних
+        :param db: об'єкт бази даних
+        :param k: поріг Катца
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        ngrams_table = db.tables_names["ngrams frequency table"]
+        n_minus1_grams_table = db.tables_names["(n-1)-grams frequency table"]
+        with self.stage("smoothing"):
+            # Гуд-Тюрінг: частоти частот N-грам рахуються запитом до бази даних
+            total_count_of_ngrams = db.count_rows(n_minus1_grams_table) * db.count_rows(
+                db.tables_names["Vocabulary frequency table"])
+            frequencies_of_ngrams_frequencies = self.fill_frequencies_of_frequencies(
+                db.load_frequencies_of_frequencies(ngrams_table), total_count_of_ngrams)
+            gt_counts_estimation = self.get_gt_counts_estimation(frequencies_of_ngrams_frequencies, k, self.gt_method)
+            gt_estimation_table_db = self.gt_table_db(frequencies_of_ngrams_frequencies, gt_counts_estimation)
+            # Віттен-Белл: один прохід по типах N-грам, (N-1)-грама - усі слова N-грами, крім останнього
+            types_counts = dict()
+            for ngram, _ in db.load_freq_data(ngrams_table):
+                first = ngram.rsplit(' ', 1)[0]
+                types_counts[first] = types_counts.get(first, 0) + 1
+
+        def smoothing_rows():
+            return ((first, types_counts.get(first, 0)) for first, _ in db.load_freq_data(n_minus1_grams_table))
+
+        with self.stage("db write"):
+            db.clear_table(db.tables_names["Good-Turing estimation table"])
+            db.clear_table(db.tables_names["Smoothing"])
+            self.record_rows("db write", db.tables_names["Good-Turing estimation table"],
+                             db.add_gt_estimation_data(gt_estimation_table_db))
+            self.record_rows("db write", db.tables_names["Smoothing"], db.add_smoothing_data(smoothing_rows()))
+            db.create_indexes()
+        # збереження даних до csv-файлу (повні таблиці з бази даних)
+        with self.stage("csv write"):
+            self.save_csv(os.path.join(self.csv_dir, "ngrams.csv"), db.load_freq_data(ngrams_table))
+            self.save_csv(os.path.join(self.csv_dir, "n_minus1_grams.csv"), db.load_freq_data(n_minus1_grams_table))
+            self.save_csv(os.path.join(self.csv_dir, "witten-bell.csv"), smoothing_rows())
+            self.save_csv(os.path.join(self.csv_dir, "good-turing.csv"), gt_estimation_table_db)
+        return gt_estimation_table_db
+
+    @staticmethod
+    def check_db_settings(db, n):
+        """
+        Перевірка, що в базу даних, до якої дописуються частоти, раніше записувались N-грами того ж порядку
+        :param db: об'єкт бази даних
+        :param n: параметр для позначення N у N-грамах
+        """
+        db_n = db.get_setting("n")
+        if db_n is not None and int(db_n) != n:
+            raise ValueError("Database contains {}-grams, cannot append {}-grams".format(db_n, n))
+
+    @staticmethod
+    def save_db_settings(db, n, k, gt_method, source_hash, source, file_stats=()):
+        """
+        Запис параметрів обробки та обробленого джерела до бази даних
+        :param db: об'єкт бази даних
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param gt_method: метод оцінки параметрів Гуда-Тюрінга
+        :param source_hash: хеш вмісту джерела
+        :param source: опис джерела (шлях до файлу)
+        :param file_stats: статистика файлів джерела, якщо корпус складається з кількох файлів (див. count_files)
+        """
+        db.set_setting("n", n)
+        db.set_setting("k", k)
+        db.set_setting("gt_method", gt_method)
+        db.add_source(source_hash, source)
+        db.add_source_files(source_hash, file_stats)
+
+    @staticmethod
+    def hash_paragraphs(paragraphs, source_hash):
+        """
+        Генератор, що передає параграфи далі без змін і одночасно оновлює хеш їх вмісту
+        :param paragraphs: ітерований об'єкт параграфів тексту
+        :param source_hash: об'єкт хешу (hashlib)
+        :return: генератор параграфів
+        """
+        for p in paragraphs:
+            source_hash.update(p.encode('utf-8'))
+            yield p
+
+    def count_ngrams(self, paragraphs, counter, workers=1, chunk_size=2000, cache_writer=None):
+        """
+        Потокова обробка корпусу: параграфи -> речення -> слова -> N-грами. Частотні словники оновлюються
+        поступово для кожного речення, тому пам'ять залежить лише від кількості різних слів та N-грам,
+        а не від розміру корпусу. Кожне речення розбивається на слова лише один раз
+        :param paragraphs: ітерований об'єкт (список або генератор) параграфів тексту
+        :param counter: об'єкт NgramCounter, що укладає частотні словники
+        :param workers: кількість процесів для підрахунку
+        :param chunk_size: кількість параграфів в одній частині корпусу при паралельній обробці
+        :param cache_writer: об'єкт TokenCacheWriter, до якого записуються ідентифікатори слів кожного речення
+        (лише при послідовній обробці)
+        :return: частотні словники N-грам, (N-1)-грам та словника слів корпуса
+        """
+        if workers > 1:
+            tokens = counter.tokens_count
+            with self.stage("count"):  # при паралельній обробці поділ на слова виконується в тих самих процесах
+                chunks = ((None, chunk) for chunk in self.split_chunks(paragraphs, chunk_size))
+                self.count_ngrams_parallel(chunks, counter, workers)
+            self.stats.add_items("count", counter.tokens_count - tokens)
+        else:
+            self.check_cancelled()
+            self.report_progress("tokenize")
+            # тривалість поділу на речення та слова (разом з читанням корпусу) і тривалість підрахунку N-грам
+            # вимірюються окремо для кожного речення; процесорний час вимірюється для всього проходу і ділиться
+            # між етапами пропорційно до їх тривалості
+            perf_counter = time.perf_counter
+            split_to_words = self.tokenizer.split_to_words
+            tokenize_time = count_time = 0
+            sentences, tokens, cpu = counter.sentences_count, counter.tokens_count, time.process_time()
+            rss = self.stats.peak_rss()
+            with self.stats.profile("tokenize", "count"):
+                start = perf_counter()
+                for s in self.tokenizer.iter_sentences(paragraphs):
+                    words = split_to_words(s)
+                    tokenized = perf_counter()
+                    if cache_writer is None:
+                        counter.update(words)
+                    else:
+                        ids = counter.vocabulary.encode(words)
+                        counter.update_ids(ids)
+                        cache_writer.add(ids)
+                    counted = perf_counter()
+                    tokenize_time += tokenized - start
+                    count_time += counted - tokenized
+                    start = counted
+                    if counter.sentences_count % self.progress_interval == 0:
+                        self.check_cancelled()
+                        self.report_progress("tokenize")
+            cpu = time.process_time() - cpu
+            share = tokenize_time / (tokenize_time + count_time) if tokenize_time + count_time else 0
+            # поділ на слова зберігає лише поточне речення, тому приріст пам'яті проходу належить підрахунку
+            self.stats.add("tokenize", tokenize_time, cpu * share, counter.sentences_count - sentences,
+                           0 if rss is not None else None)
+            self.stats.add("count", count_time, cpu * (1 - share), counter.tokens_count - tokens,
+                           self.stats.peak_rss() - rss if rss is not None else None)
+        n = counter.n
+        return counter.get_counts(n), counter.get_counts(n - 1), counter.get_counts(1)
+
+    def count_ngrams_parallel(self, chunks, counter, workers, on_merged=None):
+        """
+        Паралельний підрахунок N-грам: корпус ділиться на частини по межах параграфів (речення не виходять
+        за межі параграфа, тому поділ не змінює результату), частини обробляються у пулі процесів,
+        а часткові результати об'єднуються у counter у порядку частин корпусу.
+        Одночасно в обробці знаходиться не більше 2 * workers частин, тому корпус не зчитується у пам'ять повністю
+        :param chunks: ітерований об'єкт частин корпусу - пар (мітка частини, список параграфів)
+        :param counter: об'єкт NgramCounter, до якого додаються результати
+        :param workers: кількість процесів
+        :param on_merged: функція on_merged(мітка частини, лічильник частини), що викликається після об'єднання
+        результату частини (наприклад, для статистики файлів корпусу)
+        """
+        chunks = iter(chunks)
+        all_orders = len(counter.orders) == counter.n
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()  # частини, що обробляються, у порядку їх слідування в корпусі: (мітка, future)
+            while True:
+                while len(pending) < 2 * workers:
+                    tag, chunk = next(chunks, (None, None))
+                    if chunk is None:
+                        break
+                    pending.append((tag, executor.submit(Ngrams.count_chunk, counter.n, all_orders, chunk,
+                                                         self.tokenizer.name)))
+                if not pending:
+                    break
+                tag, future = pending.popleft()
+                chunk_counter = future.result()
+                counter.merge(chunk_counter)
+                if on_merged is not None:
+                    on_merged(tag, chunk_counter)
+                if self.cancel_event is not None and self.cancel_event.is_set():
+                    for _, future in pending:  # частини, що ще не почали оброблятись, скасовуються
+                        future.cancel()
+                    raise ProcessingCancelled()
+                self.report_progress("count")
+
+    @staticmethod
+    def split_chunks(paragraphs, chunk_size):
+        """
+        :param paragraphs: ітерований об'єкт параграфів тексту
+        :param chunk_size: кількість параграфів в одній частині
+        :return: генератор частин корпусу (списків параграфів)
+        """
+        paragraphs = iter(paragraphs)
+        while True:
+            chunk = list(islice(paragraphs, chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def count_chunk(n, all_orders, paragraphs, tokenizer="punkt"):
+        """
+        Підрахунок N-грам для однієї частини корпусу (виконується в окремому процесі)
+        :param n: параметр для позначення N у N-грамах
+        :param all_orders: чи рахувати N-грами усіх порядків від 1 до N
+        :param paragraphs: список параграфів частини корпусу
+        :param tokenizer: назва токенізатора (токенізатор створюється в процесі один раз)
+        :return: об'єкт NgramCounter з частотними словниками цієї частини
+        """
+        counter = NgramCounter(n, all_orders)
+        for words in Tokenizer.get(tokenizer).iter_words(paragraphs):
+            counter.update(words)
+        return counter
+
+    @staticmethod
+    def iter_sentences(paragraphs, tokenizer="punkt"):
+        """
+        Генератор речень корпусу
+        :param paragraphs: ітерований об'єкт (список або генератор) параграфів тексту
+        :param tokenizer: назва токенізатора (див. Tokenizer), за замовчуванням - модель Punkt з nltk
+        (як nltk.sent_tokenize)
+        :return: генератор речень
+        """
+        return Tokenizer.get(tokenizer).iter_sentences(paragraphs)
+
+    def save_csv(self, filename, data):
+        """
+        Запис csv-файлу з обліком записаних рядків у метриках етапу "csv write"
+        :param filename: шлях до csv-файлу
+        :param data: ітерований об'єкт рядків
+        """
+        self.record_rows("csv write", os.path.basename(filename), self.write_to_csv(filename, data))
+
     @staticmethod
     def write_to_csv(filename, data):
-        with open(filename, mode='w', newline='') as f:
+        # дані записуються до тимчасового файлу, який замінює основний лише після запису всіх рядків
+        # повертається кількість записаних рядків
+        part_filename = filename + ".part"
+        rows = 0
+        with open(part_filename, mode='w', newline='') as f:
             csv_writer = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
             for row in data:
                 csv_writer.writerow(row)
+                rows += 1
+        os.replace(part_filename, filename)
+        return rows
 
-    def get_sentences_words(self, paragraphs):
-        """
-        На вхід подається текст, поділений на параграфи (абзаци).
-        На вих
-        :param paragraphs: вхідний текст подається у вигляді списку параграфів
-        :return: sentences - список речень, 
-        words - множина слів тексту (словник слів тексту)
-        all_words - усі слова, що є в тексті
-        """
-        # списки для збереження результату
-        sentences, words, all_words = [], [], []
-        for p in paragraphs:  # для кожного абзацу 
-            sentence = sent_tokenize(p)  # за допомогою nltk.sent_tokenize розбиваємо абзац на речення
-            sentences.extend(sentence)  # речення даного абзацу додаємо до списку речень
-        for s in sentences:  # для кожного речення
-            words_in_sentence = self.split_to_words(s)  # розбиваємо речення на слова
-            all_words.extend(words_in_sentence)  # додаємо усі слова цього речення до списку all_words
-        # до списку words додаємо слово, якщо його ще немає у списку words
-        # у вас виникає запитання: чому просто не скористатися words = set(all_words)
-        # потрібно зберегти порядок для відображення у базі даних таблиці частот словника слів (vocab_freq)
-        for w in all_words:
-            if w not in words:
-                words.append(w)
-        return sentences, words, all_words
-
-    def ngrams_from_sentence(self, sentences, n):
-        """
-        Для кожного речення будуються N-грами
-        :param sentences: речення, для потрібно побудувати n-грами
-        :param n: означає, які саме n-грами будувати: 2-грами, 3-грами
-        :return: список N-грам
-        """
-        ngrams_list = []
-        for s in sentences:
-            n_grams = self.get_ngrams(s, n)
-            ngrams_list.extend(n_grams)
-        return ngrams_list
-
-    def get_ngrams(self, sentence, n):
-        """
-        На вхід подається речення, на виході - список його
-        :param sentence:
-        :param n: параметр для позначення N у N-грамах
-        :return:  # список n-Грам цього речення. Кожна N-грама записується у вигляді рядка: слово1 слово2 ... словоN
+    def tee_to_csv(self, filename, data):
+        """
+        Генератор, що передає рядки далі без змін і одночасно записує їх до csv-файлу (щоб записати потік рядків
+        і до бази даних, і до csv-файлу за один прохід). Файл замінює попередній лише після передачі всіх рядків
+        :param filename: шлях до csv-файлу
+        :param data: ітерований об'єкт рядків
+        :return: генератор рядків
         """
-        words = self.split_to_words(sentence)
-        if len(words) < n:  # якщо в реченні менше слів, ніж
-            return []
-        # оскільки це об'єкт-генератор, у наступному рядку конвертую отримані N-грами в список
-        n_grams = ngrams(words, n)
-        return [' '.join(grams) for grams in n_grams]
+        part_filename = filename + ".part"
+        rows = 0
+        try:
+            with open(part_filename, mode='w', newline='') as f:
+                csv_writer = csv.writer(f, delimiter=';', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+                for row in data:
+                    csv_writer.writerow(row)
+                    rows += 1
+                    yield row
+        except BaseException:  # запис перервано (наприклад, помилкою запису до бази даних)
+            os.remove(part_filename)
+            raise
+        os.replace(part_filename, filename)
+        self.stats.count("rows." + os.path.basename(filename), rows)
 
     @staticmethod
     def split_to_words(text):
@@ -133,115 +759,40 @@ class Ngrams:
         :param text: текст, в якому здійснюється поділ на слова
         :return: список слів цього тексту
         """
-        # поділ на слова
-        # розділювачі
-        delimiters = [".", ";", "!", "?", ":", ",", " ", "\n", "", "(", ")", "‘", "—"]
-        # поділ на основі регулярного виразу
-        # здійснюється поділ по перелічених в квадратних дужках символах + в кінці 0 або більше символів пробілів
-        words_list = re.split(r'[.;!?:(),—"‘\s]\s*', text)
-        # конвертуємо кожне слово до нижнього регістру та не враховуємо до нового списку words розділювачі
-        words = [w.lower() for w in words_list if w not in delimiters]
-        return words
+        return Tokenizer.split_to_words(text)
 
     @staticmethod
-    def get_freq_dict(data_list):
-        """
-        Побудова частотного словника для списку даних (використувується для N-грам, (N-1)-грам,
-        словника слів, частот N-грам
-        :param data_list: список з даними, для якого потрібно побудувати частотний словник
-        :return: частотний словник для списку даних data_list
-        """
-        d = dict()  # оголошуємо словник - пари {ключ: значення}
-        for item in data_list:  # для кожного елементу в списку
-            if item in d.keys():  # якщо цей елемент вже є в списку ключів словника
-                d[item] += 1  # зібльшуємо частоту на 1
-            else:
-                d[item] = 1  # інакше встановлюємо частоту = 1
-        return d
-
-    def get_frequencies_of_ngrams_frequencies(self, ngrams_freq_dict, total):
+    def get_frequencies_of_ngrams_frequencies(ngrams_freq_dict, total):
         """
         Знаходження частот для частот N-грам
         :param ngrams_freq_dict: частотний словник N-грам
         :param total: Загальна кількість N-грам, яку можна утворити в даному корпусі
         це кількість (N-1)-грам помножена на розмір словника слів корпусу
-        :return: частотний словник для частот N-грам
-        """
-        frequencies = ngrams_freq_dict.values()  # добуваємо із частотного словника список значень (список з частотами)
-        v_dict = self.get_freq_dict(frequencies)  # будуємо частотний словник частот N-грам
-        # створюємо словник, де парою є {частота N-грам : кількість, скільки разів зустрічається ця частота}
-        variation_dict = dict()
-        # заповнюємо словник значеннями: від нуля до максимальної частоти, на даний момент кількість,
-        # скільки разів зустрічається певна частота ініціалізуємо нулем
-        # range(max(frequencies) + 1) - тому, що range(m) - це список від 0 до m-1
-        for i in range(max(frequencies) + 1):
-            variation_dict[i] = 0
-        # заповнюємо словник variation_dict значеннями з побудованого частотного словника частот v_dict
-        for freq in v_dict.keys():
-            # частоти словника variation_dict, яких немає в списку ключів побудованого частотного словника v_dict,
-            # залишаться незмінними (рівними нулю)
-            variation_dict[freq] = v_dict[freq]
-        # підраховуємо кількість N-грам частоти нуль: це загальна кількість N-грам, яку можна побудувати
-        # в даному корпусі мінус сума всіх кількостей частот N-грам від 1 до максимальної частоти
-        variation_dict[0] = total - sum(k * v for k, v in variation_dict.items())
-        return variation_dict
+        :return: масив частот частот N-грам від 0 до максимальної частоти (індекс - частота)
+        """
+        return GoodTuring.frequencies_of_frequencies(ngrams_freq_dict.values(), total)
 
     @staticmethod
-    def get_gt_counts_estimation(n_c, k):
+    def fill_frequencies_of_frequencies(v_dict, total):
         """
-
-        :param n_c: кількість N-грам, що зустрічаються c разів
-        :param k: поріг Катца (Katz threshold)
-        :return: для кожної частоти N-грам повертається її згладжена кількість Гуда-Тюрінга
-        (див. останній стовпчик таблиці 6.10 на сторінці 213 (238 в рідері) книжки Журафського)
-        """
-        # словник
-        # ключ: частота N-грам
-        # значення: список у форматі:[скільки N-грам є в корпусі для цієї частоти,
-        # згладжена кількість за Гудом-Тюрінгом (Good-Turing counts re_estimation) ]
-        gt_counts = dict()
-        m = max(n_c.keys())
-        if k > m:
-            for i in range(m + 1, k + 2):
-                n_c[i] = 0
-        for c in range(m + 1):
-            # за формулою 6.29 на сторінці 214 (239 в рідері) книжки Журафського
-            if 0 <= c <= k:
-                estimated_count = (((c + 1) * (n_c[c + 1]) / (n_c[c])) - ((n_c[k + 1] * c * (k + 1)) / n_c[1])) \
-                                  / (1 - (n_c[k + 1] * (k + 1)) / (n_c[1]))
-            else:
-                estimated_count = c
-            gt_counts[c] = [n_c[c], estimated_count]
-        return gt_counts
+        Частоти частот N-грам з розрідженого словника частот частот з додаванням кількості N-грам частоти нуль
+        :param v_dict: частотний словник частот N-грам {частота: кількість N-грам з такою частотою}
+        :param total: Загальна кількість N-грам, яку можна утворити в даному корпусі
+        :return: масив частот частот N-грам від 0 до максимальної частоти (індекс - частота)
+        """
+        return GoodTuring.from_dict(v_dict, total)
 
     @staticmethod
-    def get_ngrams_types_counts_for_n_minus1_grams(ngrams_freq_dict, n_minus1_grams_freq_dict, words):
+    def get_gt_counts_estimation(n_c, k, method="katz"):
         """
-        Для кожної (N-1)-грами знаходимо кількість типів N-грам, які можна утворити для цієї (N-1)-грами
-        в даному корпусі
-        :param ngrams_freq_dict: частотний словник N-грам
-        :param n_minus1_grams_freq_dict: частотний словник (N-1)-грам
-        :param words: словник слів у корпусі
-        :return: словник у форматі: {(N-1)-грама: кількість типів N-грам, які можна утворити з даної (N-1)-грами в
-        даному корпусі}
-        """
-        # словник t у форматі: {(N-1)-грама: кількість типів N-грам, які можна утворити з даної (N-1)-грами}
-        t = dict()
-        for i in n_minus1_grams_freq_dict.keys():
-            t[i] = 0
-        # Як утворюється N-грама: до кожної (N-1)-грами дописуємо почергово кожне слово зі словника слів
-        # Як рахувати кількість типів N-грам, які утворюються з даної (N-1)-грами:
-        # Якщо N-грама, утворена об'єднанням (N-1)-грами і певного слова зі словника слів,
-        # є в частотному словнику N-грам, тобто частота N-грами в корпусі більше нуля, то цей тип N-грами
-        # можна утворити з даної (N-1)-грами, і значення у словнику t збільшується на одиницю
-        for first in n_minus1_grams_freq_dict.keys():  # для кожної (N-1)-грами
-            for second in words:  # для кожного слова в словнику слів
-                ngram = " ".join([first, second])  # об'єднання (N-1)-грами і слова зі словника слів у N-граму
-                count = ngrams_freq_dict.get(ngram, 0)  # Пошук даної N-грами в частотному словнику,
-                # якщо такої N-грами немає - повертається кількість нуль
-                if count > 0:  # якщо кількість більше нуля, тобто така N-грама існує в корпусі, то
-                    t[first] += 1  # збільшуємо кількість типів N-грам для цієї (N-1)-грами на одиницю
-        return t
+
+        :param n_c: кількість N-грам, що зустрічаються c разів (масив, індекс - частота c)
+        :param k: поріг Катца (Katz threshold)
+        :param method: "katz" - формула з порогом Катца (див. останній стовпчик таблиці 6.10 на сторінці 213
+        (238 в рідері) книжки Журафського), "simple" - Simple Good-Turing (див. GoodTuring.simple)
+        :return: масив згладжених кількостей Гуда-Тюрінга для кожної частоти N-грам
+        """
+        return GoodTuring.estimate(n_c, k, method)
 
     @staticmethod
     def freq_table_db(d):
@@ -249,35 +800,24 @@ class Ngrams:
         Функція для підготовки запису таблиць частот до бази даних. Таблиці частот представлено у вигляді словника
         Потрібно конвертувати словник у список кортежів
         :param d: частотний словник
-        :return: список кортежів таблиці частотного словника (кожен кортеж - ця рядочок таблиці в базі даних)
+        :return: генератор кортежів таблиці частотного словника (кожен кортеж - ця рядочок таблиці в базі даних).
+        Генератор не копіює словник у список, тому його можна отримувати повторно для кожного запису
         """
-        results = []
         # k - сутності, для яких визначено частоти (N-грами, (N-1)-грами, слова зі словника слів,
         # у випадку частотного словника частот - частоти
         # v - частоти
         for k, v in d.items():
-            t = tuple([k, v])
-            results.append(t)
-        return results
+            yield k, v
 
     @staticmethod
-    def gt_table_db(d):
+    def gt_table_db(n_c, gt_counts):
         """
         Конвертація таблиці з параметрами згладжування Гуда-Тюрінга для збереження в базі даних
-        :param d: словник
-        ключ: частота N-грам
-        значення: список у форматі:[скільки N-грам є в корпусі для цієї частоти,
-        згладжена кількість за Гудом-Тюрінгом (Good-Turing counts re_estimation) ]
-        :return: список кортежів для збереження таблиці у базі даних
+        :param n_c: масив частот частот N-грам
+        :param gt_counts: масив згладжених кількостей Гуда-Тюрінга
+        :return: список кортежів для збереження таблиці у базі даних, кожен кортеж містить три елементи:
+        1) частота N-грами
+        2) скільки N-грам є в корпусі для цієї частоти
+        3) згладжена кількість за Гудом-Тюрінгом для цієї частоти N-грам
         """
-        results = []
-        for k, v in d.items():
-            # дана функція відрізняється від попередньої наявністю * біля значень v словника
-            # * означає розпакування елементів списку v (див. які значення (values) має словник d
-            # тому кортеж t у даному випадку містить три елементи:
-            # 1) частота N-грами
-            # 2) скільки N-грам є в корпусі для цієї частоти
-            # 3) згладжена кількість за Гудом-Тюрінгом для цієї частоти N-грам
-            t = tuple([k, *v])
-            results.append(t)
-        return results
+        return list(zip(range(len(n_c)), n_c.tolist(), gt_counts.tolist()))
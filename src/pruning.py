@@ -0,0 +1,106 @@
+from src.vocabulary import Vocabulary
+
+
+class Pruning:
+    def __init__(self, min_counts=None, max_vocab=None, top_k=None, unk="<unk>"):
+        """
+        Клас, що зменшує таблиці моделі перед записом до бази даних та csv-файлів. Більшість рядків таблиць
+        великого корпусу - N-грами, що зустрілись один раз, тому після відсікання розмір бази даних та тривалість
+        запису залежать від розміру моделі, а не корпусу.
+        Параметри згладжування обчислюються за повними (невідсіченими) частотами: частоти частот Гуда-Тюрінга -
+        за усіма N-грамами, кількості типів Віттена-Белла - за усіма продовженнями контексту
+        :param min_counts: найменша частота N-грам кожного порядку: {порядок: частота} або одне число для усіх
+        порядків, більших за 1. N-грама найбільшого порядку залишається лише тоді, коли залишається її контекст.
+        Слова з частотою, меншою за найменшу частоту порядку 1, не відкидаються, а (як і при max_vocab)
+        замінюються словом unk в N-грамах усіх порядків, тому кожна записана N-грама складається зі слів словника
+        :param max_vocab: якщо задано - словник обмежується max_vocab найчастішими словами, інші слова
+        замінюються словом unk ще до побудови N-грам (див. NgramCounter.map_vocabulary)
+        :param top_k: якщо задано - для кожного контексту ((N-1)-грами) залишається не більше top_k
+        найчастіших N-грам
+        :param unk: слово, яким замінюються слова поза словником
+        """
+        # найменша частота для порядків, яких немає в min_counts (для слів - завжди 1, якщо не задано окремо)
+        self.default_min_count = min_counts if isinstance(min_counts, int) else 1
+        self.min_counts = dict(min_counts) if isinstance(min_counts, dict) else dict()
+        if self.default_min_count < 1 or any(count < 1 for count in self.min_counts.values()):
+            raise ValueError("Minimum count must be at least 1")
+        if max_vocab is not None and max_vocab < 1:
+            raise ValueError("Vocabulary size must be at least 1")
+        if top_k is not None and top_k < 1:
+            raise ValueError("Number of N-grams per context must be at least 1")
+        self.max_vocab = max_vocab
+        self.top_k = top_k
+        self.unk = unk
+
+    def min_count(self, order):
+        """
+        :param order: порядок N-грам
+        :return: найменша частота N-грам цього порядку, що записуються
+        """
+        return self.min_counts.get(order, self.default_min_count if order > 1 else 1)
+
+    def maps_vocabulary(self):
+        """
+        :return: True, якщо частина слів замінюється словом unk (задано max_vocab або найменшу частоту слів)
+        """
+        return self.max_vocab is not None or self.min_count(1) > 1
+
+    def map_vocabulary(self, counter):
+        """
+        Обмеження словника лічильника (якщо задано max_vocab або найменшу частоту слів)
+        :param counter: об'єкт NgramCounter
+        :return: кількість замінених слів словника
+        """
+        if not self.maps_vocabulary():
+            return 0
+        return counter.map_vocabulary(self.max_vocab, self.unk, self.min_count(1))
+
+    def prune(self, counter, n):
+        """
+        Відсікання частотних словників N-грам та (N-1)-грам (рідкісні слова вже замінено словом unk, див.
+        map_vocabulary, тому словник слів записується повністю). Порядок рядків (перша поява в корпусі) зберігається
+        :param counter: об'єкт NgramCounter
+        :param n: параметр для позначення N у N-грамах
+        :return: частотні словники N-грам, (N-1)-грам та слів, що записуються
+        """
+        ngrams_dict, n_minus1_grams_dict = (self.cutoff(counter.get_counts(order), self.min_count(order))
+                                            for order in (n, n - 1))
+        vocab_dict = counter.get_counts(1)
+        bits = Vocabulary.id_bits
+        if len(n_minus1_grams_dict) < counter.types_count(n - 1):  # N-грами відсічених контекстів не записуються
+            ngrams_dict = {key: freq for key, freq in ngrams_dict.items() if key >> bits in n_minus1_grams_dict}
+        if self.top_k is not None:
+            ngrams_dict = self.top_k_per_context(ngrams_dict, self.top_k)
+        return ngrams_dict, n_minus1_grams_dict, vocab_dict
+
+    @staticmethod
+    def cutoff(d, min_count):
+        """
+        :param d: частотний словник
+        :param min_count: найменша частота
+        :return: частотний словник без записів з меншою частотою (той самий словник, якщо min_count = 1)
+        """
+        if min_count <= 1:
+            return d
+        return {key: freq for key, freq in d.items() if freq >= min_count}
+
+    @staticmethod
+    def top_k_per_context(ngrams_dict, top_k):
+        """
+        :param ngrams_dict: частотний словник N-грам (ключі - запаковані ідентифікатори слів, див. Vocabulary)
+        :param top_k: найбільша кількість N-грам одного контексту
+        :return: частотний словник, у якому для кожного контексту залишено top_k найчастіших N-грам
+        (при однакових частотах - ті, що з'явились у корпусі раніше)
+        """
+        bits = Vocabulary.id_bits
+        by_context = dict()
+        for key, freq in ngrams_dict.items():
+            by_context.setdefault(key >> bits, []).append((freq, key))
+        dropped = set()
+        for items in by_context.values():
+            if len(items) > top_k:
+                items.sort(key=lambda item: -item[0])  # сортування стабільне - порядок появи зберігається
+                dropped.update(key for _, key in items[top_k:])
+        if not dropped:
+            return ngrams_dict
+        return {key: freq for key, freq in ngrams_dict.items() if key not in dropped}
@@ -0,0 +1,266 @@
+import cProfile
+import copy
+import io
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:  # модуль resource доступний лише в Unix-системах
+    import resource
+except ImportError:
+    resource = None
+
+
+class RunStats:
+    # кількість функцій (cProfile) чи рядків коду (tracemalloc), що потрапляють до звіту профілювання етапу
+    profile_top = 20
+
+    def __init__(self, profile_stages=None, profiler="cprofile", profile_dir=None):
+        """
+        Клас, що збирає метрики обробки корпусу: для кожного етапу - тривалість (реальна та процесорна),
+        кількість викликів, кількість оброблених елементів та приріст пікового використання пам'яті процесом
+        за час етапу; пікове використання пам'яті процесом за всю обробку; а також лічильники (розміри частотних
+        словників, кількість записаних рядків тощо).
+        Будь-який етап можна додатково профілювати (cProfile або tracemalloc); профілювання виконується лише
+        в основному процесі (без процесів паралельної обробки)
+        :param profile_stages: назви етапів, що профілюються (None - профілювання вимкнено, "all" - усі етапи)
+        :param profiler: інструмент профілювання: "cprofile" - час виконання функцій, "tracemalloc" - пікове
+        використання пам'яті об'єктами Python та рядки коду, що виділили найбільше пам'яті
+        :param profile_dir: якщо задано - результати cProfile кожного етапу записуються до цієї теки
+        (файли "{етап}.prof", які можна відкрити через pstats чи snakeviz)
+        """
+        if profiler not in ("cprofile", "tracemalloc"):
+            raise ValueError("Unknown profiler: {}".format(profiler))
+        self.profile_stages = profile_stages
+        self.profiler = profiler
+        self.profile_dir = profile_dir
+        self.started_at = datetime.now().isoformat(sep=" ", timespec="milliseconds")
+        # метрики етапів: {назва етапу: {wall_seconds, cpu_seconds, calls, items, rss_growth_bytes}}
+        self.stages = dict()
+        # лічильники: {назва: значення}
+        self.counters = dict()
+        # результати профілювання: {назва етапу: об'єкт cProfile.Profile або звіт tracemalloc}
+        self.profiles = dict()
+        # метрики, до яких додаються також усі нові значення цих метрик (див. copy)
+        self.parent = None
+
+    def copy(self, parent=None):
+        """
+        Копія вже зібраних метрик. Використовується для метрик окремого результату обробки (наприклад, однієї
+        з баз даних при перебиранні параметрів): до копії метрик спільних етапів (підрахунку N-грам) додаються
+        лише метрики етапів цього результату
+        :param parent: метрики (загальні для всієї обробки), до яких додаються також усі нові значення копії
+        :return: об'єкт RunStats
+        """
+        stats = RunStats(self.profile_stages, self.profiler, self.profile_dir)
+        stats.started_at = self.started_at
+        stats.stages = copy.deepcopy(self.stages)
+        stats.counters = dict(self.counters)
+        stats.profiles = self.profiles  # результати профілювання накопичуються разом
+        stats.parent = parent
+        return stats
+
+    @contextmanager
+    def measure(self, name):
+        """
+        Вимірювання етапу обробки (з профілюванням, якщо його ввімкнено для цього етапу)
+        :param name: назва етапу
+        """
+        wall, cpu, rss = time.perf_counter(), time.process_time(), self.peak_rss()
+        try:
+            with self.profile(name):
+                yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu,
+                     rss_growth=self.peak_rss() - rss if rss is not None else None)
+
+    def add(self, name, wall_seconds, cpu_seconds, items=0, rss_growth=None):
+        """
+        Додавання виміряних значень до метрик етапу
+        :param name: назва етапу
+        :param wall_seconds: реальна тривалість
+        :param cpu_seconds: процесорна тривалість
+        :param items: кількість оброблених елементів
+        :param rss_growth: на скільки байтів зросло пікове використання пам'яті процесом за час етапу
+        (None - невідомо). Пікове значення процесу лише зростає, тому 0 означає, що етапу вистачило пам'яті,
+        виділеної попередніми етапами
+        """
+        if self.parent is not None:
+            self.parent.add(name, wall_seconds, cpu_seconds, items, rss_growth)
+        stage = self.stage_metrics(name)
+        stage["wall_seconds"] += wall_seconds
+        stage["cpu_seconds"] += cpu_seconds
+        stage["calls"] += 1
+        stage["items"] += items
+        if rss_growth is not None:
+            stage["rss_growth_bytes"] = (stage["rss_growth_bytes"] or 0) + rss_growth
+
+    def add_items(self, name, items):
+        """
+        :param name: назва етапу
+        :param items: кількість оброблених етапом елементів (речень, слів, рядків)
+        """
+        if self.parent is not None:
+            self.parent.add_items(name, items)
+        self.stage_metrics(name)["items"] += items
+
+    def stage_metrics(self, name):
+        """
+        :param name: назва етапу
+        :return: словник метрик етапу (створюється при першому зверненні)
+        """
+        return self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0, "items": 0,
+                                             "rss_growth_bytes": None})
+
+    def count(self, name, value=1):
+        """
+        Збільшення лічильника
+        :param name: назва лічильника
+        :param value: значення, на яке збільшується лічильник
+        """
+        if self.parent is not None:
+            self.parent.count(name, value)
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name, value):
+        """
+        Встановлення значення лічильника (наприклад, розміру словника)
+        :param name: назва лічильника
+        :param value: значення
+        """
+        if self.parent is not None:
+            self.parent.set(name, value)
+        self.counters[name] = value
+
+    @property
+    def timings(self):
+        """
+        :return: реальна тривалість кожного етапу в секундах: {назва етапу: тривалість}
+        """
+        return {name: stage["wall_seconds"] for name, stage in self.stages.items()}
+
+    def profiled(self, *names):
+        """
+        :param names: назви етапів
+        :return: True, якщо хоча б один з етапів профілюється
+        """
+        return self.profile_stages == "all" or bool(self.profile_stages and set(names) & set(self.profile_stages))
+
+    @contextmanager
+    def profile(self, *names):
+        """
+        Профілювання фрагмента обробки, що належить до етапів names (наприклад, поділ на слова та підрахунок
+        N-грам при послідовній обробці чергуються для кожного речення, тому профілюються разом).
+        Результати кількох викликів для тих самих етапів накопичуються
+        :param names: назви етапів
+        """
+        if not self.profiled(*names):
+            yield
+            return
+        label = "+".join(names)
+        if self.profiler == "cprofile":
+            profiler = self.profiles.setdefault(label, cProfile.Profile())
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                if self.profile_dir is not None:
+                    profiler.dump_stats(os.path.join(self.profile_dir, "{}.prof".format(label)))
+            return
+        started = not tracemalloc.is_tracing()
+        if started:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if started:
+                tracemalloc.stop()
+            previous = self.profiles.get(label, {"peak_traced_bytes": 0})
+            self.profiles[label] = {
+                "peak_traced_bytes": max(peak, previous["peak_traced_bytes"]),
+                "top": [{"line": str(stat.traceback), "bytes": stat.size, "blocks": stat.count}
+                        for stat in snapshot.statistics("lineno")[:self.profile_top]],
+            }
+
+    def profile_report(self, label):
+        """
+        :param label: назва етапу (або етапів, об'єднаних "+")
+        :return: звіт профілювання у вигляді, придатному для json: для cProfile - найдовші за сукупним часом
+        функції, для tracemalloc - пікове використання пам'яті та рядки коду з найбільшим виділенням пам'яті
+        """
+        profile = self.profiles[label]
+        if not isinstance(profile, cProfile.Profile):
+            return profile
+        stats = pstats.Stats(profile, stream=io.StringIO()).sort_stats("cumulative")
+        top = []
+        for func in stats.fcn_list[:self.profile_top]:
+            _, calls, total_time, cumulative_time, _ = stats.stats[func]
+            top.append({"function": "{}:{}({})".format(*func), "calls": calls,
+                        "total_seconds": total_time, "cumulative_seconds": cumulative_time})
+        return {"top": top}
+
+    @staticmethod
+    def peak_rss():
+        """
+        :return: пікове використання пам'яті процесом (resident set size) у байтах або None, якщо його
+        неможливо визначити (Windows)
+        """
+        if resource is None:
+            return None
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024  # у Linux значення в кілобайтах
+
+    @staticmethod
+    def peak_children_rss():
+        """
+        :return: найбільше пікове використання пам'яті серед завершених дочірніх процесів (процесів паралельної
+        обробки) у байтах або None
+        """
+        if resource is None:
+            return None
+        rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+
+    def as_dict(self):
+        """
+        :return: звіт про обробку у вигляді словника (для json)
+        """
+        return {
+            "started_at": self.started_at,
+            "stages": self.stages,
+            "counters": self.counters,
+            "peak_rss_bytes": self.peak_rss(),
+            "peak_children_rss_bytes": self.peak_children_rss(),
+            "profiles": {label: self.profile_report(label) for label in self.profiles},
+        }
+
+    def write_json(self, path):
+        """
+        Запис звіту про обробку до json-файлу
+        :param path: шлях до файлу
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.as_dict(), f, indent=2, ensure_ascii=False)
+
+    def rows(self):
+        """
+        Рядки звіту для таблиці run_stats бази даних: кожна метрика - окремий рядок (назва, значення),
+        назви метрик етапів мають вигляд "stage.{етап}.{метрика}", лічильників - "counter.{назва}"
+        :return: список пар (назва метрики, значення)
+        """
+        rows = [("stage.{}.{}".format(name, metric), value)
+                for name, stage in self.stages.items() for metric, value in stage.items() if value is not None]
+        rows += [("counter." + name, value) for name, value in self.counters.items()]
+        for name, value in (("peak_rss_bytes", self.peak_rss()), ("peak_children_rss_bytes", self.peak_children_rss())):
+            if value is not None:
+                rows.append((name, value))
+        return rows
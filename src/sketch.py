@@ -0,0 +1,296 @@
+import math
+import random
+
+import numpy as np
+
+from src.good_turing import GoodTuring
+from src.vocabulary import Vocabulary
+
+# Хеш-функції виду ((a * x + b) mod 2^64) >> (64 - bits) (multiply-shift) над 64-бітними відбитками ключів
+# (див. SketchCounter.fingerprints)
+MASK64 = (1 << 64) - 1
+
+
+def fmix64(h):
+    """
+    Перемішування бітів 64-бітних чисел (фіналізатор MurmurHash3), змінює масив на місці
+    :param h: масив numpy.uint64
+    :return: той самий масив
+    """
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xff51afd7ed558ccd)
+    h ^= h >> np.uint64(33)
+    h *= np.uint64(0xc4ceb9fe1a85ec53)
+    h ^= h >> np.uint64(33)
+    return h
+
+
+class CountMinSketch:
+    def __init__(self, epsilon=1e-5, delta=1e-3, seed=0):
+        """
+        Count-Min sketch: таблиця depth x width лічильників, кожен рядок має власну хеш-функцію.
+        Оцінка частоти - мінімум лічильників ключа по рядках; вона не менша за справжню частоту і з імовірністю
+        не менше 1 - delta перевищує її не більше ніж на epsilon * (загальна кількість доданих ключів)
+        :param epsilon: відносна похибка оцінки частоти
+        :param delta: імовірність перевищення похибки
+        :param seed: початкове значення для вибору хеш-функцій
+        """
+        self.epsilon = epsilon
+        self.delta = delta
+        # ширина - степінь двійки, не менша за e / epsilon
+        self.bits = max(1, math.ceil(math.log2(math.e / epsilon)))
+        self.width = 1 << self.bits
+        self.depth = max(1, math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.uint64)
+        rng = random.Random(seed)
+        self.a = np.array([rng.getrandbits(64) | 1 for _ in range(self.depth)], dtype=np.uint64)
+        self.b = np.array([rng.getrandbits(64) for _ in range(self.depth)], dtype=np.uint64)
+        self.total = 0  # кількість доданих ключів (з повторами)
+
+    def indexes(self, row, fingerprints):
+        """
+        :return: номери лічильників рядка row для масиву відбитків ключів
+        """
+        return (self.a[row] * fingerprints + self.b[row]) >> np.uint64(64 - self.bits)
+
+    def add(self, fingerprints):
+        """
+        Додавання масиву відбитків ключів (кожен відбиток - одне входження ключа)
+        :param fingerprints: масив numpy.uint64
+        """
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self.indexes(row, fingerprints), minlength=self.width).astype(np.uint64)
+        self.total += len(fingerprints)
+
+    def estimate(self, fingerprints):
+        """
+        :param fingerprints: масив numpy.uint64 відбитків ключів
+        :return: масив оцінок частот ключів
+        """
+        return np.min([self.table[row][self.indexes(row, fingerprints)] for row in range(self.depth)], axis=0)
+
+    @property
+    def nbytes(self):
+        """
+        :return: розмір таблиці лічильників у байтах
+        """
+        return self.table.nbytes
+
+
+class MisraGries:
+    def __init__(self, capacity):
+        """
+        Алгоритм Місри-Гріса для пошуку найчастіших елементів: зберігається не більше capacity лічильників.
+        Кожен елемент з частотою більше N / (capacity + 1), де N - кількість доданих елементів, гарантовано
+        залишається серед лічильників
+        :param capacity: максимальна кількість лічильників
+        """
+        self.capacity = capacity
+        self.counters = dict()
+
+    def add(self, key):
+        counters = self.counters
+        if key in counters:
+            counters[key] += 1
+        elif len(counters) < self.capacity:
+            counters[key] = 1
+        else:  # немає вільного лічильника - зменшуємо усі лічильники на одиницю
+            for k in list(counters):
+                if counters[k] == 1:
+                    del counters[k]
+                else:
+                    counters[k] -= 1
+
+
+class SketchCounter:
+    def __init__(self, n, epsilon=1e-5, delta=1e-3, top_k=100000, sample_rate=0.01, buffer_size=65536, seed=0):
+        """
+        Наближений лічильник N-грам з обмеженим використанням пам'яті (замість NgramCounter для дуже великих
+        корпусів). Словник слів рахується точно, а для N-грам та (N-1)-грам зберігаються лише:
+        1) Count-Min sketch - оцінки частот з гарантованою похибкою;
+        2) найчастіші N-грами (Місра-Гріс, не більше top_k) - вони й записуються до таблиць частот з частотами,
+        оціненими за Count-Min sketch;
+        3) точні частоти випадкової (за хешем) вибірки sample_rate усіх типів N-грам - з неї оцінюються частоти
+        частот для згладжування Гуда-Тюрінга, кількість типів N-грам та T(h) для згладжування Віттена-Белла.
+        Набір методів, що використовуються при обробці корпусу, такий самий, як у NgramCounter
+        :param n: найбільший порядок N-грам
+        :param epsilon: відносна похибка Count-Min sketch
+        :param delta: імовірність перевищення похибки Count-Min sketch
+        :param top_k: кількість найчастіших N-грам кожного порядку, що записуються до таблиць частот
+        :param sample_rate: частка типів N-грам, для яких частоти рахуються точно
+        :param buffer_size: кількість N-грам, що накопичуються перед оновленням Count-Min sketch
+        :param seed: початкове значення для вибору хеш-функцій
+        """
+        self.n = n
+        self.orders = sorted({1, n - 1, n} - {0})
+        self.epsilon = epsilon
+        self.delta = delta
+        self.top_k = top_k
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.vocabulary = Vocabulary()
+        self.words_counts = dict()  # точний частотний словник слів
+        ngram_orders = [order for order in self.orders if order > 1]
+        self.sketches = {order: CountMinSketch(epsilon, delta, seed + order) for order in ngram_orders}
+        self.heavy_hitters = {order: MisraGries(top_k) for order in ngram_orders}
+        self.samples = {order: dict() for order in ngram_orders}
+        self.buffers = {order: [] for order in ngram_orders}
+        rng = random.Random(seed)
+        self.sample_a = rng.getrandbits(64) | 1
+        self.sample_b = rng.getrandbits(64)
+        self.sample_threshold = min(int(sample_rate * (1 << 64)), MASK64)
+        self.counts = dict()  # результати (частотні словники), обчислюються після підрахунку (get_counts)
+        self.sentences_count = 0
+        self.tokens_count = 0
+
+    def update(self, words):
+        """
+        Оновлення лічильників словами одного речення
+        :param words: список слів речення
+        """
+        self.update_ids(self.vocabulary.encode(words))
+
+    def update_ids(self, ids):
+        """
+        Оновлення лічильників ідентифікаторами слів одного речення
+        :param ids: список ідентифікаторів слів речення
+        """
+        self.sentences_count += 1
+        self.tokens_count += len(ids)
+        self.counts = dict()
+        words_counts = self.words_counts
+        for key in ids:
+            words_counts[key] = words_counts.get(key, 0) + 1
+        bits = Vocabulary.id_bits
+        for order, buffer in self.buffers.items():
+            add = self.heavy_hitters[order].add
+            mask = (1 << (bits * order)) - 1
+            key = 0
+            for i, word_id in enumerate(ids):
+                key = ((key << bits) | word_id) & mask
+                if i >= order - 1:
+                    buffer.append(key)
+                    add(key)
+            if len(buffer) >= self.buffer_size:
+                self.flush(order)
+
+    def flush(self, order):
+        """
+        Додавання накопичених N-грам до Count-Min sketch та до вибірки
+        :param order: порядок N-грам
+        """
+        buffer = self.buffers[order]
+        if not buffer:
+            return
+        fingerprints = self.fingerprints(buffer, order)
+        self.sketches[order].add(fingerprints)
+        # вибірка: N-грама потрапляє до вибірки, якщо значення незалежної хеш-функції її відбитка менше за поріг,
+        # тому кожен тип N-грами або завжди потрапляє до вибірки, або ніколи
+        sampled = (np.uint64(self.sample_a) * fingerprints + np.uint64(self.sample_b)) < np.uint64(
+            self.sample_threshold)
+        sample = self.samples[order]
+        for i in np.flatnonzero(sampled).tolist():
+            key = buffer[i]
+            sample[key] = sample.get(key, 0) + 1
+        buffer.clear()
+
+    @staticmethod
+    def fingerprints(keys, order):
+        """
+        64-бітні відбитки ключів N-грам: ключ ділиться на 64-бітні частини, які послідовно перемішуються.
+        Ключі 1- та 2-грам вміщуються в 64 біти, тому їх відбитки не збігаються
+        :param keys: список ключів N-грам
+        :param order: порядок N-грам
+        :return: масив numpy.uint64 відбитків ключів
+        """
+        h = np.zeros(len(keys), dtype=np.uint64)
+        for shift in range(0, order * Vocabulary.id_bits, 64):
+            chunk = np.fromiter(((key >> shift) & MASK64 for key in keys), dtype=np.uint64, count=len(keys))
+            h = fmix64((h * np.uint64(0x9e3779b97f4a7c15)) ^ chunk)
+        return h
+
+    def get_counts(self, order):
+        """
+        :param order: порядок N-грам
+        :return: частотний словник: для слів - точний, для N-грам - найчастіші N-грами з оціненими частотами
+        """
+        if order == 1:
+            return self.words_counts
+        if order not in self.counts:
+            self.flush(order)
+            keys = list(self.heavy_hitters[order].counters)
+            estimates = self.sketches[order].estimate(self.fingerprints(keys, order)).tolist() if keys else []
+            # найчастіші N-грами впорядковуються за спаданням частоти
+            self.counts[order] = dict(sorted(zip(keys, estimates), key=lambda item: -item[1]))
+        return self.counts[order]
+
+    def types_count(self, order):
+        """
+        :param order: порядок N-грам
+        :return: кількість типів N-грам (для N-грам - оцінка за вибіркою)
+        """
+        if order == 1:
+            return len(self.words_counts)
+        self.flush(order)
+        return round(len(self.samples[order]) / self.sample_rate)
+
+    def frequencies_of_frequencies(self, total, order=None):
+        """
+        Оцінка частот частот N-грам за вибіркою: частоти частот вибірки, поділені на частку вибірки
+        :param total: загальна кількість N-грам, яку можна утворити в даному корпусі
+        :param order: порядок N-грам (N або N-1, за замовчуванням - N)
+        :return: масив частот частот N-грам (див. GoodTuring)
+        """
+        order = order or self.n
+        self.flush(order)
+        n_c = GoodTuring.frequencies_of_frequencies(self.samples[order].values(), 0)
+        n_c = np.rint(n_c / self.sample_rate).astype(np.int64)
+        return GoodTuring.fill_unseen(n_c, total)
+
+    def get_types_counts(self, contexts, order=None):
+        """
+        Оцінка кількості типів N-грам для кожної (N-1)-грами (T(h) для згладжування Віттена-Белла) за вибіркою
+        :param contexts: ітерований об'єкт ключів (N-1)-грам
+        :param order: порядок N-грам (N або N-1, за замовчуванням - N)
+        :return: словник у форматі: {ключ (N-1)-грами: оцінка кількості типів N-грам}
+        """
+        order = order or self.n
+        self.flush(order)
+        bits = Vocabulary.id_bits
+        sampled = dict()
+        for key in self.samples[order]:
+            h = key >> bits
+            sampled[h] = sampled.get(h, 0) + 1
+        return {h: round(sampled.get(h, 0) / self.sample_rate) for h in contexts}
+
+    def decoded(self, d, order):
+        """
+        Генератор рядків таблиці частотного словника, у якій ключі N-грам перетворено назад у текст
+        """
+        decode = self.vocabulary.decode
+        for key, value in d.items():
+            yield decode(key, order), value
+
+    def error_bounds(self):
+        """
+        :return: гарантії похибки та використання пам'яті для кожного порядку N-грам (для звіту)
+        """
+        bounds = dict()
+        for order, sketch in self.sketches.items():
+            self.flush(order)
+            bounds[order] = {
+                "ngrams": sketch.total,
+                "epsilon": self.epsilon,
+                "delta": self.delta,
+                # частота кожної N-грами оцінюється не менше справжньої і з імовірністю 1 - delta - не більше,
+                # ніж на max_overestimate
+                "max_overestimate": self.epsilon * sketch.total,
+                # усі N-грами з частотою, більшою за поріг, гарантовано є в таблиці частот
+                "heavy_hitter_threshold": sketch.total / (self.top_k + 1),
+                "top_k": self.top_k,
+                "sample_rate": self.sample_rate,
+                "sampled_types": len(self.samples[order]),
+                "estimated_types": self.types_count(order),
+                "sketch_bytes": sketch.nbytes,
+            }
+        return bounds
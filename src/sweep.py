@@ -0,0 +1,92 @@
+import os
+import shutil
+
+from src.ngrams import Ngrams
+
+
+class NgramsSweep(Ngrams):
+    def __init__(self, ns, ks, corpus, db_template, csv_dir="../csv_files", **kwargs):
+        """
+        Перебір параметрів обробки (sweep): корпус обробляється один раз - N-грами усіх порядків рахуються
+        для найбільшого N (all_orders), після чого для кожної пари (N, k) записується окрема база даних.
+        Для однакового N таблиці частот та Віттена-Белла не залежать від k, тому база даних для наступного k
+        є копією попередньої, у якій перераховується лише таблиця згладжування Гуда-Тюрінга.
+        Результат для кожної пари (N, k) такий самий, як при окремій обробці корпусу через Ngrams
+        :param ns: список значень N
+        :param ks: список порогів Катца
+        :param corpus: корпус тексту (див. Ngrams)
+        :param db_template: шаблон шляху до баз даних, {n} та {k} замінюються значеннями параметрів
+        :param csv_dir: тека, у якій для кожної пари (N, k) створюється тека csv-файлів "{n}-grams-k{k}"
+        :param kwargs: інші параметри Ngrams (workers, tokenizer, gt_method, token_cache, progress, ...)
+        """
+        if kwargs.get("append") or kwargs.get("sketch") is not None or kwargs.get("max_entries") is not None:
+            raise ValueError("Parameter sweep supports neither append mode nor approximate or external counting")
+        if min(ns) < 2:
+            raise ValueError("N must be at least 2")
+        # повтори значень відкидаються, порядок значень зберігається
+        self.ns = list(dict.fromkeys(ns))
+        self.ks = list(dict.fromkeys(ks))
+        self.configs = [(n, k) for n in self.ns for k in self.ks]
+        self.db_paths = dict()  # шляхи до баз даних: {(N, k): шлях}
+        self.gt_tables = dict()  # таблиці згладжування Гуда-Тюрінга: {(N, k): таблиця}
+        # метрики обробки кожної бази даних: {(N, k): RunStats} - метрики підрахунку N-грам (спільні для усіх
+        # баз даних) та запису цієї бази даних; self.stats містить метрики усієї обробки
+        self.config_stats = dict()
+        super().__init__(max(self.ns), self.ks[0], corpus, db_template, all_orders=True, csv_dir=csv_dir, **kwargs)
+
+    def process(self, n, k, corpus, db_path):
+        """
+        Підрахунок N-грам та запис баз даних для усіх пар (N, k)
+        :return: таблиця згладжування Гуда-Тюрінга для першої пари (N, k)
+        """
+        source = corpus if isinstance(corpus, str) else "<corpus>"
+        source_hash = self.count_corpus(corpus)
+        run_stats = self.stats
+        counting_stats = run_stats.copy()  # метрики підрахунку N-грам, спільні для усіх баз даних
+        for n in self.ns:
+            first = None  # база даних та тека csv-файлів першого k для цього N
+            for k in self.ks:
+                path = db_path.format(n=n, k=k)
+                csv_dir = os.path.join(self.csv_dir, "{}-grams-k{}".format(n, k))
+                os.makedirs(csv_dir, exist_ok=True)
+                # до таблиці run_stats кожної бази даних записуються лише метрики її запису (та підрахунку)
+                self.stats = self.config_stats[(n, k)] = counting_stats.copy(parent=run_stats)
+                try:
+                    if first is None:
+                        self.gt_tables[(n, k)] = self.write_db(
+                            path, lambda db: self.write_results(db, n, k, source_hash, source, csv_dir))
+                        first = path, csv_dir
+                    else:
+                        self.gt_tables[(n, k)] = self.write_db(
+                            path, lambda db: self.rewrite_good_turing(db, n, k, csv_dir, first[1]),
+                            copy_from=first[0])
+                finally:
+                    self.stats = run_stats
+                self.db_paths[(n, k)] = path
+        return self.gt_tables[self.configs[0]]
+
+    def rewrite_good_turing(self, db, n, k, csv_dir, source_csv_dir):
+        """
+        Перерахунок таблиці згладжування Гуда-Тюрінга для іншого порогу Катца у копії бази даних
+        :param db: об'єкт бази даних (копія бази даних з тим самим N)
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param csv_dir: тека для csv-файлів
+        :param source_csv_dir: тека csv-файлів бази даних, з якої зроблено копію
+        :return: таблиця згладжування Гуда-Тюрінга
+        """
+        with self.stage("smoothing"):
+            total_count_of_ngrams = self.counter.types_count(n - 1) * self.counter.types_count(1)
+            frequencies_of_ngrams_frequencies = self.counter.frequencies_of_frequencies(total_count_of_ngrams, n)
+            gt_counts_estimation = self.get_gt_counts_estimation(frequencies_of_ngrams_frequencies, k, self.gt_method)
+            gt_estimation_table_db = self.gt_table_db(frequencies_of_ngrams_frequencies, gt_counts_estimation)
+        with self.stage("csv write"):
+            for name in ("ngrams.csv", "n_minus1_grams.csv", "witten-bell.csv"):
+                shutil.copyfile(os.path.join(source_csv_dir, name), os.path.join(csv_dir, name))
+            self.save_csv(os.path.join(csv_dir, "good-turing.csv"), gt_estimation_table_db)
+        with self.stage("db write"):
+            db.clear_table(db.tables_names["Good-Turing estimation table"])
+            self.record_rows("db write", db.tables_names["Good-Turing estimation table"],
+                             db.add_gt_estimation_data(gt_estimation_table_db))
+            db.set_setting("k", k)
+        return gt_estimation_table_db
@@ -1,3 +1,8 @@
+import os
+import queue
+import re
+import threading
+import time
 from tkinter import *
 from tkinter import filedialog, messagebox
 from tkinter.ttk import *
@@ -6,10 +11,15 @@ from matplotlib.backends.backend_tkagg import (FigureCanvasTkAgg, NavigationTool
 from matplotlib.figure import Figure
 
 from src.chart import FrequencyChart
-from src.ngrams import Ngrams, Database
+from src.corpus import CorpusReader
+from src.ngrams import Ngrams, Database, ProcessingCancelled
+from src.sweep import NgramsSweep
 
 
 class TkinterApp(Tk):
+    # тека кешу токенізації (як --token-cache командного рядка); None - тека token_cache поруч з базою даних
+    token_cache_dir = None
+
     def __init__(self):
         super().__init__()
         self.title("NGRAMS")
@@ -34,6 +44,9 @@ class TkinterApp(Tk):
         # видобуває з бази даних відповідні значення та оновлює графік на екрані
         frame4 = Frame(self)
         frame4.pack(anchor=W, fill=X)
+        # у рамці прогресу - індикатор виконання обробки корпусу та підпис зі статусом обробки
+        frame_progress = Frame(self)
+        frame_progress.pack(anchor=W, fill=X)
         # у наступній рамці розмістимо полотно canvas, на якому малюється графік
         frame_for_canvas = Frame(self)
         # fill=BOTH - означає, що рамка розтягується в обох напрямках (і по ширині, і по висоті)
@@ -48,13 +61,14 @@ class TkinterApp(Tk):
         # padx, pady - відступи по горизонталі, вертикалі від краю вікна, або попереднього віджета
         n_label.pack(side=LEFT, padx=10, pady=10)
         # self означає, що цей об'єкт належить класу, тобто його можна викликати з будь-якого місця в класі
-        self.n_entry = Entry(frame1, width=7)  # текстове поле для числа N
+        # текстове поле для числа N (кілька значень через кому - перебір параметрів, див. NgramsSweep)
+        self.n_entry = Entry(frame1, width=10)
         self.n_entry.insert(0, '2')  # вставка значення за замовчуванням
         self.n_entry.pack(side=LEFT)
 
         k_label = Label(frame1, text="Katz threshold")  # підпис для порогу Катца
         k_label.pack(side=LEFT, padx=10, pady=10)
-        self.k_entry = Entry(frame1, width=7)  # текстове поле для введення порогу Катца
+        self.k_entry = Entry(frame1, width=10)  # текстове поле для введення порогу Катца (або кількох через кому)
         self.k_entry.insert(0, '5')  # значення за замовчуванням
         self.k_entry.pack(side=LEFT)
 
@@ -85,17 +99,52 @@ class TkinterApp(Tk):
         self.corpus_path_entry.pack(side=LEFT, fill=X, expand=1)
         # Кнопка Load Corpus - завантажує до текстового поля шлях вибраного текстового файлу
         load_corpus_btn = Button(frame3, text="Load Corpus",
-                                 command=lambda: self.load_path_to_entry(self.corpus_path_entry,
-                                                                         ("Txt files", "*.txt")))
+                                 command=lambda: self.load_path_to_entry(
+                                     self.corpus_path_entry, ("Txt files", "*.txt *.txt.gz *.txt.bz2 *.txt.xz"),
+                                     ("Manifest files", "*.lst *.manifest")))
         load_corpus_btn.pack(side=LEFT, padx=10, pady=10, ipadx=25)
+        # Кнопка Load Folder - корпусом є усі текстові файли вибраної теки (включно з вкладеними теками)
+        load_folder_btn = Button(frame3, text="Load Folder", command=lambda: self.load_folder_to_entry())
+        load_folder_btn.pack(side=LEFT, padx=(0, 10), pady=10, ipadx=10)
+        # Прапорець режиму обмеженої пам'яті: корпус не читається у пам'ять повністю, а обробляється потоково
+        self.low_memory = BooleanVar(value=False)
+        low_memory_check = Checkbutton(frame3, text="Low memory mode", variable=self.low_memory)
+        low_memory_check.pack(side=LEFT, padx=(0, 10), pady=10)
+        # Прапорець режиму дописування: частоти з корпусу додаються до вже наявних у базі даних
+        self.append_mode = BooleanVar(value=False)
+        append_check = Checkbutton(frame3, text="Append to database", variable=self.append_mode)
+        append_check.pack(side=LEFT, padx=(0, 10), pady=10)
 
         # розміщуємо елементи четвертої рамки
         # кнопка Write to Database
-        write_db_btn = Button(frame4, text="Write to Database", command=lambda: self.write_to_database())
-        write_db_btn.pack(side=LEFT, padx=10, pady=10, fill=X, expand=1)
+        self.write_db_btn = Button(frame4, text="Write to Database", command=lambda: self.write_to_database())
+        self.write_db_btn.pack(side=LEFT, padx=10, pady=10, fill=X, expand=1)
         # Кнопка Update Frequency Chart
         update_chart_btn = Button(frame4, text="Update Frequency Chart", command=lambda: self.update_chart())
         update_chart_btn.pack(side=LEFT, padx=10, pady=10, fill=X, expand=1)
+        # Прапорець логарифмічного масштабу осей графіка (графік перебудовується одразу, дані беруться з кешу)
+        self.log_scale = BooleanVar(value=False)
+        log_scale_check = Checkbutton(frame4, text="Log-log axes", variable=self.log_scale,
+                                      command=lambda: self.toggle_log_scale())
+        log_scale_check.pack(side=LEFT, padx=10, pady=10)
+        # Кнопка Cancel - зупиняє обробку корпусу (доступна лише під час обробки)
+        self.cancel_btn = Button(frame4, text="Cancel", state=DISABLED, command=lambda: self.cancel_processing())
+        self.cancel_btn.pack(side=LEFT, padx=10, pady=10)
+
+        # розміщуємо елементи рамки прогресу
+        # кількість речень корпусу заздалегідь невідома, тому індикатор працює в режимі "indeterminate"
+        self.progress_bar = Progressbar(frame_progress, mode="indeterminate", length=200)
+        self.progress_bar.pack(side=LEFT, padx=10, pady=(0, 10))
+        self.status_label = Label(frame_progress, text="")
+        self.status_label.pack(side=LEFT, padx=10, pady=(0, 10), fill=X, expand=1)
+        # обробка корпусу виконується в окремому потоці, який передає головному потоку повідомлення через чергу
+        self.processing_events = queue.Queue()
+        self.cancel_event = None
+        self.processing_started = 0
+        # завантажені дані таблиць Гуда-Тюрінга для побудови графіків: {шлях до бази даних: словник з часом зміни
+        # файлу, N, k, найбільшою частотою та рядками таблиці в завантажених межах частот}; при зміні меж частот
+        # всередині завантажених чи масштабу осей база даних повторно не читається
+        self.gt_tables_cache = dict()
         # налаштування елементів, що відповідають за графік
         self.figure = Figure(figsize=(1, 1), dpi=100)
         self.canvas = FigureCanvasTkAgg(self.figure, master=frame_for_canvas)
@@ -104,18 +153,27 @@ class TkinterApp(Tk):
         toolbar = NavigationToolbar2Tk(self.canvas, frame_for_toolbar)
         toolbar.update()
 
-    def load_path_to_entry(self, entry_widget, file_types):
+    def load_path_to_entry(self, entry_widget, *file_types):
         """
         Функція виконується, коли користувач натискає на кнопки Load Database або Load Corpus
         Відкривається вікно вибору файлу, користувач обирає файл, і до відповідного текстового поля записується шлях
         # вибраного файлу
         :param entry_widget: текстове поле, куди записується шлях вибраного файлу
-        :param file_types: фільтр файлових типів, файли яких типів можна вибрати
+        :param file_types: фільтри файлових типів, файли яких типів можна вибрати
         """
-        filename = filedialog.askopenfilename(filetypes=(file_types, ("All files", "*.*")))
+        filename = filedialog.askopenfilename(filetypes=file_types + (("All files", "*.*"),))
         if filename:
             self.set_entry_widget_content(entry_widget, filename)
 
+    def load_folder_to_entry(self):
+        """
+        Функція виконується, коли користувач натискає на кнопку Load Folder: до поля шляху корпусу записується
+        шлях вибраної теки
+        """
+        directory = filedialog.askdirectory()
+        if directory:
+            self.set_entry_widget_content(self.corpus_path_entry, directory)
+
     @staticmethod
     def get_entry_widget_content(entry_widget):
         """
@@ -141,7 +199,7 @@ class TkinterApp(Tk):
         :param data: дані для побудови графіка
         """
         fc = FrequencyChart()
-        fc.chart_draw(self.figure, data)
+        fc.chart_draw(self.figure, data, self.log_scale.get())
         self.canvas.draw()
 
     @staticmethod
@@ -151,17 +209,9 @@ class TkinterApp(Tk):
         :param filename: ім'я текстового файлу
         :return: вміст прочитаного текстового файлу
         """
-        try:  # спочатку відкриємо файл у кодування utf-8
-            # суфікс -sig означає, що не враховуємо BOM-байт (Byte Order Mark)
-            with open(filename, 'r', encoding='utf-8-sig') as f:
-                data = f.readlines()  # список рядків прочитаного файлу
-                f.close()  # закриваємо файловий потік
-        # Якщо виникає помилка декодування Юнікоду, прочитуємо файл в ANSI-кодуванні windows-1251
-        except UnicodeDecodeError:
-            with open(filename, 'r', encoding='windows-1251') as f:
-                data = f.readlines()
-                f.close()
-        return data
+        # спочатку файл читається у кодуванні utf-8, якщо виникає помилка декодування Юнікоду, файл
+        # прочитується в ANSI-кодуванні windows-1251
+        return CorpusReader.read_file(filename)
 
     @staticmethod
     def parse_params(parameter, bound, default_value):
@@ -205,6 +255,33 @@ class TkinterApp(Tk):
             parameter = max_bound
         return parameter
 
+    @staticmethod
+    def parse_params_list(parameter, bound, default_value):
+        """
+        Парсинг параметра, що може містити кілька значень через кому (див. parse_params)
+        :return: список відкоректованих значень без повторів
+        """
+        return list(dict.fromkeys(TkinterApp.parse_params(p, bound, default_value) for p in parameter.split(",")))
+
+    def token_cache_path(self, db):
+        """
+        :param db: шлях до бази даних, вказаний на формі
+        :return: тека кешу токенізації (не залежить від поточної робочої теки)
+        """
+        if self.token_cache_dir is not None:
+            return self.token_cache_dir
+        return os.path.join(os.path.dirname(os.path.abspath(db.split(";")[0].strip())), "token_cache")
+
+    @staticmethod
+    def sweep_db_template(db):
+        """
+        :param db: шлях до бази даних, вказаний на формі (або кілька шляхів через ";" після попереднього перебору)
+        :return: шаблон шляхів до баз даних для перебору параметрів: до імені файлу додаються N та k
+        """
+        root, ext = os.path.splitext(db.split(";")[0].strip())
+        root = re.sub(r"_n\d+_k\d+$", "", root)  # шлях, записаний попереднім перебором
+        return root.replace("{", "{{").replace("}", "}}") + "_n{n}_k{k}" + (ext or ".db")
+
     def write_to_database(self):
         """
         Функція виконується, коли користувач натискає на кнопку Write to Database
@@ -212,70 +289,252 @@ class TkinterApp(Tk):
         # зчитуємо значення параметрів на формі
         n = self.get_entry_widget_content(self.n_entry)
         k = self.get_entry_widget_content(self.k_entry)
-        # парсимо їх
-        n = self.parse_params(n, 2, 2)
-        k = self.parse_params(k, 0, 5)
+        # парсимо їх (кожне поле може містити кілька значень через кому)
+        n = self.parse_params_list(n, 2, 2)
+        k = self.parse_params_list(k, 0, 5)
         # шлях до файлу бази даних
         db = self.get_entry_widget_content(self.db_path_entry)
         # шлях до файлу корпусу тексту
         corpus_path = self.get_entry_widget_content(self.corpus_path_entry)
-        # прочитуємо вміст файлу корпусу тексту
-        try:
-            corpus = self.read_file(corpus_path)
-        # якщо файл не знайдено, виведення вікна про помилку
-        except FileNotFoundError:
+        # якщо файл не знайдено, виведення вікна про помилку (корпусом може бути також тека, шаблон шляхів
+        # чи файл-перелік файлів корпусу)
+        if not os.path.isfile(corpus_path) and not CorpusReader.is_multi_file(corpus_path):
             messagebox.showerror("Corpus file error", "Unable to open corpus file\n{}".format(corpus_path))
             return
-        # обробка корпусу тексту
-        ngrams = Ngrams(n, k, corpus, db)
-        # таблиця з розрахованими частотами частот для побудови графіка
-        gt_table = ngrams.gt_table
-        # зчитуємо з форми значення полів нижньої та верхньої межі частот
-        lower_bound = self.get_entry_widget_content(self.lower_bound_entry)
-        upper_bound = self.get_entry_widget_content(self.upper_bound_entry)
-        # парсинг значень
-        lower_bound = self.parse_params(lower_bound, 0, 0)
-        max_upper_bound = max(list(zip(*gt_table))[0])  # визначення максильно можливої верхньої межі
-        # zip(*gt_table) - означає транспонування таблиці - тепер перший елемент списку - це частоти, другий - частоти частот
-        # до транспонування кожен елемент був представлений у вигляді списку [частота, кількість цієї частоти]
-        upper_bound = self.parse_upper_bound(upper_bound, lower_bound, max_upper_bound)
+        if len(n) * len(k) > 1 and self.append_mode.get():
+            messagebox.showerror("Parameters error", "Append mode supports a single N and Katz threshold")
+            return
         # до текстових полів записуємо відкоректовані значення параметрів
-        self.set_entry_widget_content(self.n_entry, str(n))
-        self.set_entry_widget_content(self.k_entry, str(k))
+        self.set_entry_widget_content(self.n_entry, ", ".join(map(str, n)))
+        self.set_entry_widget_content(self.k_entry, ", ".join(map(str, k)))
+        # обробка корпусу тексту виконується в окремому потоці, щоб вікно не "зависало"
+        self.cancel_event = threading.Event()
+        self.processing_started = time.perf_counter()
+        self.write_db_btn.config(state=DISABLED)
+        self.cancel_btn.config(state=NORMAL)
+        self.progress_bar.start()
+        self.status_label.config(text="Processing...")
+        worker = threading.Thread(target=self.process_corpus, daemon=True,
+                                  args=(n, k, corpus_path, db, self.low_memory.get(), self.append_mode.get()))
+        worker.start()
+        self.after(100, self.poll_processing)
+
+    def process_corpus(self, n, k, corpus_path, db, low_memory, append):
+        """
+        Обробка корпусу тексту (виконується в окремому потоці). Результат передається головному потоку
+        через чергу processing_events, оскільки віджети tkinter можна змінювати лише з головного потоку.
+        Якщо задано кілька значень N чи k - корпус обробляється один раз для усіх пар (N, k) (див. NgramsSweep)
+        :param n: список значень N
+        :param k: список порогів Катца
+        :param corpus_path: шлях до файлу корпусу тексту (або до теки, шаблон шляхів чи файл-перелік)
+        :param db: шлях до файлу бази даних
+        :param low_memory: режим обмеженої пам'яті (корпус читається потоково)
+        :param append: режим дописування до бази даних
+        """
+        events = self.processing_events
+        try:
+            if low_memory or CorpusReader.is_multi_file(corpus_path):
+                # у режимі обмеженої пам'яті передаємо шлях до файлу - корпус читатиметься потоково;
+                # корпус з кількох файлів завжди читається пофайлово
+                corpus = corpus_path
+            else:
+                # прочитуємо вміст файлу корпусу тексту
+                corpus = self.read_file(corpus_path)
+            progress = lambda stage, sentences: events.put(("progress", stage, sentences))
+            token_cache = self.token_cache_path(db)
+            if len(n) * len(k) > 1:
+                ngrams = NgramsSweep(n, k, corpus, self.sweep_db_template(db), cancel_event=self.cancel_event,
+                                     token_cache=token_cache, progress=progress)
+            else:
+                ngrams = Ngrams(n[0], k[0], corpus, db, append=append, cancel_event=self.cancel_event,
+                                token_cache=token_cache, progress=progress)
+            events.put(("done", ngrams))
+        except ProcessingCancelled:
+            events.put(("cancelled",))
+        # помилку (наприклад, при дописуванні N-грам іншого порядку до бази даних) показуємо у вікні
+        except Exception as e:
+            events.put(("error", e))
+
+    def poll_processing(self):
+        """
+        Періодична (кожні 100 мс) перевірка повідомлень від потоку обробки корпусу
+        """
+        while True:
+            try:
+                event = self.processing_events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == "progress":
+                stage, sentences = event[1], event[2]
+                elapsed = time.perf_counter() - self.processing_started
+                rate = sentences / elapsed if elapsed > 0 else 0
+                self.status_label.config(
+                    text="{}: {} sentences, {:.0f} sentences/sec".format(stage, sentences, rate))
+                continue
+            # обробку завершено (успішно, скасовано або з помилкою)
+            self.progress_bar.stop()
+            self.write_db_btn.config(state=NORMAL)
+            self.cancel_btn.config(state=DISABLED)
+            if event[0] == "done":
+                self.show_processing_results(event[1])
+            elif event[0] == "cancelled":
+                self.status_label.config(text="Cancelled, database was not changed")
+            else:
+                self.status_label.config(text="")
+                messagebox.showerror("Processing error", str(event[1]))
+            return
+        self.after(100, self.poll_processing)
+
+    def cancel_processing(self):
+        """
+        Функція виконується, коли користувач натискає на кнопку Cancel
+        """
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state=DISABLED)
+            self.status_label.config(text="Cancelling...")
+
+    def show_processing_results(self, ngrams):
+        """
+        Виведення результатів обробки корпусу: тривалість етапів обробки та графік частот частот
+        :param ngrams: об'єкт Ngrams з результатами обробки
+        """
+        timings = ", ".join("{} {:.2f}s".format(stage, seconds) for stage, seconds in ngrams.timings.items())
+        peak_rss = ngrams.stats.peak_rss()  # пікове використання пам'яті (недоступне у Windows)
+        if peak_rss is not None:
+            timings += ", peak memory {:.0f} MB".format(peak_rss / 2 ** 20)
+        self.status_label.config(text="Done: {} sentences ({})".format(ngrams.counter.sentences_count, timings))
+        if isinstance(ngrams, NgramsSweep):
+            for (n, k), path in ngrams.db_paths.items():
+                self.cache_gt_table(path, n, k, ngrams.gt_tables[(n, k)])
+            # шляхи до усіх записаних баз даних - для повторної побудови графіків кнопкою Update Frequency Chart
+            self.set_entry_widget_content(self.db_path_entry, "; ".join(ngrams.db_paths.values()))
+            lower_bound, upper_bound = self.chart_bounds(max(t[-1][0] for t in ngrams.gt_tables.values()))
+            self.draw_chart_series({config: self.rows_in_range(gt_table, lower_bound, upper_bound)
+                                    for config, gt_table in ngrams.gt_tables.items()})
+            return
+        # таблиця з розрахованими частотами частот для побудови графіка (впорядкована за частотою)
+        gt_table = ngrams.gt_table
+        # визначення максимально можливої верхньої межі та відкоректованих меж частот
+        lower_bound, upper_bound = self.chart_bounds(gt_table[-1][0])
+        # побудова графіка (межі - значення частот, а не номери рядків таблиці)
+        self.draw_chart(self.rows_in_range(gt_table, lower_bound, upper_bound))
+
+    def chart_bounds(self, max_upper_bound):
+        """
+        Зчитування, парсинг та встановлення відкоректованих значень нижньої та верхньої межі частот для графіка
+        :param max_upper_bound: максимально можлива верхня межа (найбільша частота в таблиці Гуда-Тюрінга)
+        :return: нижня та верхня межі частот
+        """
+        lower_bound = self.parse_params(self.get_entry_widget_content(self.lower_bound_entry), 0, 0)
+        upper_bound = self.parse_upper_bound(self.get_entry_widget_content(self.upper_bound_entry), lower_bound,
+                                             max_upper_bound)
         self.set_entry_widget_content(self.lower_bound_entry, str(lower_bound))
         self.set_entry_widget_content(self.upper_bound_entry, str(upper_bound))
+        return lower_bound, upper_bound
+
+    @staticmethod
+    def rows_in_range(gt_table, lower_bound, upper_bound):
+        """
+        :param gt_table: рядки таблиці Гуда-Тюрінга
+        :param lower_bound: нижня межа частот (включно)
+        :param upper_bound: верхня межа частот (включно)
+        :return: рядки таблиці з частотами в заданих межах
+        """
+        return [row for row in gt_table if lower_bound <= row[0] <= upper_bound]
 
-        # побудова графіка
-        self.draw_chart(gt_table[lower_bound:upper_bound + 1])
+    def draw_chart_series(self, gt_tables):
+        """
+        Побудова графіків для кількох пар (N, k) на одному полотні. Якщо пороги Катца різні, на вертикальній осі
+        відкладаються оцінки частот за Гудом-Тюрінгом (кількості частот від порогу Катца не залежать)
+        :param gt_tables: словник {(N, k): рядки таблиці згладжування Гуда-Тюрінга в межах частот}
+        """
+        series = {"N={}, k={}".format(n, k): gt_table for (n, k), gt_table in gt_tables.items()}
+        column = 2 if len({k for _, k in gt_tables}) > 1 else 1
+        FrequencyChart.chart_draw_series(self.figure, series, column, self.log_scale.get())
+        self.canvas.draw()
+
+    def cache_gt_table(self, db_path, n, k, gt_table):
+        """
+        Збереження повної таблиці Гуда-Тюрінга, обчисленої при обробці корпусу, до кешу графіків
+        :param db_path: шлях до бази даних, до якої записано таблицю
+        :param n: параметр для позначення N у N-грамах
+        :param k: поріг Катца
+        :param gt_table: таблиця згладжування Гуда-Тюрінга (впорядкована за частотою)
+        """
+        max_freq = gt_table[-1][0] if gt_table else None
+        self.gt_tables_cache[db_path] = {"mtime": os.path.getmtime(db_path), "n": n, "k": k, "max_freq": max_freq,
+                                         "lower": 0, "upper": max_freq or 0, "rows": gt_table}
+
+    def gt_table_info(self, db_path):
+        """
+        Параметри таблиці Гуда-Тюрінга бази даних (з кешу, якщо файл не змінився з часу попереднього читання)
+        :param db_path: шлях до бази даних
+        :return: запис кешу (словник з N, k, найбільшою частотою та завантаженими рядками) або None, якщо файлу
+        немає чи таблиця порожня
+        """
+        if not os.path.isfile(db_path):
+            return None
+        mtime = os.path.getmtime(db_path)
+        info = self.gt_tables_cache.get(db_path)
+        if info is None or info["mtime"] != mtime:
+            db = Database(db_path, drop=False)
+            info = {"mtime": mtime, "n": db.get_setting("n"), "k": db.get_setting("k"), "max_freq": db.max_freq(),
+                    "lower": 1, "upper": 0, "rows": []}  # рядки ще не завантажено
+            db.close()
+            self.gt_tables_cache[db_path] = info
+        return info if info["max_freq"] is not None else None
+
+    def load_gt_range(self, db_path, lower_bound, upper_bound):
+        """
+        Рядки таблиці Гуда-Тюрінга в заданих межах частот: якщо межі всередині вже завантажених - рядки беруться
+        з кешу, інакше - читаються з бази даних запитом за діапазоном частот
+        :param db_path: шлях до бази даних
+        :param lower_bound: нижня межа частот
+        :param upper_bound: верхня межа частот
+        :return: рядки таблиці (частота, кількість частот, оцінка частоти)
+        """
+        info = self.gt_table_info(db_path)
+        if info["lower"] <= lower_bound and upper_bound <= info["upper"]:
+            return self.rows_in_range(info["rows"], lower_bound, upper_bound)
+        db = Database(db_path, drop=False)
+        info["rows"] = db.load_gt_range(lower_bound, upper_bound)
+        db.close()
+        info["lower"], info["upper"] = lower_bound, upper_bound
+        return info["rows"]
+
+    def toggle_log_scale(self):
+        """
+        Перебудова графіка при зміні масштабу осей (якщо вказано базу даних)
+        """
+        if self.get_entry_widget_content(self.db_path_entry):
+            self.update_chart()
 
     def update_chart(self):
         """
         Функція виконується, коли користувач натискає на кнопку "Update Frequency Chart"
         Відбувається підключення до вказаного файлу бази даних, з неї зчитуються дані для побудови графіка
-        Та на основі вказаних меж частот будується новий графік (без обробки корпусу тексту)
+        Та на основі вказаних меж частот будується новий графік (без обробки корпусу тексту).
+        З бази даних читаються лише рядки з частотами у вказаних межах
         """
-        # зчитуємо шлях до файлу бази даних
+        # зчитуємо шлях до файлу бази даних (або кілька шляхів через ";" - результат перебору параметрів)
         db_path = self.get_entry_widget_content(self.db_path_entry)
         if db_path == "":  # якщо шлях порожній, виводимо повідомлення про помилку
             messagebox.showerror("Database file error", "Database path cannot be empty")
             return
-        # підключення до бази даних
-        db = Database(db_path, drop=False)
-        # завантаження даних для побудови графіка
-        gt_table = db.load_gt_estimation_data()
-        # якщо даних в базі немає виводимо повідомлення про помилку
-        if len(gt_table) == 0:
-            messagebox.showerror("Database file error", "Cannot load data from database\n{}".format(db_path))
+        db_paths = [path.strip() for path in db_path.split(";") if path.strip()]
+        infos = dict()
+        for path in db_paths:
+            infos[path] = self.gt_table_info(path)
+            # якщо даних в базі немає виводимо повідомлення про помилку
+            if infos[path] is None:
+                messagebox.showerror("Database file error", "Cannot load data from database\n{}".format(path))
+                return
+        # зчитування, парсинг та встановлення відкоректованих значень нижньої та верхньої межі частот
+        lower_bound, upper_bound = self.chart_bounds(max(info["max_freq"] for info in infos.values()))
+        if len(db_paths) > 1:  # кілька баз даних - графіки на одному полотні
+            self.draw_chart_series({(info["n"], info["k"]): self.load_gt_range(path, lower_bound, upper_bound)
+                                    for path, info in infos.items()})
             return
-        # зчитування та парсинг значень нижньої та верхньої межі частот
-        lower_bound = self.get_entry_widget_content(self.lower_bound_entry)
-        upper_bound = self.get_entry_widget_content(self.upper_bound_entry)
-        lower_bound = self.parse_params(lower_bound, 0, 0)
-        max_upper_bound = max(list(zip(*gt_table))[0])
-        upper_bound = self.parse_upper_bound(upper_bound, lower_bound, max_upper_bound)
-        # встановлення відкоректованих значень нижньої та верхньої межі частот
-        self.set_entry_widget_content(self.lower_bound_entry, str(lower_bound))
-        self.set_entry_widget_content(self.upper_bound_entry, str(upper_bound))
-
         # побудова нового графіка
-        self.draw_chart(gt_table[lower_bound:upper_bound + 1])
+        self.draw_chart(self.load_gt_range(db_paths[0], lower_bound, upper_bound))
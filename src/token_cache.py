@@ -0,0 +1,200 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from src.corpus import CorpusReader
+from src.vocabulary import Vocabulary
+
+
+class TokenCacheWriter:
+    def __init__(self, path):
+        """
+        Запис потоку ідентифікаторів слів корпусу до файлу кешу під час звичайної обробки корпусу.
+        Ідентифікатори записуються на диск блоками, у пам'яті зберігаються лише довжини речень
+        :param path: шлях до файлу кешу
+        """
+        self.path = path
+        # до імені тимчасового файлу додається ідентифікатор процесу: той самий корпус може одночасно
+        # оброблятися кількома процесами (наприклад, для різних N)
+        self.part_path = "{}.{}.part".format(path, os.getpid())
+        self.file = open(self.part_path, "wb")
+        self.file.write(b"\0" * TokenCache.header.size)  # заголовок записується в кінці (finish)
+        self.lengths = array("I")  # довжини речень (кількість слів)
+        self.ids = array("I")  # ідентифікатори слів, що ще не записані до файлу
+        self.tokens_count = 0
+
+    def add(self, ids):
+        """
+        :param ids: список ідентифікаторів слів одного речення
+        """
+        self.lengths.append(len(ids))
+        self.ids.extend(ids)
+        self.tokens_count += len(ids)
+        if len(self.ids) >= TokenCache.batch_ids:
+            self.ids.tofile(self.file)
+            self.ids = array("I")
+
+    def finish(self, vocabulary, source_hash, file_stats=()):
+        """
+        Завершення запису: після ідентифікаторів записуються довжини речень, словник і статистика файлів корпусу,
+        потім заголовок
+        :param vocabulary: словник слів (Vocabulary), за яким отримано ідентифікатори
+        :param source_hash: хеш вмісту корпусу (для таблиці джерел бази даних)
+        :param file_stats: статистика файлів корпусу з кількох файлів (для таблиці файлів джерел бази даних)
+        """
+        self.ids.tofile(self.file)
+        self.lengths.tofile(self.file)
+        words = "\n".join(vocabulary.id_to_word).encode("utf-8")  # слова не містять пробільних символів
+        self.file.write(words)
+        files = json.dumps(list(file_stats)).encode("utf-8")
+        self.file.write(files)
+        self.file.seek(0)
+        self.file.write(TokenCache.header.pack(TokenCache.magic, TokenCache.version, len(vocabulary),
+                                               len(self.lengths), self.tokens_count, len(words),
+                                               bytes.fromhex(source_hash), len(files)))
+        self.file.close()
+        os.replace(self.part_path, self.path)
+
+    def abort(self):
+        """
+        Скасування запису (наприклад, при помилці обробки)
+        """
+        self.file.close()
+        if os.path.exists(self.part_path):
+            os.remove(self.part_path)
+
+
+class TokenCache:
+    magic = b"NGTK"
+    version = 2
+    # заголовок: сигнатура, версія, розмір словника, кількість речень, кількість слів, довжина словника в байтах,
+    # sha256 вмісту корпусу, довжина статистики файлів корпусу (json) в байтах
+    header = struct.Struct("=4sIIQQQ32sQ")
+    batch_ids = 1 << 20  # скільки ідентифікаторів накопичується перед записом до файлу
+    suffix = ".tok"
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 ** 3, max_age=30 * 24 * 3600):
+        """
+        Кеш токенізації корпусів на диску. Для кожного корпусу зберігається словник слів (у порядку першої появи)
+        та потік ідентифікаторів слів з довжинами речень, тому при повторній обробці того самого корпусу
+        (наприклад, з іншим N чи порогом Катца) поділ на речення та слова не виконується.
+        Ключ кешу - хеш вмісту корпусу разом з назвою та версією токенізатора, тому зміна токенізатора
+        автоматично робить старі записи недійсними. Записи, до яких давно не звертались, видаляються
+        :param cache_dir: тека кешу
+        :param max_bytes: максимальний сумарний розмір файлів кешу
+        :param max_age: максимальний час (у секундах) від останнього використання запису
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def corpus_hash(corpus):
+        """
+        :param corpus: шлях до файлу корпусу (теки, шаблону шляхів чи маніфесту) або список параграфів
+        :return: хеш вмісту корпусу або None, якщо корпус - генератор (його не можна прочитати двічі)
+        """
+        content_hash = hashlib.sha256()
+        if CorpusReader.is_multi_file(corpus):  # корпус з кількох файлів - хеш послідовності хешів файлів
+            for path in CorpusReader.resolve(corpus):
+                content_hash.update(bytes.fromhex(TokenCache.corpus_hash(path)[len("file:"):]))
+            return "files:" + content_hash.hexdigest()
+        if isinstance(corpus, str):
+            with open(corpus, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    content_hash.update(block)
+            return "file:" + content_hash.hexdigest()
+        if isinstance(corpus, (list, tuple)):
+            for p in corpus:
+                content_hash.update(p.encode("utf-8"))
+            return "text:" + content_hash.hexdigest()
+        return None
+
+    def path(self, corpus, tokenizer):
+        """
+        :param corpus: шлях до файлу корпусу або список параграфів
+        :param tokenizer: об'єкт токенізатора (див. Tokenizer)
+        :return: шлях до файлу кешу для цього корпусу та токенізатора або None, якщо корпус не можна кешувати
+        """
+        corpus_hash = self.corpus_hash(corpus)
+        if corpus_hash is None:
+            return None
+        key = hashlib.sha256("{}|{}|{}".format(corpus_hash, tokenizer.cache_key(), Vocabulary.id_bits)
+                             .encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + self.suffix)
+
+    def read(self, path):
+        """
+        Прочитання запису кешу: файл відображається в пам'ять, ідентифікатори слів не копіюються повністю
+        :param path: шлях до файлу кешу
+        :return: словник слів (Vocabulary), хеш вмісту корпусу, статистика файлів корпусу та генератор списків
+        ідентифікаторів слів речень
+        """
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mm) < self.header.size:
+            mm.close()
+            raise ValueError("{} is not a token cache file".format(path))
+        (magic, version, vocabulary_size, sentences, tokens, words_size, source_hash,
+         files_size) = self.header.unpack_from(mm, 0)
+        if magic != self.magic or version != self.version:
+            mm.close()
+            raise ValueError("{} is not a token cache file".format(path))
+        ids_start = self.header.size
+        lengths_start = ids_start + tokens * 4
+        words_start = lengths_start + sentences * 4
+        words = mm[words_start:words_start + words_size].decode("utf-8")
+        vocabulary = Vocabulary(words.split("\n") if vocabulary_size else ())
+        files_start = words_start + words_size
+        file_stats = json.loads(mm[files_start:files_start + files_size].decode("utf-8"))
+        os.utime(path)  # час останнього використання - для видалення давно не використаних записів
+
+        def iter_ids():
+            ids = memoryview(mm)[ids_start:lengths_start].cast("I")
+            lengths = memoryview(mm)[lengths_start:words_start].cast("I")
+            try:
+                offset = 0
+                for length in lengths:
+                    yield ids[offset:offset + length].tolist()
+                    offset += length
+            finally:
+                ids.release()
+                lengths.release()
+                mm.close()
+
+        return vocabulary, source_hash.hex(), file_stats, iter_ids()
+
+    def writer(self, path):
+        """
+        :param path: шлях до файлу кешу
+        :return: об'єкт TokenCacheWriter
+        """
+        return TokenCacheWriter(path)
+
+    def evict(self):
+        """
+        Видалення записів, до яких не звертались довше max_age, а потім - найдавніше використаних записів,
+        доки сумарний розмір кешу не стане меншим за max_bytes
+        """
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.suffix):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            stat = os.stat(path)
+            if now - stat.st_mtime > self.max_age:
+                os.remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
@@ -0,0 +1,132 @@
+import re
+
+
+class Tokenizer:
+    """
+    Базовий клас токенізатора: поділ параграфів на речення та речень на слова.
+    Поділ на слова однаковий для всіх токенізаторів, підкласи визначають лише поділ на речення (split_sentences).
+    Токенізатори реєструються за назвою (див. get), тому до процесів паралельної обробки передається лише назва
+    """
+    name = None
+    version = 1  # змінюється разом зі зміною результату поділу (робить недійсним кеш токенізації)
+    registry = dict()  # {назва: клас токенізатора}
+    instances = dict()  # {назва: об'єкт токенізатора}, кожен токенізатор створюється один раз на процес
+
+    # поділ здійснюється по перелічених в квадратних дужках символах + в кінці 0 або більше символів пробілів
+    word_delimiters_pattern = re.compile(r'[.;!?:(),—"‘\s]\s*')
+    # розділювачі, що не вважаються словами
+    delimiters = frozenset([".", ";", "!", "?", ":", ",", " ", "\n", "", "(", ")", "‘", "—"])
+
+    @staticmethod
+    def register(cls):
+        """
+        Декоратор для реєстрації класу токенізатора за його назвою
+        """
+        Tokenizer.registry[cls.name] = cls
+        return cls
+
+    @staticmethod
+    def get(name):
+        """
+        :param name: назва токенізатора
+        :return: об'єкт токенізатора (один і той самий для повторних викликів)
+        """
+        tokenizer = Tokenizer.instances.get(name)
+        if tokenizer is None:
+            if name not in Tokenizer.registry:
+                raise ValueError("Unknown tokenizer: {} (available: {})".format(
+                    name, ", ".join(sorted(Tokenizer.registry))))
+            tokenizer = Tokenizer.instances[name] = Tokenizer.registry[name]()
+        return tokenizer
+
+    @staticmethod
+    def split_to_words(text):
+        """
+        Здійснюється поділ на слова
+        :param text: текст, в якому здійснюється поділ на слова
+        :return: список слів цього тексту у нижньому регістрі
+        """
+        delimiters = Tokenizer.delimiters
+        return [w for w in Tokenizer.word_delimiters_pattern.split(text.lower()) if w not in delimiters]
+
+    def cache_key(self):
+        """
+        :return: рядок, що ідентифікує результат поділу на речення та слова (для ключа кешу токенізації)
+        """
+        return "{}-{}".format(self.name, self.version)
+
+    def split_sentences(self, paragraph):
+        """
+        :param paragraph: параграф тексту
+        :return: список речень параграфа
+        """
+        raise NotImplementedError
+
+    def iter_sentences(self, paragraphs):
+        """
+        Генератор речень корпусу
+        :param paragraphs: ітерований об'єкт параграфів тексту
+        :return: генератор речень
+        """
+        split_sentences = self.split_sentences
+        for p in paragraphs:
+            yield from split_sentences(p)
+
+    def iter_words(self, paragraphs):
+        """
+        Генератор речень корпусу, поділених на слова
+        :param paragraphs: ітерований об'єкт параграфів тексту
+        :return: генератор списків слів речень
+        """
+        split_to_words = self.split_to_words
+        for s in self.iter_sentences(paragraphs):
+            yield split_to_words(s)
+
+
+@Tokenizer.register
+class PunktTokenizer(Tokenizer):
+    """
+    Поділ на речення моделлю Punkt з nltk (як nltk.sent_tokenize). Модель завантажується один раз
+    при першому використанні токенізатора
+    """
+    name = "punkt"
+    language = "english"
+
+    def __init__(self):
+        self.model = None
+
+    def load(self):
+        """
+        :return: модель Punkt для поділу на речення
+        """
+        try:
+            from nltk.tokenize.punkt import PunktTokenizer as Punkt  # nltk >= 3.8.2
+        except ImportError:
+            import nltk.data
+            return nltk.data.load("tokenizers/punkt/{}.pickle".format(self.language))
+        return Punkt(self.language)
+
+    def cache_key(self):
+        # модель Punkt може змінюватись між версіями nltk
+        import nltk
+        return "{}-nltk{}".format(super().cache_key(), nltk.__version__)
+
+    def split_sentences(self, paragraph):
+        if self.model is None:
+            self.model = self.load()
+        return self.model.tokenize(paragraph)
+
+
+@Tokenizer.register
+class RegexTokenizer(Tokenizer):
+    """
+    Швидкий поділ на речення регулярним виразом: речення закінчується символом ".", "!" або "?"
+    (можливо, з лапками чи дужкою після нього), після якого йдуть пробільні символи.
+    На відміну від Punkt, скорочення (наприклад, "Mr.") не розпізнаються, але оскільки ці символи є також
+    розділювачами слів, на набір слів впливає лише поділ N-грам між реченнями
+    """
+    name = "regex"
+    sentence_end_pattern = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\'’”)]))\s+')
+
+    def split_sentences(self, paragraph):
+        return [s for s in self.sentence_end_pattern.split(paragraph.strip()) if s]
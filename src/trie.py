@@ -0,0 +1,235 @@
+import os
+
+import numpy as np
+
+from src.vocabulary import Vocabulary
+
+
+class NgramTrie:
+    version = 1
+
+    def __init__(self, n, vocabulary, words, counts, offsets, sentences_count=0, tokens_count=0):
+        """
+        Префіксне дерево (trie) N-грам усіх порядків від 1 до N з ключами - ідентифікаторами слів (див. Vocabulary).
+        Кожен рівень дерева зберігається компактно у вигляді відсортованих масивів numpy (без об'єктів вузлів):
+        вузол рівня l - це l-грама, words[l-1][i] - її останнє слово, counts[l-1][i] - її частота, а продовження
+        вузла (вузли рівня l+1) займають суцільний діапазон offsets[l-1][i]:offsets[l-1][i+1], відсортований за
+        ідентифікатором слова. Тому пошук N-грами - це N бінарних пошуків, усі продовження контексту h (і їх
+        кількість T(h) для згладжування Віттена-Белла) - один зріз, а відступ до N-грам меншого порядку не потребує
+        перетворення рядків
+        :param n: найбільший порядок N-грам
+        :param vocabulary: словник слів (Vocabulary)
+        :param words: список масивів ідентифікаторів останніх слів вузлів кожного рівня (uint32)
+        :param counts: список масивів частот вузлів кожного рівня (uint64)
+        :param offsets: список масивів меж продовжень вузлів рівнів 1..N-1 (int64, на один елемент довші за рівень)
+        :param sentences_count: кількість речень корпусу
+        :param tokens_count: кількість слів корпусу
+        """
+        self.n = n
+        self.vocabulary = vocabulary
+        self.words = words
+        self.counts = counts
+        self.offsets = offsets
+        self.sentences_count = sentences_count
+        self.tokens_count = tokens_count
+
+    @classmethod
+    def build(cls, counter):
+        """
+        Побудова дерева за частотними словниками лічильника. Для кожного рівня ключі N-грам один раз
+        розпаковуються у масиви (індекс батьківського вузла, останнє слово), які сортуються numpy
+        :param counter: об'єкт NgramCounter, що рахував N-грами усіх порядків (all_orders)
+        :return: об'єкт NgramTrie
+        """
+        if counter.orders != list(range(1, counter.n + 1)):
+            raise ValueError("Trie requires counts of all N-gram orders (all_orders)")
+        bits, mask = Vocabulary.id_bits, Vocabulary.id_mask
+        words, counts, offsets = [], [], []
+        index = None  # {ключ вузла попереднього рівня: номер вузла}
+        for order in counter.orders:
+            d = counter.get_counts(order)
+            size = len(d)
+            if order == 1:
+                parents = np.zeros(size, dtype=np.int64)
+                last = np.fromiter(d, dtype=np.uint32, count=size)
+            else:
+                parents = np.fromiter((index[key >> bits] for key in d), dtype=np.int64, count=size)
+                last = np.fromiter((key & mask for key in d), dtype=np.uint32, count=size)
+            freq = np.fromiter(d.values(), dtype=np.uint64, count=size)
+            permutation = np.lexsort((last, parents))
+            parents, last, freq = parents[permutation], last[permutation], freq[permutation]
+            if order > 1:
+                children = np.bincount(parents, minlength=len(words[-1]))
+                offsets.append(np.concatenate(([0], np.cumsum(children))).astype(np.int64))
+            words.append(last)
+            counts.append(freq)
+            if order < counter.n:
+                position = np.empty(size, dtype=np.int64)
+                position[permutation] = np.arange(size)
+                index = dict(zip(d, position.tolist()))
+        return cls(counter.n, counter.vocabulary, words, counts, offsets, counter.sentences_count,
+                   counter.tokens_count)
+
+    def nbytes(self):
+        """
+        :return: розмір масивів дерева в байтах (без словника слів)
+        """
+        return sum(a.nbytes for a in self.words + self.counts + self.offsets)
+
+    def encode(self, ngram):
+        """
+        :param ngram: N-грама у вигляді рядка "слово1 слово2 ... словоN"
+        :return: список ідентифікаторів слів або None, якщо хоча б одного слова немає у словнику
+        """
+        ids = [self.vocabulary.lookup(w) for w in ngram.split(' ')]
+        return None if None in ids else ids
+
+    def find(self, ids):
+        """
+        :param ids: ідентифікатори слів N-грами (порядку від 1 до N)
+        :return: номер вузла N-грами на її рівні або None, якщо такої N-грами немає
+        """
+        node = None
+        lo, hi = 0, len(self.words[0])
+        for level, word_id in enumerate(ids):
+            if level > 0:
+                offsets = self.offsets[level - 1]
+                lo, hi = int(offsets[node]), int(offsets[node + 1])
+            words = self.words[level]
+            i = lo + int(np.searchsorted(words[lo:hi], word_id))
+            if i == hi or words[i] != word_id:
+                return None
+            node = i
+        return node
+
+    def count(self, ngram):
+        """
+        :param ngram: N-грама у вигляді рядка (будь-якого порядку від 1 до N)
+        :return: частота N-грами (0, якщо такої N-грами немає)
+        """
+        ids = self.encode(ngram)
+        if ids is None or not 0 < len(ids) <= self.n:
+            return 0
+        node = self.find(ids)
+        return 0 if node is None else int(self.counts[len(ids) - 1][node])
+
+    def children(self, ids):
+        """
+        :param ids: ідентифікатори слів контексту (порядку від 1 до N-1)
+        :return: масиви ідентифікаторів слів та частот усіх N-грам, що починаються з контексту (порожні, якщо
+        контексту немає)
+        """
+        node = self.find(ids) if len(ids) < self.n else None
+        if node is None:
+            return self.words[0][:0], self.counts[0][:0]
+        offsets = self.offsets[len(ids) - 1]
+        lo, hi = int(offsets[node]), int(offsets[node + 1])
+        return self.words[len(ids)][lo:hi], self.counts[len(ids)][lo:hi]
+
+    def context_stats(self, context):
+        """
+        :param context: контекст h у вигляді рядка (порядку від 1 до N-1)
+        :return: сумарна частота N-грам, що починаються з контексту c(h), та кількість їх типів T(h)
+        """
+        ids = self.encode(context)
+        if ids is None:
+            return 0, 0
+        _, counts = self.children(ids)
+        return int(counts.sum()), len(counts)
+
+    def top_k_followers(self, context, k=10):
+        """
+        :param context: контекст у вигляді рядка (порядку від 1 до N-1)
+        :param k: кількість слів
+        :return: список з k найчастіших слів, що йдуть після контексту, у форматі [(слово, частота N-грами)]
+        """
+        ids = self.encode(context)
+        if ids is None:
+            return []
+        words, counts = self.children(ids)
+        top = np.argsort(-counts.astype(np.int64), kind="stable")[:k]
+        id_to_word = self.vocabulary.id_to_word
+        return [(id_to_word[words[i]], int(counts[i])) for i in top]
+
+    def backoff(self, ngram):
+        """
+        Відступ (backoff): пошук найдовшого суфікса N-грами (з відкиданням слів зліва), що зустрівся в корпусі
+        :param ngram: N-грама у вигляді рядка (порядку від 1 до N)
+        :return: порядок знайденого суфікса та його частота ((0, 0), якщо не зустрілось навіть останнє слово)
+        """
+        ids = [self.vocabulary.lookup(w) for w in ngram.split(' ')]
+        for start in range(len(ids)):
+            suffix = ids[start:]
+            if None in suffix or len(suffix) > self.n:
+                continue
+            node = self.find(suffix)
+            if node is not None:
+                return len(suffix), int(self.counts[len(suffix) - 1][node])
+        return 0, 0
+
+    def level_keys(self, order):
+        """
+        :param order: порядок N-грам (рівень дерева)
+        :return: список запакованих ключів N-грам цього порядку (див. Vocabulary.pack) у порядку вузлів рівня
+        """
+        bits = Vocabulary.id_bits
+        keys = self.words[0].tolist()
+        for level in range(1, order):
+            parents = np.repeat(np.arange(len(self.words[level - 1])), np.diff(self.offsets[level - 1]))
+            keys = [(keys[p] << bits) | w for p, w in zip(parents.tolist(), self.words[level].tolist())]
+        return keys
+
+    def get_types_counts(self, contexts, order=None):
+        """
+        Кількість типів N-грам, які можна утворити з кожної (N-1)-грами (T(h) для згладжування Віттена-Белла):
+        кількість продовжень вузла контексту - різниця сусідніх меж продовжень (той самий формат, що й
+        NgramCounter.get_types_counts)
+        :param contexts: ітерований об'єкт ключів (N-1)-грам
+        :param order: порядок N-грам (за замовчуванням - найбільший)
+        :return: словник у форматі: {ключ (N-1)-грами: кількість типів N-грам}
+        """
+        order = order or self.n
+        types_counts = dict(zip(self.level_keys(order - 1), np.diff(self.offsets[order - 2]).tolist()))
+        return {h: types_counts.get(h, 0) for h in contexts}
+
+    def save(self, path):
+        """
+        Запис дерева до файлу (формат npz, без стиснення). Файл спочатку записується під тимчасовим ім'ям
+        і перейменовується лише після успішного запису
+        :param path: шлях до файлу
+        """
+        words = "\n".join(self.vocabulary.id_to_word).encode("utf-8")  # слова не містять пробільних символів
+        arrays = {"header": np.array([self.version, self.n, len(self.vocabulary), self.sentences_count,
+                                      self.tokens_count], dtype=np.uint64),
+                  "vocabulary": np.frombuffer(words, dtype=np.uint8)}
+        for level in range(self.n):
+            arrays["words_{}".format(level + 1)] = self.words[level]
+            arrays["counts_{}".format(level + 1)] = self.counts[level]
+            if level < self.n - 1:
+                arrays["offsets_{}".format(level + 1)] = self.offsets[level]
+        work_path = path + ".part"
+        try:
+            with open(work_path, "wb") as f:  # до відкритого файлу numpy не дописує розширення .npz
+                np.savez(f, **arrays)
+            os.replace(work_path, path)
+        except BaseException:
+            if os.path.exists(work_path):
+                os.remove(work_path)
+            raise
+
+    @classmethod
+    def load(cls, path):
+        """
+        Завантаження дерева з файлу (див. save) без повторного підрахунку N-грам
+        :param path: шлях до файлу
+        :return: об'єкт NgramTrie
+        """
+        with np.load(path) as data:
+            if "header" not in data or int(data["header"][0]) != cls.version:
+                raise ValueError("{} is not an N-gram trie file".format(path))
+            _, n, vocabulary_size, sentences_count, tokens_count = (int(v) for v in data["header"])
+            words = data["vocabulary"].tobytes().decode("utf-8")
+            vocabulary = Vocabulary(words.split("\n") if vocabulary_size else ())
+            return cls(n, vocabulary, [data["words_{}".format(level)] for level in range(1, n + 1)],
+                       [data["counts_{}".format(level)] for level in range(1, n + 1)],
+                       [data["offsets_{}".format(level)] for level in range(1, n)], sentences_count, tokens_count)
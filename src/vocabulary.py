@@ -0,0 +1,104 @@
+class Vocabulary:
+    """
+    Словник слів корпусу: кожному слову ставиться у відповідність щільний цілочисельний ідентифікатор (0, 1, 2...)
+    у порядку першої появи слова в корпусі.
+    N-грами зберігаються не як рядки "слово1 слово2 ... словоN", а як одне ціле число, у якому ідентифікатори слів
+    запаковано по id_bits біт на слово (перше слово - у старших бітах). Для N <= 2 ключ вміщується у 64 біти.
+    Завдяки такому пакуванню (N-1)-грама (контекст) N-грами - це key >> id_bits, а останнє слово - key & id_mask
+    """
+
+    id_bits = 32  # кількість біт на одне слово у запакованому ключі N-грами
+    id_mask = (1 << id_bits) - 1
+
+    def __init__(self, words=()):
+        """
+        :param words: слова, якими потрібно заповнити словник (у порядку ідентифікаторів)
+        """
+        self.word_to_id = dict()  # {слово: ідентифікатор}
+        self.id_to_word = []  # ідентифікатор - це індекс слова у списку
+        for w in words:
+            self.add(w)
+
+    def __len__(self):
+        return len(self.id_to_word)
+
+    def __contains__(self, word):
+        return word in self.word_to_id
+
+    def add(self, word):
+        """
+        Додавання слова до словника (якщо слово вже є, повертається його ідентифікатор)
+        :param word: слово
+        :return: ідентифікатор слова
+        """
+        word_id = self.word_to_id.get(word)
+        if word_id is None:
+            word_id = len(self.id_to_word)
+            self.word_to_id[word] = word_id
+            self.id_to_word.append(word)
+        return word_id
+
+    def lookup(self, word):
+        """
+        :param word: слово
+        :return: ідентифікатор слова або None, якщо слова немає у словнику
+        """
+        return self.word_to_id.get(word)
+
+    def encode(self, words):
+        """
+        Перетворення списку слів на список ідентифікаторів (нові слова додаються до словника)
+        :param words: список слів
+        :return: список ідентифікаторів
+        """
+        add = self.add
+        return [add(w) for w in words]
+
+    @classmethod
+    def pack(cls, ids):
+        """
+        Пакування ідентифікаторів слів N-грами в один цілочисельний ключ
+        :param ids: ідентифікатори слів N-грами
+        :return: ключ N-грами
+        """
+        key = 0
+        for word_id in ids:
+            key = (key << cls.id_bits) | word_id
+        return key
+
+    @classmethod
+    def unpack(cls, key, order):
+        """
+        Розпакування ключа N-грами в ідентифікатори слів
+        :param key: ключ N-грами
+        :param order: порядок N-грами (кількість слів)
+        :return: кортеж ідентифікаторів слів
+        """
+        ids = [0] * order
+        for i in range(order - 1, -1, -1):
+            ids[i] = key & cls.id_mask
+            key >>= cls.id_bits
+        return tuple(ids)
+
+    def encode_ngram(self, ngram):
+        """
+        Перетворення N-грами у вигляді рядка на ключ (без додавання нових слів до словника)
+        :param ngram: N-грама у вигляді рядка: слово1 слово2 ... словоN
+        :return: ключ N-грами або None, якщо хоча б одного слова немає у словнику
+        """
+        ids = [self.word_to_id.get(w) for w in ngram.split(' ')]
+        if None in ids:
+            return None
+        return self.pack(ids)
+
+    def decode(self, key, order):
+        """
+        Перетворення ключа N-грами назад у рядок (використовується лише при записі результатів)
+        :param key: ключ N-грами
+        :param order: порядок N-грами
+        :return: N-грама у вигляді рядка: слово1 слово2 ... словоN
+        """
+        id_to_word = self.id_to_word
+        if order == 1:
+            return id_to_word[key]
+        return ' '.join([id_to_word[i] for i in self.unpack(key, order)])
@@ -0,0 +1,62 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+from src.ngrams import Ngrams
+
+# слова тестового корпусу; частоти слів спадають за законом Ципфа, тому в корпусі є і часті, і рідкісні N-грами
+WORDS = ("the and of to a in alice said it was you she that i her at as with had all on for so be not but "
+         "they very what this little out down up about one there would queen king hatter rabbit turtle gryphon "
+         "mouse duchess caterpillar dormouse cat tea garden court").split()
+TABLES = ("ngrams_freq", "n_minus1_grams_freq", "vocab_freq", "gt_estimation_counts", "smoothing")
+
+
+def make_corpus(paragraphs_count, seed):
+    """
+    :param paragraphs_count: кількість параграфів
+    :param seed: початкове значення генератора випадкових чисел (корпус відтворюваний)
+    :return: список параграфів з реченнями, що закінчуються крапкою (для токенізатора regex)
+    """
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(WORDS))]
+    paragraphs = []
+    for _ in range(paragraphs_count):
+        sentences = [" ".join(rng.choices(WORDS, weights, k=rng.randint(1, 12))).capitalize() + "."
+                     for _ in range(rng.randint(1, 4))]
+        paragraphs.append(" ".join(sentences) + "\n")
+    return paragraphs
+
+
+def read_tables(db_path):
+    """
+    :param db_path: шлях до бази даних
+    :return: словник {таблиця: список рядків у порядку запису} таблиць частот та згладжування
+    """
+    connection = sqlite3.connect(db_path)
+    try:
+        return {table: connection.execute("SELECT * FROM {} ORDER BY rowid".format(table)).fetchall()
+                for table in TABLES}
+    finally:
+        connection.close()
+
+
+@pytest.fixture
+def corpus():
+    return make_corpus(300, seed=1)
+
+
+@pytest.fixture
+def build_db(tmp_path):
+    """
+    :return: функція build_db(name, corpus, n=3, k=5, **kwargs), що обробляє корпус (Ngrams, токенізатор regex)
+    і повертає шлях до бази даних та об'єкт Ngrams
+    """
+    def build(name, corpus, n=3, k=5, **kwargs):
+        csv_dir = tmp_path / "csv" / name
+        os.makedirs(csv_dir, exist_ok=True)
+        db_path = str(tmp_path / (name + ".db"))
+        ngrams = Ngrams(n, k, corpus, db_path, csv_dir=str(csv_dir), tokenizer="regex", **kwargs)
+        return db_path, ngrams
+    return build
@@ -0,0 +1,31 @@
+import pytest
+
+from tests.conftest import read_tables
+
+
+def sorted_tables(db_path):
+    return {table: sorted(row[1:] for row in rows) for table, rows in read_tables(db_path).items()}
+
+
+@pytest.fixture
+def appended_db(corpus, build_db):
+    db_path, _ = build_db("appended", corpus[:150])
+    build_db("appended", corpus[150:], append=True)
+    return db_path
+
+
+def test_append_equals_processing_the_whole_text(corpus, build_db, appended_db):
+    whole_db, _ = build_db("whole", corpus)
+    appended, whole = sorted_tables(appended_db), sorted_tables(whole_db)
+    for table in ("ngrams_freq", "n_minus1_grams_freq", "vocab_freq", "smoothing"):
+        assert appended[table] == whole[table]
+    assert [row[:2] for row in appended["gt_estimation_counts"]] == [row[:2] for row in whole["gt_estimation_counts"]]
+    for row, expected in zip(appended["gt_estimation_counts"], whole["gt_estimation_counts"]):
+        assert row[2] == pytest.approx(expected[2])
+
+
+def test_appending_the_same_text_again_changes_nothing(corpus, build_db, appended_db):
+    before = read_tables(appended_db)
+    build_db("appended", corpus[150:], append=True)
+    build_db("appended", corpus[:150], append=True)
+    assert read_tables(appended_db) == before
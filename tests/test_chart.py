@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from src.chart import FrequencyChart
+
+
+def zipf_chart_data(size, seed=0):
+    """
+    :return: рядки [частота, кількість N-грам з такою частотою] - частоти частот, що спадають за законом Ципфа,
+    з піком не на першій частоті
+    """
+    rng = np.random.default_rng(seed)
+    x = np.arange(1, size + 1)
+    y = np.rint(1e6 / x ** 1.5 * rng.uniform(0.5, 1.5, size))
+    y[5] = 3e6
+    return [[int(c), int(n), 0.0] for c, n in zip(x, y)]
+
+
+@pytest.mark.parametrize("log_scale", [False, True])
+@pytest.mark.parametrize("max_points", [10, 400])
+def test_decimate_bounds_points_and_keeps_extremes(log_scale, max_points):
+    chart_data = zipf_chart_data(5000)
+    x, y = FrequencyChart.decimate(chart_data, log_scale=log_scale, max_points=max_points)
+    assert len(x) == len(y) <= max_points
+    assert (np.diff(x) >= 0).all()
+    assert (x[0], y[0]) == tuple(chart_data[0][:2])
+    assert (x[-1], y[-1]) == tuple(chart_data[-1][:2])
+    assert y.max() == max(row[1] for row in chart_data) == 3e6
+    assert x[np.argmax(y)] == 6
+
+
+def test_decimate_keeps_small_charts():
+    chart_data = [[3, 1], [1, 5], [2, 0], [4, 2]]
+    x, y = FrequencyChart.decimate(chart_data)
+    assert x.tolist() == [1, 2, 3, 4] and y.tolist() == [5, 0, 1, 2]
+    x, y = FrequencyChart.decimate(chart_data, log_scale=True)  # нульові значення відкидаються
+    assert x.tolist() == [1, 3, 4] and y.tolist() == [5, 1, 2]
@@ -0,0 +1,57 @@
+import gzip
+import os
+
+import pytest
+
+from src.cli import main, parse_args
+from src.tokenizer import Tokenizer
+
+
+@pytest.fixture
+def corpus_files(tmp_path, corpus):
+    """
+    :return: словник шляхів до файлів корпусу: a.txt, b.txt, x.txt, x.txt.gz та sub/x.txt
+    """
+    text = "".join(corpus)
+    paths = {name: str(tmp_path / name) for name in ("a.txt", "b.txt", "x.txt", "x.txt.gz", "sub/x.txt")}
+    os.makedirs(tmp_path / "sub")
+    for name, path in paths.items():
+        if name.endswith(".gz"):
+            with gzip.open(path, "wt", encoding="utf-8") as f:
+                f.write(text)
+        else:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+    return paths
+
+
+@pytest.mark.parametrize("argv, message", [
+    (["a.txt", "b.txt", "--db", "same.db"], "--db must contain {corpus}"),
+    (["a.txt", "-n", "2", "3", "--db", "{corpus}.db"], "--db must contain {n}"),
+    (["a.txt", "-k", "1", "5"], "--db must contain {k}"),
+    (["x.txt", "x.txt.gz"], "would write to the same path"),
+    (["x.txt", "sub/x.txt", "--sweep", "-n", "2", "3"], "would write to the same path"),
+])
+def test_colliding_outputs_are_rejected(corpus_files, tmp_path, capsys, argv, message):
+    argv = [corpus_files.get(arg, arg) for arg in argv] + ["--output-dir", str(tmp_path / "out")]
+    with pytest.raises(SystemExit):
+        parse_args(argv)
+    assert message in capsys.readouterr().err
+    assert not os.path.exists(tmp_path / "out")
+
+
+def test_distinct_outputs_are_written(corpus_files, tmp_path):
+    out = tmp_path / "out"
+    assert main([corpus_files["a.txt"], corpus_files["b.txt"], "-n", "2", "3", "--tokenizer", "regex",
+                 "--output-dir", str(out), "-j", "2"]) == 0
+    assert sorted(name for name in os.listdir(out) if name.endswith(".db")) == \
+        ["2-gramsa.db", "2-gramsb.db", "3-gramsa.db", "3-gramsb.db"]
+    assert not [name for name in os.listdir(out) if name.endswith(".part")]
+
+
+def test_tokenizer_choices_are_the_registered_tokenizers(capsys):
+    for name in Tokenizer.registry:
+        assert parse_args(["a.txt", "--tokenizer", name]).tokenizer == name
+    with pytest.raises(SystemExit):
+        parse_args(["a.txt", "--tokenizer", "unknown"])
+    assert "invalid choice" in capsys.readouterr().err
@@ -0,0 +1,52 @@
+import pytest
+
+from src.corpus import CorpusReader
+from tests.conftest import make_corpus
+
+UKRAINIAN = ["Привіт, світе. Їжак і ґудзик!\n", "Чи є «лапки» — і апостроф: м’ята?\n"]
+
+
+def write_corpus(path, paragraphs, encoding="utf-8"):
+    """
+    Запис файлу корпусу (стискається відповідно до розширення, див. CorpusReader.compressions)
+    """
+    open_file = CorpusReader.compressions.get(path.suffix, open)
+    with open_file(str(path), "wb") as f:
+        f.write("".join(paragraphs).encode(encoding))
+
+
+@pytest.mark.parametrize("suffix", [".txt", ".txt.gz", ".txt.bz2", ".txt.xz"])
+def test_compressed_files_are_read_as_text(tmp_path, suffix):
+    paragraphs = make_corpus(50, seed=3) + UKRAINIAN
+    path = tmp_path / ("corpus" + suffix)
+    write_corpus(path, paragraphs)
+    assert list(CorpusReader.iter_paragraphs(str(path))) == paragraphs
+
+
+@pytest.mark.parametrize("suffix", [".txt", ".txt.gz"])
+def test_cp1251_is_detected_from_the_prefix(tmp_path, monkeypatch, suffix):
+    paragraphs = make_corpus(50, seed=3)
+    path = tmp_path / ("corpus" + suffix)
+    # кирилиця на початку файлу не декодується як utf-8, тому весь файл читається в windows-1251
+    write_corpus(path, UKRAINIAN + paragraphs, encoding="cp1251")
+    monkeypatch.setattr(CorpusReader, "sample_size", 64)
+    assert CorpusReader.detect_encoding("".join(UKRAINIAN).encode("cp1251")[:64]) == "windows-1251"
+    assert list(CorpusReader.iter_paragraphs(str(path))) == UKRAINIAN + paragraphs
+
+
+def test_bytes_after_the_prefix_use_the_fallback_encoding(tmp_path, monkeypatch):
+    paragraphs = make_corpus(50, seed=3)
+    path = tmp_path / "corpus.txt"
+    # початок файлу (лише ASCII) декодується як utf-8, а кирилиця в windows-1251 після нього -
+    # обробником помилок corpus-fallback, без повторного читання файлу
+    with open(str(path), "wb") as f:
+        f.write("".join(paragraphs).encode("ascii") + "".join(UKRAINIAN).encode("cp1251"))
+    monkeypatch.setattr(CorpusReader, "sample_size", len("".join(paragraphs)))
+    assert list(CorpusReader.iter_paragraphs(str(path))) == paragraphs + UKRAINIAN
+    assert b"\xcf\xf0\xe8".decode("utf-8", "corpus-fallback") == "При"
+
+
+def test_character_cut_by_the_prefix_is_still_utf8():
+    sample = "".join(UKRAINIAN).encode("utf-8")
+    assert CorpusReader.detect_encoding(sample[:3]) == "utf-8-sig"  # "П" та перший байт "р"
+    assert CorpusReader.detect_encoding(b"\xef\xbb\xbf" + sample) == "utf-8-sig"
@@ -0,0 +1,52 @@
+from collections import Counter
+
+from src.counter import NgramCounter
+from src.tokenizer import Tokenizer
+from src.vocabulary import Vocabulary
+from tests.conftest import make_corpus, read_tables
+
+
+def sentences_words(paragraphs):
+    return list(Tokenizer.get("regex").iter_words(paragraphs))
+
+
+def count_serial(sentences, n, all_orders=True):
+    counter = NgramCounter(n, all_orders)
+    for words in sentences:
+        counter.update(words)
+    return counter
+
+
+def test_packed_counts_match_string_ngrams(corpus):
+    sentences = sentences_words(corpus)
+    counter = count_serial(sentences, 4)
+    for order in range(1, 5):
+        expected = Counter(" ".join(words[i:i + order]) for words in sentences
+                           for i in range(len(words) - order + 1))
+        assert dict(counter.decoded(counter.get_counts(order), order)) == expected
+
+
+def test_merge_of_chunks_equals_serial_counting(corpus):
+    sentences = sentences_words(corpus)
+    serial = count_serial(sentences, 3)
+    merged = NgramCounter(3, all_orders=True)
+    for start in range(0, len(sentences), 97):
+        merged.merge(count_serial(sentences[start:start + 97], 3))
+    assert merged.vocabulary.id_to_word == serial.vocabulary.id_to_word
+    for order in serial.orders:
+        assert list(merged.get_counts(order).items()) == list(serial.get_counts(order).items())
+    assert merged.followers == serial.followers
+    assert (merged.sentences_count, merged.tokens_count) == (serial.sentences_count, serial.tokens_count)
+
+
+def test_followers_give_types_counts_of_every_context(corpus):
+    counter = count_serial(sentences_words(corpus), 3, all_orders=False)
+    expected = Counter(key >> Vocabulary.id_bits for key in counter.get_counts(3))
+    assert counter.get_types_counts(counter.get_counts(2)) == {h: expected.get(h, 0) for h in counter.get_counts(2)}
+
+
+def test_parallel_processing_writes_the_same_database(build_db):
+    corpus = make_corpus(4500, seed=2)  # більше однієї частини корпусу (по 2000 параграфів)
+    serial_db, _ = build_db("serial", corpus)
+    parallel_db, _ = build_db("parallel", corpus, workers=2)
+    assert read_tables(parallel_db) == read_tables(serial_db)
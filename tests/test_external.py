@@ -0,0 +1,18 @@
+import pytest
+
+from tests.conftest import read_tables
+
+
+@pytest.mark.parametrize("n", [2, 3])
+def test_external_counting_gives_in_memory_counts(corpus, build_db, n):
+    memory_db, _ = build_db("memory", corpus, n=n)
+    external_db, ngrams = build_db("external", corpus, n=n, max_entries=50)
+    assert len(ngrams.counter.runs[n]) > 1  # частоти записувались на диск кілька разів
+    memory, external = read_tables(memory_db), read_tables(external_db)
+    # при злитті рядки впорядковано за ключами N-грам, а не за першою появою
+    for table in ("ngrams_freq", "n_minus1_grams_freq", "vocab_freq", "smoothing"):
+        assert sorted(row[1:] for row in external[table]) == sorted(row[1:] for row in memory[table])
+    assert [row[1:3] for row in external["gt_estimation_counts"]] == \
+        [row[1:3] for row in memory["gt_estimation_counts"]]
+    for row, expected in zip(external["gt_estimation_counts"], memory["gt_estimation_counts"]):
+        assert row[3] == pytest.approx(expected[3])
@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from src.good_turing import GoodTuring
+
+# частоти частот прикладу "prosody" з статті Gale, Sampson. Good-Turing frequency estimation without tears, 1995
+PROSODY = {1: 120, 2: 40, 3: 24, 4: 13, 5: 15, 6: 5, 7: 11, 8: 2, 9: 2, 10: 1, 12: 3, 14: 2, 15: 1, 16: 1, 17: 3,
+           19: 1, 20: 3, 21: 2, 23: 3, 24: 3, 25: 3, 26: 2, 27: 2, 28: 1, 31: 2, 32: 2, 33: 1, 34: 2, 36: 2, 41: 3,
+           43: 1, 45: 3, 46: 1, 47: 1, 50: 1, 71: 1, 84: 1, 101: 1, 105: 1, 121: 1, 124: 1, 146: 1, 162: 1, 193: 1,
+           199: 1, 224: 1, 226: 1, 254: 1, 257: 1, 339: 1, 421: 1, 456: 1, 481: 1, 483: 1, 1140: 1, 1256: 1, 1322: 1,
+           1530: 1, 2131: 1, 2395: 1, 6925: 1, 7846: 1}
+# згладжені кількості r* з таблиці результатів статті
+PROSODY_R_STAR = {1: 0.7628, 2: 1.7064, 3: 2.6798, 4: 3.6640, 5: 4.6534, 6: 5.6456, 7: 6.6397, 8: 7.6348,
+                  9: 8.6309, 10: 9.6274, 12: 11.6218}
+
+
+def legacy_katz(n_c, k):
+    """
+    Попередній (скалярний) варіант оцінки з порогом Катца (Ngrams.get_gt_counts_estimation до векторизації)
+    :param n_c: словник {частота: кількість N-грам з такою частотою}
+    :param k: поріг Катца
+    :return: список згладжених кількостей для частот від 0 до максимальної
+    """
+    n_c = dict(n_c)
+    m = max(n_c.keys())
+    if k > m:
+        for i in range(m + 1, k + 2):
+            n_c[i] = 0
+    estimated = []
+    for c in range(m + 1):
+        if 0 <= c <= k:
+            estimated.append((((c + 1) * (n_c[c + 1]) / (n_c[c])) - ((n_c[k + 1] * c * (k + 1)) / n_c[1]))
+                             / (1 - (n_c[k + 1] * (k + 1)) / (n_c[1])))
+        else:
+            estimated.append(c)
+    return estimated
+
+
+def test_katz_matches_legacy_formula():
+    n_c = {0: 1000, 1: 50, 2: 20, 3: 9, 4: 6, 5: 3, 6: 2, 8: 1}
+    array = GoodTuring.from_dict({c: n for c, n in n_c.items() if c}, 1000 + 50 + 40 + 27 + 24 + 15 + 12 + 8)
+    assert list(array) == [n_c.get(c, 0) for c in range(9)]
+    for k in (1, 3, 5):
+        assert GoodTuring.katz(array, k) == pytest.approx(legacy_katz({c: n_c.get(c, 0) for c in range(9)}, k))
+    # c = 1, k = 3: (2 * 20 / 50 - 6 * 1 * 4 / 50) / (1 - 6 * 4 / 50)
+    assert GoodTuring.katz(array, 3)[1] == pytest.approx((0.8 - 0.48) / 0.52)
+
+
+def test_katz_threshold_above_max_frequency():
+    n_c = {0: 100, 1: 8, 2: 4, 3: 1}
+    estimated = GoodTuring.katz(np.array([100, 8, 4, 1]), 10)
+    assert len(estimated) == 4
+    assert estimated == pytest.approx(legacy_katz(n_c, 10))
+    # N_(k+1) = 0, тому залишається звичайна оцінка Тюрінга (c + 1) * N_(c+1) / N_c
+    assert estimated == pytest.approx([8 / 100, 2 * 4 / 8, 3 * 1 / 4, 0])
+
+
+def test_katz_keeps_count_when_frequency_is_missing():
+    n_c = {0: 100, 1: 10, 2: 0, 3: 3, 4: 1}
+    with pytest.raises(ZeroDivisionError):
+        legacy_katz(n_c, 3)
+    estimated = GoodTuring.katz(np.array([100, 10, 0, 3, 1]), 3)
+    assert estimated[2] == 2  # N_2 = 0: формула не визначена
+    # N_(k+1) = 1, N_1 = 10
+    expected = [((c + 1) * n_c[c + 1] / n_c[c] - 1 * c * 4 / 10) / (1 - 4 / 10) for c in (0, 1, 3)]
+    assert estimated[[0, 1, 3]] == pytest.approx(expected)
+    assert estimated[4] == 4
+    assert np.isfinite(estimated).all()
+
+
+def test_simple_good_turing_gale_sampson_example():
+    total = sum(r * n for r, n in PROSODY.items())
+    n_c = GoodTuring.from_dict(PROSODY, total + 1000)
+    assert n_c[0] == 1000
+    estimated = GoodTuring.simple(n_c)
+    for r, r_star in PROSODY_R_STAR.items():
+        assert estimated[r] == pytest.approx(r_star, abs=1e-4)
+    # імовірність усіх N-грам, що не зустрілись у корпусі, дорівнює N_1 / N
+    assert estimated[0] * n_c[0] / total == pytest.approx(PROSODY[1] / total)
+    seen = np.array(sorted(PROSODY))
+    assert np.dot(n_c[seen], estimated[seen]) / total == pytest.approx(1 - PROSODY[1] / total)
+
+
+def test_simple_good_turing_needs_two_frequencies():
+    with pytest.raises(ValueError):
+        GoodTuring.simple(np.array([10, 5]))
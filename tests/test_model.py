@@ -0,0 +1,52 @@
+import random
+import sqlite3
+
+import pytest
+
+from src.binary_model import BinaryNgramModel
+from src.model import NgramModel
+
+
+@pytest.fixture(params=[None, {"min_counts": 2, "top_k": 2}, {"min_counts": {1: 3, 3: 2}, "max_vocab": 30}],
+                ids=["full", "pruned", "unk"])
+def models(request, corpus, build_db, tmp_path):
+    db_path, _ = build_db("model", corpus, prune=request.param)
+    binary_path = str(tmp_path / "model.ngm")
+    BinaryNgramModel.export(db_path, binary_path)
+    model, binary = NgramModel(db_path), BinaryNgramModel(binary_path)
+    yield db_path, model, binary
+    model.close()
+    binary.close()
+
+
+def stored_context_stats(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        return {h: (c_h, t_h) for h, c_h, t_h in connection.execute(
+            "SELECT h.word, h.freq, s.ngrams_types_count_ FROM n_minus1_grams_freq h "
+            "JOIN smoothing s ON s.n_minus1_gram = h.word")}
+    finally:
+        connection.close()
+
+
+def test_context_stats_are_the_stored_smoothing_parameters(models):
+    db_path, model, binary = models
+    stored = stored_context_stats(db_path)
+    assert stored
+    for context, stats in stored.items():
+        assert model.context_stats(context) == stats
+        assert tuple(binary.context_stats(context)) == stats
+
+
+@pytest.mark.parametrize("method", ["witten-bell", "good-turing"])
+def test_binary_model_gives_the_same_probabilities(models, method):
+    db_path, model, binary = models
+    contexts = sorted(stored_context_stats(db_path)) + ["unseen context"]
+    words = [word for word, in model.connection.execute("SELECT word FROM vocab_freq")] + ["unseen"]
+    rng = random.Random(0)
+    for context in rng.sample(contexts, min(len(contexts), 100)):
+        for word in rng.sample(words, 10):
+            assert binary.prob(word, context, method) == pytest.approx(model.prob(word, context, method))
+        # при однакових частотах порядок слів може відрізнятись, тому порівнюються частоти
+        assert [freq for _, freq in binary.top_k_followers(context, 3)] == \
+            [freq for _, freq in model.top_k_followers(context, 3)]
@@ -0,0 +1,57 @@
+from collections import Counter
+
+import pytest
+
+from src.binary_model import BinaryNgramModel
+from src.counter import NgramCounter
+from src.pruning import Pruning
+from tests.conftest import read_tables
+
+PRUNE = {"min_counts": {1: 40, 2: 2, 3: 2}, "top_k": 2}
+
+
+@pytest.fixture
+def pruned_db(corpus, build_db):
+    db_path, _ = build_db("pruned", corpus, prune=PRUNE)
+    return db_path
+
+
+def test_pruned_tables_are_consistent(pruned_db, tmp_path):
+    tables = {table: {row[1]: row[2] for row in rows} for table, rows in read_tables(pruned_db).items()
+              if table != "gt_estimation_counts"}
+    vocabulary, contexts, ngrams = tables["vocab_freq"], tables["n_minus1_grams_freq"], tables["ngrams_freq"]
+    assert "<unk>" in vocabulary
+    assert all(freq >= 40 for word, freq in vocabulary.items() if word != "<unk>")
+    for ngram, freq in ngrams.items():
+        assert freq >= 2
+        assert all(word in vocabulary for word in ngram.split(" "))
+        assert ngram.rsplit(" ", 1)[0] in contexts
+    assert all(freq >= 2 and all(word in vocabulary for word in context.split(" "))
+               for context, freq in contexts.items())
+    assert max(Counter(ngram.rsplit(" ", 1)[0] for ngram in ngrams).values()) <= 2
+    assert tables["smoothing"].keys() == contexts.keys()
+    BinaryNgramModel.export(pruned_db, str(tmp_path / "pruned.ngm"))
+
+
+def test_smoothing_uses_full_counts(corpus, build_db, pruned_db):
+    # слова відсікаються до обчислення згладжування, N-грами та контексти - після
+    mapped_db, _ = build_db("mapped", corpus, prune={"min_counts": {1: 40}})
+    mapped, pruned = read_tables(mapped_db), read_tables(pruned_db)
+    assert pruned["gt_estimation_counts"] == mapped["gt_estimation_counts"]
+    types_counts = {row[1]: row[2] for row in mapped["smoothing"]}
+    assert all(types_counts[context] == t_h for _, context, t_h in pruned["smoothing"])
+
+
+def test_word_cutoff_equals_mapping_words_before_counting():
+    sentences = [s.split() for s in ("a b c a", "b a d", "a b c", "e a b", "c c a")]
+    counter = NgramCounter(3)
+    for words in sentences:
+        counter.update(words)
+    Pruning(min_counts={1: 3}).map_vocabulary(counter)
+    expected = NgramCounter(3)
+    for words in sentences:
+        expected.update([w if w in ("a", "b", "c") else "<unk>" for w in words])
+    assert counter.vocabulary.id_to_word == expected.vocabulary.id_to_word
+    for order in counter.orders:
+        assert counter.get_counts(order) == expected.get_counts(order)
+    assert counter.followers == expected.followers
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from src.counter import NgramCounter
+from src.sketch import SketchCounter
+from src.tokenizer import Tokenizer
+from tests.conftest import make_corpus
+
+
+@pytest.fixture(scope="module")
+def counters():
+    """
+    :return: точний (NgramCounter) та наближений (SketchCounter) лічильники 3-грам синтетичного корпусу,
+    у якому одне речення повторюється часто (його N-грами мають бути серед найчастіших)
+    """
+    exact, sketch = NgramCounter(3), SketchCounter(3, epsilon=0.01, delta=0.001, top_k=20, buffer_size=1000)
+    tokenizer = Tokenizer.get("regex")
+    paragraphs = make_corpus(500, seed=2) + ["Alice said to the queen.\n"] * 400
+    random.Random(2).shuffle(paragraphs)
+    for words in tokenizer.iter_words(paragraphs):
+        exact.update(words)
+        sketch.update(words)
+    assert sketch.vocabulary.id_to_word == exact.vocabulary.id_to_word  # однакові ключі N-грам
+    return exact, sketch
+
+
+@pytest.mark.parametrize("order", [2, 3])
+def test_count_min_never_underestimates(counters, order):
+    exact, sketch = counters
+    counts = exact.get_counts(order)
+    bounds = sketch.error_bounds()[order]  # до Count-Min sketch додаються усі накопичені N-грами
+    keys = list(counts)
+    estimates = sketch.sketches[order].estimate(sketch.fingerprints(keys, order)).tolist()
+    assert bounds["ngrams"] == sum(counts.values())
+    for key, estimate in zip(keys, estimates):
+        assert counts[key] <= estimate <= counts[key] + bounds["max_overestimate"]
+    assert all(counts[key] <= freq for key, freq in sketch.get_counts(order).items())
+
+
+@pytest.mark.parametrize("order", [2, 3])
+def test_misra_gries_keeps_heavy_hitters(counters, order):
+    exact, sketch = counters
+    threshold = sketch.error_bounds()[order]["heavy_hitter_threshold"]
+    heavy = {key for key, freq in exact.get_counts(order).items() if freq > threshold}
+    assert heavy
+    assert heavy <= set(sketch.get_counts(order))
+    assert len(sketch.get_counts(order)) <= sketch.top_k
@@ -0,0 +1,24 @@
+import sqlite3
+
+from src.sweep import NgramsSweep
+
+
+def test_sweep_run_stats_count_rows_of_every_database(corpus, tmp_path):
+    sweep = NgramsSweep([2, 3], [3, 5], corpus, str(tmp_path / "{n}-grams-k{k}.db"), csv_dir=str(tmp_path / "csv"),
+                        tokenizer="regex")
+    assert len(sweep.db_paths) == 4
+    for config, db_path in sweep.db_paths.items():
+        connection = sqlite3.connect(db_path)
+        try:
+            tables = {name for name, in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            counters = {metric[len("counter.rows."):]: value for metric, value in connection.execute(
+                "SELECT metric, value FROM run_stats WHERE metric LIKE 'counter.rows.%'")}
+            assert "gt_estimation_counts" in counters
+            for table, value in counters.items():
+                if table in tables:
+                    assert value == connection.execute("SELECT COUNT(*) FROM {}".format(table)).fetchone()[0], \
+                        (config, table)
+            assert connection.execute(
+                "SELECT value FROM run_stats WHERE metric = 'stage.db write.calls'").fetchone()[0] == 1
+        finally:
+            connection.close()
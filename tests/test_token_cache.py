@@ -0,0 +1,64 @@
+import os
+import time
+
+import pytest
+
+from src.token_cache import TokenCache
+from src.tokenizer import RegexTokenizer, Tokenizer
+from src.vocabulary import Vocabulary
+from tests.conftest import read_tables
+
+
+def cache_files(cache_dir):
+    return sorted(name for name in os.listdir(cache_dir) if name.endswith(TokenCache.suffix))
+
+
+def test_second_run_uses_the_cache(corpus, build_db, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    first_db, first = build_db("first", corpus, token_cache=cache_dir)
+    second_db, second = build_db("second", corpus, token_cache=cache_dir)
+    assert (first.stats.counters["token_cache.hit"], second.stats.counters["token_cache.hit"]) == (0, 1)
+    assert len(cache_files(cache_dir)) == 1
+    assert read_tables(second_db) == read_tables(first_db)
+
+
+@pytest.mark.parametrize("change", ["tokenizer", "id_bits"])
+def test_changed_tokenization_misses_the_cache(corpus, build_db, tmp_path, monkeypatch, change):
+    cache_dir = str(tmp_path / "cache")
+    cached_db, _ = build_db("cached", corpus, token_cache=cache_dir)
+    path = TokenCache(cache_dir).path(corpus, Tokenizer.get("regex"))
+    if change == "tokenizer":
+        monkeypatch.setattr(RegexTokenizer, "version", RegexTokenizer.version + 1)
+    else:
+        monkeypatch.setattr(Vocabulary, "id_bits", 20)
+        monkeypatch.setattr(Vocabulary, "id_mask", (1 << 20) - 1)
+    assert TokenCache(cache_dir).path(corpus, Tokenizer.get("regex")) != path
+    changed_db, changed = build_db("changed", corpus, token_cache=cache_dir)
+    assert changed.stats.counters["token_cache.hit"] == 0
+    assert len(cache_files(cache_dir)) == 2
+    assert read_tables(changed_db) == read_tables(cached_db)
+
+
+def test_eviction_removes_old_and_least_recently_used_entries(tmp_path):
+    cache = TokenCache(str(tmp_path), max_bytes=250, max_age=3600)
+    now = time.time()
+    # запис: (назва, розмір, скільки секунд тому використовувався)
+    for name, size, age in (("expired", 10, 7200), ("oldest", 100, 600), ("older", 100, 300), ("recent", 100, 60)):
+        path = str(tmp_path / (name + TokenCache.suffix))
+        with open(path, "wb") as f:
+            f.write(b"\0" * size)
+        os.utime(path, (now - age, now - age))
+    with open(tmp_path / "other.txt", "wb") as f:
+        f.write(b"\0" * 1000)
+    cache.evict()
+    assert cache_files(str(tmp_path)) == ["older" + TokenCache.suffix, "recent" + TokenCache.suffix]
+    assert os.path.exists(tmp_path / "other.txt")  # інші файли теки не видаляються
+
+
+def test_reading_an_entry_marks_it_as_used(corpus, build_db, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    build_db("first", corpus, token_cache=cache_dir)
+    path = os.path.join(cache_dir, cache_files(cache_dir)[0])
+    os.utime(path, (time.time() - 7200, time.time() - 7200))
+    build_db("second", corpus, token_cache=cache_dir)
+    assert time.time() - os.stat(path).st_mtime < 3600
@@ -0,0 +1,43 @@
+import re
+
+import pytest
+
+from src.tokenizer import Tokenizer
+from tests.conftest import make_corpus
+
+TEXTS = [
+    "Alice said: \"I can't tell (you know) what it's about!\" The Queen's tea-party; the Hatter's hat.",
+    "‘Curiouser and curiouser!’ cried Alice — she was so much surprised, that... she forgot?",
+    "Don’t SHOUT at the Mock Turtle,\tsaid the King.\n\nMr. Rabbit, O'Brien and 3 mice:  ok ,done.",
+    "Привіт, Світе! Ми п'ємо чай — і м’ята «ЧУДОВА»: ҐАНОК, Їжак.\n",
+    "",
+    " . ; ! ? : , ( ) — ‘ \" ",
+]
+
+
+def legacy_split_to_words(text):
+    """
+    Попередній варіант поділу на слова (Ngrams.split_to_words до перенесення до Tokenizer)
+    """
+    delimiters = [".", ";", "!", "?", ":", ",", " ", "\n", "", "(", ")", "‘", "—"]
+    words_list = re.split(r'[.;!?:(),—"‘\s]\s*', text)
+    return [w.lower() for w in words_list if w not in delimiters]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_split_to_words_matches_legacy_split(text):
+    assert Tokenizer.split_to_words(text) == legacy_split_to_words(text)
+
+
+def test_regex_tokenizer_words_match_legacy_split():
+    # межі речень впливають лише на групування слів, тому слова усіх речень параграфа - ті самі, що й слова
+    # параграфа, поділеного попереднім способом
+    tokenizer = Tokenizer.get("regex")
+    for paragraph in TEXTS + make_corpus(100, seed=4):
+        words = [w for sentence in tokenizer.iter_words([paragraph]) for w in sentence]
+        assert words == legacy_split_to_words(paragraph)
+
+
+def test_regex_tokenizer_splits_sentences():
+    assert Tokenizer.get("regex").split_sentences("  One two. Three?! “Four.” Five (six!) seven\n") == \
+        ["One two.", "Three?!", "“Four.”", "Five (six!)", "seven"]
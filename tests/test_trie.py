@@ -0,0 +1,59 @@
+import pytest
+
+from src.trie import NgramTrie
+from tests.conftest import read_tables
+
+
+@pytest.fixture
+def ngrams(corpus, build_db, tmp_path):
+    _, ngrams = build_db("trie", corpus, n=4, trie=str(tmp_path / "trie.npz"))
+    return ngrams
+
+
+def test_trie_counts_match_counter(ngrams):
+    counter, trie = ngrams.counter, ngrams.trie
+    for order in counter.orders:
+        counts = counter.get_counts(order)
+        assert sorted(trie.level_keys(order)) == sorted(counts)
+        for ngram, freq in counter.decoded(counts, order):
+            assert trie.count(ngram) == freq
+    assert trie.count("no such words") == 0
+
+
+def test_trie_types_counts_match_counter(ngrams):
+    counter, trie = ngrams.counter, ngrams.trie
+    for order in range(2, counter.n + 1):
+        contexts = counter.get_counts(order - 1)
+        assert trie.get_types_counts(contexts, order) == counter.get_types_counts(contexts, order)
+
+
+def test_trie_backoff_and_followers(ngrams):
+    trie, counter = ngrams.trie, ngrams.counter
+    ngram, freq = next(counter.decoded(counter.get_counts(2), 2))
+    assert trie.backoff("unseen " + ngram) == (2, freq)
+    assert trie.backoff("unseen") == (0, 0)
+    context = ngram.split(" ")[0]
+    followers = trie.top_k_followers(context, k=3)
+    assert [f for _, f in followers] == sorted((f for _, f in followers), reverse=True)
+    assert all(trie.count(context + " " + word) == f for word, f in followers)
+    word_id = counter.vocabulary.lookup(context)
+    assert trie.context_stats(context) == (sum(trie.children([word_id])[1]),
+                                           counter.get_types_counts([word_id], 2)[word_id])
+
+
+def test_saved_trie_loads_identically(ngrams, tmp_path):
+    loaded = NgramTrie.load(str(tmp_path / "trie.npz"))
+    trie = ngrams.trie
+    assert (loaded.n, loaded.sentences_count, loaded.tokens_count) == (trie.n, trie.sentences_count, trie.tokens_count)
+    assert loaded.vocabulary.id_to_word == trie.vocabulary.id_to_word
+    for level in range(trie.n):
+        assert (loaded.words[level] == trie.words[level]).all()
+        assert (loaded.counts[level] == trie.counts[level]).all()
+    for level in range(trie.n - 1):
+        assert (loaded.offsets[level] == trie.offsets[level]).all()
+
+
+def test_trie_does_not_change_the_database(corpus, build_db):
+    plain_db, _ = build_db("plain", corpus, n=4)
+    trie_db, _ = build_db("with_trie", corpus, n=4, trie=True)
+    assert read_tables(trie_db) == read_tables(plain_db)